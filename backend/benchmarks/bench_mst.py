@@ -0,0 +1,85 @@
+"""Benchmark of the MST engines (Kruskal vs array Prim vs Borůvka, plus the Euclidean Prim).
+
+Usage:
+    python backend/benchmarks/bench_mst.py [--dense 1500 --sparse 200000 --points 3000 --seed 7]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.core.networks.graph import CompiledGraph  # noqa: E402
+from src.core.networks.mst import (  # noqa: E402
+    boruvka_mst,
+    choose_mst_algorithm,
+    euclidean_prim_mst,
+    kruskal_mst,
+    np,
+    prim_mst,
+)
+
+ENGINES = {"kruskal": kruskal_mst, "prim": prim_mst, "boruvka": boruvka_mst}
+
+
+def _graph(n: int, pairs, rng: random.Random) -> CompiledGraph:
+    eu = [u for u, _ in pairs]
+    ev = [v for _, v in pairs]
+    zeros = [0.0] * len(pairs)
+    weight = [float(rng.randint(1, 10_000)) for _ in pairs]
+    return CompiledGraph([f"n{i}" for i in range(n)], eu, ev, zeros, zeros, weight, directed=False)
+
+
+def complete_graph(n: int, rng: random.Random) -> CompiledGraph:
+    """Complete undirected graph on ``n`` nodes with random integer weights."""
+    return _graph(n, [(i, j) for i in range(n) for j in range(i + 1, n)], rng)
+
+
+def sparse_graph(n: int, rng: random.Random) -> CompiledGraph:
+    """Random path (connected) plus ``4 n`` random edges."""
+    pairs = [(i, i + 1) for i in range(n - 1)]
+    pairs += [(rng.randrange(n), rng.randrange(n)) for _ in range(4 * n)]
+    return _graph(n, pairs, rng)
+
+
+def run(name: str, g: CompiledGraph, engines) -> None:
+    print(f"\n{name}: {g.n} nodes, {g.num_edges} edges, auto -> {choose_mst_algorithm(g)}")
+    reference = None
+    for algo in engines:
+        t0 = time.perf_counter()
+        total, _ = ENGINES[algo](g)
+        dt = time.perf_counter() - t0
+        same = reference is None or total == reference
+        reference = total if reference is None else reference
+        print(f"  {algo:<9} {dt * 1000:9.1f} ms  total={total:.0f}  {'identical' if same else 'MISMATCH'}")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--dense", type=int, default=1500)
+    ap.add_argument("--sparse", type=int, default=200_000)
+    ap.add_argument("--points", type=int, default=3000)
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"NumPy: {'yes' if np is not None else 'no'}")
+    run("complete", complete_graph(args.dense, rng), ["kruskal", "prim", "boruvka"])
+    run("sparse", sparse_graph(args.sparse, rng), ["kruskal", "boruvka"])
+
+    xs = [rng.random() for _ in range(args.points)]
+    ys = [rng.random() for _ in range(args.points)]
+    t0 = time.perf_counter()
+    total, _ = euclidean_prim_mst([f"p{i}" for i in range(args.points)], xs, ys)
+    dt = time.perf_counter() - t0
+    print(f"\neuclidean: {args.points} points (no edges materialized)")
+    print(f"  prim      {dt * 1000:9.1f} ms  total={total:.3f}")
+
+
+if __name__ == "__main__":
+    main()
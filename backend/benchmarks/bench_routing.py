@@ -0,0 +1,75 @@
+"""Benchmark of the TSP/VRP heuristics: tour quality against the time budget.
+
+Usage:
+    python backend/benchmarks/bench_routing.py [--grid 60 --stops 200 --capacity 0 --workers 4 --seed 7]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.core.networks.distance_matrix import distance_matrix  # noqa: E402
+from src.core.networks.model import NetworkModel, Edge  # noqa: E402
+from src.core.networks.routing import solve_routing  # noqa: E402
+
+
+def road_grid(size: int, rng: random.Random) -> NetworkModel:
+    """``size`` x ``size`` undirected street grid with random block lengths."""
+    nodes = [f"g{r}_{c}" for r in range(size) for c in range(size)]
+    edges = []
+    for r in range(size):
+        for c in range(size):
+            if c + 1 < size:
+                edges.append(Edge(f"g{r}_{c}", f"g{r}_{c + 1}", weight=rng.uniform(1, 3)))
+            if r + 1 < size:
+                edges.append(Edge(f"g{r}_{c}", f"g{r + 1}_{c}", weight=rng.uniform(1, 3)))
+    return NetworkModel(nodes=nodes, edges=edges, directed=False)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--grid", type=int, default=60)
+    ap.add_argument("--stops", type=int, default=200)
+    ap.add_argument("--capacity", type=float, default=0.0, help="vehicle capacity (0 = TSP)")
+    ap.add_argument("--workers", type=int, default=4)
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+
+    rng = random.Random(args.seed)
+    model = road_grid(args.grid, rng)
+    points = rng.sample(model.nodes, args.stops + 1)
+    t0 = time.perf_counter()
+    dm = distance_matrix(model, points, points, workers=args.workers)
+    print(f"{args.grid}x{args.grid} grid, {args.stops} stops: matrix in {time.perf_counter() - t0:.2f} s")
+    demands = {p: rng.randint(1, 10) for p in points[1:]}
+    capacity = args.capacity or None
+
+    for construction in ("nearest_neighbor", "savings"):
+        for budget in (0.5, 2.0, 8.0):
+            for workers in (1, args.workers):
+                sol = solve_routing(
+                    dm,
+                    points[0],
+                    demands=demands,
+                    capacity=capacity,
+                    construction=construction,
+                    restarts=10**6,
+                    time_budget=budget,
+                    workers=workers,
+                    seed=args.seed,
+                )
+                print(
+                    f"  {construction:<16} budget={budget:<4g} workers={workers:<2} "
+                    f"built={sol.construction_distance:10.1f} best={sol.total_distance:10.1f} "
+                    f"routes={len(sol.routes):<3} restarts={sol.restarts:<4} {sol.elapsed:6.2f} s"
+                )
+
+
+if __name__ == "__main__":
+    main()
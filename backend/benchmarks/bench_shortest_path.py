@@ -0,0 +1,93 @@
+"""Benchmark of the single-source shortest path queues (binary heap vs Dial vs radix heap).
+
+Usage:
+    python backend/benchmarks/bench_shortest_path.py [--grid 150 --road 20000 --max-weight 60 --seed 7]
+"""
+
+import argparse
+import math
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.core.networks.model import NetworkModel, Edge  # noqa: E402
+from src.core.networks.shortest_path import (  # noqa: E402
+    choose_shortest_path_algorithm,
+    dial,
+    dijkstra,
+    radix_heap_dijkstra,
+)
+
+ALGORITHMS = {"dijkstra": dijkstra, "dial": dial, "radix_heap": radix_heap_dijkstra}
+
+
+def grid_graph(size: int, max_weight: int, rng: random.Random) -> NetworkModel:
+    """``size`` x ``size`` undirected grid with integer weights in ``[1, max_weight]``."""
+    nodes = [f"g{r}_{c}" for r in range(size) for c in range(size)] + ["unreachable"]
+    edges = []
+    for r in range(size):
+        for c in range(size):
+            if c + 1 < size:
+                edges.append(Edge(f"g{r}_{c}", f"g{r}_{c + 1}", weight=rng.randint(1, max_weight)))
+            if r + 1 < size:
+                edges.append(Edge(f"g{r}_{c}", f"g{r + 1}_{c}", weight=rng.randint(1, max_weight)))
+    return NetworkModel(nodes=nodes, edges=edges, directed=False)
+
+
+def road_graph(n: int, max_weight: int, rng: random.Random) -> NetworkModel:
+    """Road-like graph: random points joined to their 3 nearest neighbours, weight ~ distance."""
+    pts = [(rng.random(), rng.random()) for _ in range(n)]
+    cells = {}
+    side = int(math.sqrt(n / 2)) + 1
+    for i, (x, y) in enumerate(pts):
+        cells.setdefault((int(x * side), int(y * side)), []).append(i)
+    pairs = set()
+    for i, (x, y) in enumerate(pts):
+        cx, cy = int(x * side), int(y * side)
+        near = [j for dx in (-1, 0, 1) for dy in (-1, 0, 1) for j in cells.get((cx + dx, cy + dy), []) if j != i]
+        near.sort(key=lambda j: math.dist(pts[i], pts[j]))
+        pairs.update((min(i, j), max(i, j)) for j in near[:3])
+    scale = max_weight * side / 2
+    edges = [Edge(f"r{i}", f"r{j}", weight=max(1, min(max_weight, round(math.dist(pts[i], pts[j]) * scale))))
+             for i, j in sorted(pairs)]
+    return NetworkModel(nodes=[f"r{i}" for i in range(n)] + ["unreachable"], edges=edges, directed=False)
+
+
+def run(name: str, model: NetworkModel, source: str, repeat: int) -> None:
+    g = model.graph  # compile once, outside the timings
+    print(f"\n{name}: {g.n} nodes, {g.m} arcs, auto -> {choose_shortest_path_algorithm(g)}")
+    reference = None
+    base = None
+    for algo, fn in ALGORITHMS.items():
+        fn(g, source, "unreachable")  # warm-up (integer weight cache)
+        t0 = time.perf_counter()
+        for _ in range(repeat):
+            dist, _ = fn(g, source, "unreachable")  # full single-source search
+        dt = (time.perf_counter() - t0) / repeat
+        base = base or dt
+        same = reference is None or dist == reference
+        reference = reference or dist
+        print(f"  {algo:<11} {dt * 1000:9.1f} ms  x{base / dt:4.2f}  {'identical' if same else 'MISMATCH'}")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--grid", type=int, default=150)
+    ap.add_argument("--road", type=int, default=20000)
+    ap.add_argument("--max-weight", type=int, default=60)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+
+    rng = random.Random(args.seed)
+    run("grid", grid_graph(args.grid, args.max_weight, rng), "g0_0", args.repeat)
+    run("road", road_graph(args.road, args.max_weight, rng), "r0", args.repeat)
+
+
+if __name__ == "__main__":
+    main()
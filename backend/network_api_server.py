@@ -1,6 +1,9 @@
+import hashlib
 import json
 import math
+import secrets
 import sys
+from collections import OrderedDict
 from http.server import BaseHTTPRequestHandler, HTTPServer
 from pathlib import Path
 
@@ -73,7 +76,284 @@ if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
 from src.core.networks import solve_network  # noqa: E402
+from src.core.networks.contraction import ContractionHierarchy, build_contraction_hierarchy  # noqa: E402
 from src.core.networks.errors import NetworkModelError  # noqa: E402
+from src.core.networks.max_flow import MaxFlowSession  # noqa: E402
+from src.core.networks.parsers import model_from_dict  # noqa: E402
+from src.core.networks.registry import GraphRegistry, graph_nbytes  # noqa: E402
+
+
+# =========================
+# CONTRACTION HIERARCHIES (build once / query many)
+# =========================
+class HandleStore:
+    """handle -> server-side object, least recently used first out beyond ``max_items`` entries
+    or ``max_bytes`` (as estimated by ``nbytes``); ``evicted`` counts the dropped ones."""
+
+    def __init__(self, max_items: int, max_bytes: int, nbytes) -> None:
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.nbytes = nbytes
+        self.items = OrderedDict()
+        self.sizes = {}
+        self.evicted = 0
+
+    def __contains__(self, handle) -> bool:
+        return handle in self.items
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(self.sizes.values())
+
+    def get(self, handle: str):
+        item = self.items.get(handle)
+        if item is not None:
+            self.items.move_to_end(handle)
+        return item
+
+    def put(self, handle: str, item) -> None:
+        self.items[handle] = item
+        self.items.move_to_end(handle)
+        self.sizes[handle] = self.nbytes(item)
+        # The newest entry stays even if it alone exceeds max_bytes
+        while len(self.items) > 1 and (len(self.items) > self.max_items or self.total_bytes > self.max_bytes):
+            old, _ = self.items.popitem(last=False)
+            del self.sizes[old]
+            self.evicted += 1
+
+    def remove(self, handle: str) -> bool:
+        self.sizes.pop(handle, None)
+        return self.items.pop(handle, None) is not None
+
+
+# handle -> hierarchy; the handle is the hash of the JSON model (or of the uploaded hierarchy).
+# Hierarchies cross HTTP as data (``to_dict``); files stay with the library (save / load).
+CH_HANDLES = HandleStore(
+    max_items=int(os.getenv("NET_CH_MAX", "8")),
+    max_bytes=int(float(os.getenv("NET_CH_MAX_MB", "256")) * 2**20),
+    nbytes=lambda ch: ch.nbytes,
+)
+
+
+def _ch_result(handle: str, ch: ContractionHierarchy, data: dict, stats=None) -> dict:
+    out = {"handle": handle, "nodes": ch.n, "arcs": ch.num_arcs, **(stats or {})}
+    if data.get("export"):
+        out["hierarchy"] = ch.to_dict()
+    return out
+
+
+def _ch_build(data: dict) -> dict:
+    model_dict = data.get("model") if isinstance(data.get("model"), dict) else data
+    handle = hashlib.sha1(json.dumps(model_dict, sort_keys=True).encode("utf-8")).hexdigest()
+    stats = {}
+    ch = CH_HANDLES.get(handle)
+    if ch is None:
+        try:
+            ch = build_contraction_hierarchy(model_from_dict(model_dict), stats)
+        except ValueError as exc:
+            raise NetworkModelError(str(exc)) from None
+        CH_HANDLES.put(handle, ch)
+    return _ch_result(handle, ch, data, stats)
+
+
+def _ch_load(data: dict) -> dict:
+    hierarchy = data.get("hierarchy")
+    if not isinstance(hierarchy, dict):
+        raise NetworkModelError("Missing 'hierarchy' (as returned by /ch/build with \"export\": true)")
+    handle = hashlib.sha1(json.dumps(hierarchy, sort_keys=True).encode("utf-8")).hexdigest()
+    ch = CH_HANDLES.get(handle)
+    if ch is None:
+        try:
+            ch = ContractionHierarchy.from_dict(hierarchy)
+        except ValueError as exc:
+            # from_dict validates the whole structure before any query can follow it
+            raise NetworkModelError(f"Invalid contraction hierarchy: {exc}") from None
+        CH_HANDLES.put(handle, ch)
+    return _ch_result(handle, ch, {})
+
+
+def _ch_delete(data: dict) -> dict:
+    handle = str(data.get("handle", ""))
+    if not CH_HANDLES.remove(handle):
+        raise NetworkModelError("Unknown handle (build or load the graph first)")
+    return {"handle": handle, "deleted": True}
+
+
+def _ch_query(data: dict) -> dict:
+    ch = CH_HANDLES.get(str(data.get("handle", "")))
+    if ch is None:
+        # Also the answer for hierarchies evicted by the store limits
+        raise NetworkModelError("Unknown handle (build or load the graph first)")
+    with_path = bool(data.get("path", True))
+    queries = data.get("queries")
+    if queries is None:
+        queries = [{"source": data.get("source"), "target": data.get("target", data.get("sink"))}]
+    results = []
+    for q in queries:
+        src, dst = (q.get("source"), q.get("target", q.get("sink"))) if isinstance(q, dict) else q
+        if with_path:
+            distance, path_nodes = ch.query(str(src), str(dst))
+            results.append({"source": src, "target": dst, "distance": distance, "path_nodes": path_nodes})
+        else:
+            results.append({"source": src, "target": dst, "distance": ch.distance(str(src), str(dst))})
+    return {"results": results} if "queries" in data else results[0]
+
+
+# =========================
+# MAX FLOW SESSIONS (what-if capacity changes)
+# =========================
+# handle -> MaxFlowSession; each session is mutable, so every open gets a new handle.
+# Sessions hold their graph plus two capacity arrays; LRU beyond the limits like the registry
+MAXFLOW_SESSIONS = HandleStore(
+    max_items=int(os.getenv("NET_MAXFLOW_MAX", "32")),
+    max_bytes=int(float(os.getenv("NET_MAXFLOW_MAX_MB", "256")) * 2**20),
+    nbytes=lambda session: graph_nbytes(session.graph) + 8 * (len(session.capacity) + len(session.rcap)),
+)
+
+
+def _maxflow_result(handle: str, session: MaxFlowSession) -> dict:
+    cut = session.min_cut()
+    return {
+        "handle": handle,
+        "algorithm": session.algorithm,
+        "max_flow": session.value,
+        "flows": [{"u": u, "v": v, "flow": f} for (u, v), f in session.flows().items()],
+        "min_cut": {
+            "source_side": cut["source_side"],
+            "edges": [{"u": u, "v": v, "capacity": c} for u, v, c in cut["edges"]],
+            "capacity": cut["capacity"],
+        },
+        **session.last_update,
+    }
+
+
+def _maxflow_open(data: dict) -> dict:
+    model_dict = data.get("model") if isinstance(data.get("model"), dict) else data
+    m = model_from_dict(model_dict)
+    if not m.source or not m.sink:
+        raise NetworkModelError("Max flow requires 'source' and 'sink'")
+    options = data.get("options") if isinstance(data.get("options"), dict) else {}
+    try:
+        session = MaxFlowSession(m, m.source, m.sink, str(options.get("algorithm", "auto")))
+    except ValueError as exc:
+        raise NetworkModelError(str(exc)) from None
+    handle = secrets.token_hex(8)
+    MAXFLOW_SESSIONS.put(handle, session)
+    return _maxflow_result(handle, session)
+
+
+def _maxflow_session(data: dict):
+    handle = str(data.get("handle", ""))
+    session = MAXFLOW_SESSIONS.get(handle)
+    if session is None:
+        # Closed, never opened or evicted by the store limits
+        raise NetworkModelError("Unknown handle (open a max flow session first)")
+    return handle, session
+
+
+def _maxflow_update(data: dict) -> dict:
+    handle, session = _maxflow_session(data)
+    changes = data.get("changes")
+    if changes is None:
+        changes = [data]
+    try:
+        session.update([(str(c["u"]), str(c["v"]), c["capacity"]) for c in changes])
+    except (KeyError, TypeError):
+        raise NetworkModelError("Each change needs 'u', 'v' and 'capacity'") from None
+    except ValueError as exc:
+        raise NetworkModelError(str(exc)) from None
+    return _maxflow_result(handle, session)
+
+
+def _maxflow_close(data: dict) -> dict:
+    handle, _ = _maxflow_session(data)
+    MAXFLOW_SESSIONS.remove(handle)
+    return {"handle": handle, "closed": True}
+
+
+# =========================
+# GRAPH REGISTRY (upload once / solve many)
+# =========================
+# handle (content hash) -> compiled graph + per-version result cache, LRU with memory limits
+GRAPHS = GraphRegistry(
+    max_graphs=int(os.getenv("NET_GRAPHS_MAX", "32")),
+    max_bytes=int(float(os.getenv("NET_GRAPHS_MAX_MB", "512")) * 2**20),
+)
+
+
+def _graph_ref(data: dict):
+    # "graph": "<handle>" or {"handle": ..., "version": ...}; plain "handle"/"version" also work
+    ref = data.get("graph", data)
+    if isinstance(ref, str):
+        return ref, None
+    if not isinstance(ref, dict) or not ref.get("handle"):
+        raise NetworkModelError("Missing graph handle")
+    return str(ref["handle"]), ref.get("version")
+
+
+def _graph_entry(handle: str, version=None):
+    try:
+        return GRAPHS.get(handle, version)
+    except KeyError:
+        raise NetworkModelError("Unknown graph handle (upload the graph first)") from None
+    except ValueError as exc:
+        raise NetworkModelError(str(exc)) from None
+
+
+def _graphs_upload(data: dict) -> dict:
+    # The request carries the graph itself; files on disk are for the CLI (--graph)
+    if "path" in data:
+        raise NetworkModelError("Uploads carry the graph as 'model'; server files are not read")
+    defaults = data.get("model") if isinstance(data.get("model"), dict) else data
+    graph = model_from_dict(defaults).graph
+    return GRAPHS.register(graph, defaults).info()
+
+
+def _graphs_update(data: dict) -> dict:
+    handle, version = _graph_ref(data)
+    _graph_entry(handle, version)
+    try:
+        entry = GRAPHS.update(
+            handle,
+            changes=data.get("changes") or [],
+            add=data.get("add") or [],
+            remove=data.get("remove") or [],
+            version=version,
+        )
+    except (AttributeError, TypeError):
+        raise NetworkModelError("Each edge must be an object with 'u' and 'v'") from None
+    except ValueError as exc:
+        raise NetworkModelError(str(exc)) from None
+    return entry.info()
+
+
+def _graphs_info(data: dict) -> dict:
+    if not data.get("graph") and not data.get("handle"):
+        return {
+            "graphs": [entry.info() for entry in GRAPHS.entries.values()],
+            "bytes": GRAPHS.nbytes,
+            "max_bytes": GRAPHS.max_bytes,
+            "evicted": GRAPHS.evicted,
+        }
+    handle, version = _graph_ref(data)
+    return _graph_entry(handle, version).info()
+
+
+def _graphs_delete(data: dict) -> dict:
+    handle, _ = _graph_ref(data)
+    if not GRAPHS.remove(handle):
+        raise NetworkModelError("Unknown graph handle (upload the graph first)")
+    return {"handle": handle, "deleted": True}
+
+
+def _solve_registered(data: dict) -> dict:
+    handle, version = _graph_ref(data)
+    entry = _graph_entry(handle, version)
+    result, cached = GRAPHS.solve(handle, data, version)
+    return {"result": result, "graph": {"handle": handle, "version": entry.version, "cached": cached}}
 
 
 # =========================
@@ -115,6 +395,17 @@ class NetHandler(BaseHTTPRequestHandler):
             "/solve/networks",
             "/ai/report",
             "/ai/sensitivity",
+            "/ch/build",
+            "/ch/load",
+            "/ch/query",
+            "/ch/delete",
+            "/maxflow/open",
+            "/maxflow/update",
+            "/maxflow/close",
+            "/graphs/upload",
+            "/graphs/update",
+            "/graphs/info",
+            "/graphs/delete",
         ):
             self._send_json(404, {"error": "Not found"})
             return
@@ -217,10 +508,39 @@ Resultado del solver (si existe):
                 self._send_json(502, {"error": f"HF Router request failed: {exc}"})
                 return
 
+        # =========================
+        # CONTRACTION HIERARCHIES / MAX FLOW SESSIONS / GRAPH REGISTRY
+        # =========================
+        if self.path.startswith(("/ch/", "/maxflow/", "/graphs/")):
+            handler = {
+                "/ch/build": _ch_build,
+                "/ch/load": _ch_load,
+                "/ch/query": _ch_query,
+                "/ch/delete": _ch_delete,
+                "/maxflow/open": _maxflow_open,
+                "/maxflow/update": _maxflow_update,
+                "/maxflow/close": _maxflow_close,
+                "/graphs/upload": _graphs_upload,
+                "/graphs/update": _graphs_update,
+                "/graphs/info": _graphs_info,
+                "/graphs/delete": _graphs_delete,
+            }[self.path]
+            try:
+                self._send_json(200, {"result": handler(data)})
+            except NetworkModelError as exc:
+                self._send_json(400, {"error": str(exc)})
+            except Exception as exc:
+                self._send_json(500, {"error": str(exc)})
+            return
+
         # =========================
         # SOLVER DE REDES
         # =========================
         try:
+            if data.get("graph") is not None:
+                # Solve on a registered graph (see /graphs/upload)
+                self._send_json(200, _solve_registered(data))
+                return
             result = solve_network(data)
             self._send_json(200, {"result": result})
         except NetworkModelError as exc:
@@ -1,14 +1,17 @@
+import argparse
 import json
+import sys
 from pathlib import Path
 
 from src.core.networks import solve_network
+from src.core.networks.loaders import load_graph
 
 
 def _load_json(path: str) -> dict:
     return json.loads(Path(path).read_text(encoding="utf-8"))
 
 
-def main() -> None:
+def interactive() -> None:
     print("\n=== Redes (CLI) ===")
     print("Metodos: shortest_path | mst | max_flow | min_cost_flow")
     print("Tip: usa los templates en linear_programming/data/templates/\n")
@@ -27,5 +30,53 @@ def main() -> None:
             print(f"Error: {exc}\n")
 
 
+def main() -> None:
+    if len(sys.argv) == 1:
+        interactive()
+        return
+
+    ap = argparse.ArgumentParser(
+        description="Resuelve un problema de redes sobre un grafo cargado desde archivo.",
+        epilog=(
+            "Ejemplos:\n"
+            "  python run_networks_cli.py --graph red.csv --undirected --save-binary red.graph\n"
+            "  python run_networks_cli.py --graph red.graph --method max_flow --source A --sink B"
+        ),
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    ap.add_argument("--graph", required=True,
+                    help="lista de aristas .csv/.tsv/.txt, binario .graph/.bin o modelo .json")
+    ap.add_argument("--method", help="metodo de solve_network (sin metodo solo carga/convierte)")
+    ap.add_argument("--undirected", action="store_true", help="la lista de aristas es no dirigida")
+    ap.add_argument("--delimiter", help="separador de la lista de aristas (por defecto segun extension)")
+    ap.add_argument("--source")
+    ap.add_argument("--sink", "--target", dest="sink")
+    ap.add_argument("--demand", type=float)
+    ap.add_argument("--model", help="JSON con los datos de la consulta (source, sink, supply, ...)")
+    ap.add_argument("--options", help='opciones del solver en JSON, p. ej. \'{"algorithm": "dinic"}\'')
+    ap.add_argument("--save-binary", metavar="PATH", help="guarda el grafo compilado en formato binario")
+    args = ap.parse_args()
+
+    try:
+        graph = load_graph(args.graph, directed=not args.undirected, delimiter=args.delimiter)
+        print(f"Grafo: {graph.n} nodos, {graph.num_edges} aristas", file=sys.stderr)
+        if args.save_binary:
+            graph.save_binary(args.save_binary)
+            print(f"Binario guardado en {args.save_binary}", file=sys.stderr)
+        if not args.method:
+            return
+        query = _load_json(args.model) if args.model else {}
+        for key in ("source", "sink", "demand"):
+            if getattr(args, key) is not None:
+                query[key] = getattr(args, key)
+        req = {"method": args.method, "model": query}
+        if args.options:
+            req["options"] = json.loads(args.options)
+        out = solve_network(req, graph=graph)
+    except Exception as exc:
+        sys.exit(f"Error: {exc}")
+    print(json.dumps(out, ensure_ascii=False, indent=2))
+
+
 if __name__ == "__main__":
     main()
@@ -7,8 +7,9 @@ from .simplex_basic import solve_simplex_basic
 from .two_phase import solve_two_phase
 from .big_m import solve_big_m
 from .dual import build_dual
+from .dantzig_wolfe import solve_dantzig_wolfe
 
-Method = Literal["auto", "simplex", "two_phase", "big_m", "dual"]
+Method = Literal["auto", "simplex", "two_phase", "big_m", "dual", "dantzig_wolfe"]
 
 def can_use_basic_simplex(model: LPModel) -> bool:
     # Simplex basico solo funciona si todas las restricciones son <= y b>=0
@@ -23,6 +24,8 @@ def choose_method(model: LPModel) -> str:
 def solve_lp(model_input: Union[dict, LPModel], method: Method = "auto", log: bool = False) -> LPSolution:
     # Normaliza la entrada a LPModel y ejecuta el solver elegido
     model = model_input if isinstance(model_input, LPModel) else model_from_dict(model_input)
+    # Estructura de bloques opcional (solo Dantzig-Wolfe): "linking_rows" / "blocks"
+    structure = model_input if isinstance(model_input, dict) else {}
 
     if method == "auto":
         method = choose_method(model)  # type: ignore
@@ -54,4 +57,13 @@ def solve_lp(model_input: Union[dict, LPModel], method: Method = "auto", log: bo
         dual_res.extra["dual_model_name"] = dual_model.name
         return dual_res
 
+    if method == "dantzig_wolfe":
+        return solve_dantzig_wolfe(
+            model,
+            linking_rows=structure.get("linking_rows"),
+            blocks=structure.get("blocks"),
+            workers=structure.get("workers"),
+            log=log,
+        )
+
     raise ValueError(f"Método no soportado: {method}")
@@ -0,0 +1,346 @@
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .model import LPModel, LPSolution, Constraint
+from .simplex import EPS
+from .two_phase import solve_two_phase
+from .dual import dual_values
+
+M_DEFAULT = 1e6
+GAP_TOL = 1e-7
+
+
+class _UnionFind:
+    # Union-find sobre indices de variables (para detectar bloques)
+    def __init__(self, n: int) -> None:
+        self.parent = list(range(n))
+
+    def find(self, x: int) -> int:
+        while self.parent[x] != x:
+            self.parent[x] = self.parent[self.parent[x]]
+            x = self.parent[x]
+        return x
+
+    def union(self, a: int, b: int) -> None:
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            self.parent[rb] = ra
+
+
+def _support(c: Constraint) -> List[int]:
+    # Indices de variables con coeficiente distinto de cero
+    return [j for j, v in enumerate(c.a) if abs(v) > EPS]
+
+
+def _zero_row_holds(c: Constraint) -> bool:
+    # Una fila sin coeficientes se cumple si 0 (op) b
+    if c.op == "<=":
+        return c.b >= -EPS
+    if c.op == ">=":
+        return c.b <= EPS
+    return abs(c.b) <= EPS
+
+
+def _components(model: LPModel, rows: Sequence[int]) -> List[List[int]]:
+    # Agrupa variables conectadas por las filas dadas (componentes conexas)
+    n = len(model.c)
+    uf = _UnionFind(n)
+    for i in rows:
+        sup = _support(model.constraints[i])
+        for j in sup[1:]:
+            uf.union(sup[0], j)
+    groups: Dict[int, List[int]] = {}
+    for j in range(n):
+        groups.setdefault(uf.find(j), []).append(j)
+    return sorted(groups.values(), key=lambda g: g[0])
+
+
+def detect_block_structure(
+    model: LPModel,
+    linking_rows: Optional[Sequence[int]] = None,
+    max_linking: Optional[int] = None,
+) -> Tuple[List[int], List[List[int]]]:
+    """
+    Detecta la estructura bloque-angular del modelo.
+
+    - Si se dan ``linking_rows``, los bloques son las componentes conexas de las
+      variables usando solo las filas restantes.
+    - Si no, se marcan como filas de enlace las filas mas densas (de forma voraz)
+      hasta que el resto se separe en al menos 2 bloques.
+
+    Retorna: (filas_de_enlace, bloques) donde cada bloque es una lista de indices de variables.
+    """
+    m = len(model.constraints)
+    if linking_rows is not None:
+        linking = sorted(set(int(i) for i in linking_rows))
+        rest = [i for i in range(m) if i not in set(linking)]
+        return linking, _components(model, rest)
+
+    limit = max_linking if max_linking is not None else max(1, m // 2)
+    order = sorted(range(m), key=lambda i: (-len(_support(model.constraints[i])), i))
+    linking = []
+    blocks = _components(model, list(range(m)))
+    for i in order:
+        if len(blocks) >= 2 or len(linking) >= limit:
+            break
+        linking.append(i)
+        rest = [r for r in range(m) if r not in set(linking)]
+        blocks = _components(model, rest)
+
+    if len(blocks) < 2:
+        # No se encontro descomposicion: un solo bloque sin filas de enlace
+        return [], blocks
+
+    # Una fila marcada cuyo soporte cae en un solo bloque no enlaza nada
+    block_of = {j: k for k, blk in enumerate(blocks) for j in blk}
+    truly_linking = [
+        i for i in linking
+        if len({block_of[j] for j in _support(model.constraints[i])}) > 1
+    ]
+    return sorted(truly_linking), blocks
+
+
+def _price_block(sub: LPModel) -> Tuple[str, List[float], float]:
+    # Subproblema de pricing (funcion de modulo para poder enviarla al pool)
+    # Import local: solve_lp vive en __init__, que a su vez importa este modulo
+    from . import solve_lp
+    res = solve_lp(sub, method="auto")
+    return res.status, res.x, res.objective_value
+
+
+def solve_dantzig_wolfe(
+    model: LPModel,
+    linking_rows: Optional[Sequence[int]] = None,
+    blocks: Optional[Sequence[Sequence[int]]] = None,
+    workers: Optional[int] = None,
+    max_iter: int = 200,
+    tol: float = GAP_TOL,
+    M: float = M_DEFAULT,
+    log: bool = False,
+) -> LPSolution:
+    """
+    Descomposicion de Dantzig-Wolfe para LP bloque-angulares.
+
+    Las filas de enlace (recursos compartidos) quedan en el problema maestro;
+    cada bloque de variables con sus propias filas es un subproblema de pricing
+    resuelto con los solvers existentes (``solve_lp`` en modo auto). Los
+    subproblemas de una iteracion se resuelven en paralelo en un pool de procesos
+    cuando ``workers`` > 1.
+
+    En cada iteracion se registra la cota inferior (maestro restringido) y la
+    cota superior lagrangiana (pi*b + sum_k z_k) para un MAX interno; el historial
+    queda en ``extra["gap_history"]``. Requiere bloques acotados (sin rayos extremos): si un
+    bloque no tiene filas propias o su pricing resulta no acotado, la descomposicion no
+    aplica y se resuelve el modelo completo con ``solve_two_phase`` (``extra["fallback"]``
+    indica el motivo), de modo que el estado siempre es el del LP original. Si se alcanza
+    ``max_iter`` se retorna la mejor solucion del maestro con estado ``ITERATION_LIMIT``.
+    Las filas sin coeficientes se verifican antes de descomponer (``INFEASIBLE`` si
+    ``0 op b`` no se cumple) y luego se descartan.
+    """
+    if max_iter < 1:
+        raise ValueError("max_iter debe ser >= 1.")
+    n = len(model.c)
+
+    # Filas sin coeficientes (0 op b): no caen en ningun bloque ni enlazan nada, asi que se
+    # verifican aqui y se quitan; los indices de fila que se reportan son los del modelo original
+    keep = [i for i, cst in enumerate(model.constraints) if _support(cst)]
+    if len(keep) < len(model.constraints):
+        for i, cst in enumerate(model.constraints):
+            if not _support(cst) and not _zero_row_holds(cst):
+                return LPSolution(status="INFEASIBLE", x=[0.0] * n, objective_value=float("nan"), iterations=0,
+                                  message=f"INFEASIBLE: la fila {i} no tiene coeficientes y exige 0 {cst.op} {cst.b}.",
+                                  method_used="dantzig_wolfe")
+        new_index = {i: r for r, i in enumerate(keep)}
+        if linking_rows is not None:
+            linking_rows = [new_index[int(i)] for i in linking_rows if int(i) in new_index]
+        model = LPModel(name=model.name, sense=model.sense, c=model.c,
+                        constraints=[model.constraints[i] for i in keep], nonneg=model.nonneg)
+
+    if blocks is not None:
+        block_vars: List[List[int]] = [sorted(int(j) for j in blk) for blk in blocks]
+        if sorted(j for blk in block_vars for j in blk) != list(range(n)):
+            raise ValueError("Los bloques deben ser una particion de las variables.")
+        if linking_rows is None:
+            # Enlace = filas cuyo soporte no cae dentro de un solo bloque
+            linking_rows = [
+                i for i, cst in enumerate(model.constraints)
+                if not any(set(_support(cst)) <= set(blk) for blk in block_vars)
+            ]
+        linking = sorted(set(int(i) for i in linking_rows))
+    else:
+        linking, block_vars = detect_block_structure(model, linking_rows)
+    link_set = set(linking)
+
+    # Trabajamos siempre en MAX
+    c_max = model.c[:] if model.sense == "max" else [-v for v in model.c]
+
+    # Filas propias de cada bloque (restringidas a sus variables)
+    block_rows: List[List[Constraint]] = []
+    for blk in block_vars:
+        pos = set(blk)
+        rows = []
+        for i, cst in enumerate(model.constraints):
+            if i in link_set:
+                continue
+            sup = _support(cst)
+            if sup and set(sup) <= pos:
+                rows.append(Constraint(a=[cst.a[j] for j in blk], op=cst.op, b=cst.b))
+            elif sup and set(sup) & pos:
+                raise ValueError(f"La fila {keep[i]} cruza bloques pero no es fila de enlace.")
+        block_rows.append(rows)
+
+    link_cons = [model.constraints[i] for i in linking]
+
+    def subproblems(pi: List[float]) -> List[LPModel]:
+        # Costos del pricing: c_k - pi^T A_k (solo columnas del bloque)
+        subs = []
+        for k, blk in enumerate(block_vars):
+            ck = [c_max[j] - sum(pi[r] * link_cons[r].a[j] for r in range(len(link_cons))) for j in blk]
+            subs.append(LPModel(name=f"{model.name}:block{k + 1}", sense="max", c=ck, constraints=block_rows[k]))
+        return subs
+
+    # Columnas del maestro: (bloque, punto extremo x_k)
+    columns: List[Tuple[int, List[float]]] = []
+    history: List[Dict[str, Any]] = []
+    extra: Dict[str, Any] = {
+        "linking_rows": [keep[i] for i in linking],
+        "blocks": block_vars,
+        "gap_history": history,
+        "workers": workers or 1,
+    }
+
+    def fallback(reason: str, it: int) -> LPSolution:
+        # Un bloque no acotado no dice nada del LP completo: se resuelve sin descomponer
+        res = solve_two_phase(model)
+        res.extra = {**(res.extra or {}), **extra, "fallback": reason, "dw_iterations": it}
+        res.message = f"{res.message} (Dantzig-Wolfe no aplicable: {reason})"
+        return res
+
+    def fail(status: str, msg: str, it: int) -> LPSolution:
+        value = float("nan") if status == "INFEASIBLE" else float("inf")
+        return LPSolution(status=status, x=[0.0] * n, objective_value=value, iterations=it,
+                          message=msg, method_used="dantzig_wolfe", extra=extra)
+
+    for k, rows in enumerate(block_rows):
+        if not rows:
+            return fallback(f"el bloque {k + 1} no tiene filas propias (no es acotado)", 0)
+
+    pool = ProcessPoolExecutor(max_workers=workers) if workers and workers > 1 else None
+    try:
+        def price(pi: List[float]) -> List[Tuple[str, List[float], float]]:
+            subs = subproblems(pi)
+            return list(pool.map(_price_block, subs)) if pool is not None else [_price_block(s) for s in subs]
+
+        # Columnas iniciales: optimo de cada bloque con el costo original
+        for k, (status, xk, _) in enumerate(price([0.0] * len(link_cons))):
+            if status == "INFEASIBLE":
+                return fail("INFEASIBLE", f"INFEASIBLE: el bloque {k + 1} no tiene solucion factible.", 0)
+            if status == "UNBOUNDED":
+                return fallback(f"el bloque {k + 1} no es acotado", 0)
+            columns.append((k, xk))
+
+        for it in range(1, max_iter + 1):
+            master, n_art = _build_master(c_max, link_cons, block_vars, columns, M)
+            n_cols = len(columns)
+            res = solve_two_phase(master)
+            if res.status != "OPTIMAL":
+                return fail(res.status, f"Maestro restringido: {res.message}", it)
+            y = dual_values(master)
+            pi, sigma = y[:len(link_cons)], y[len(link_cons):]
+
+            priced = price(pi)
+            new_cols = 0
+            bound = sum(pi[r] * link_cons[r].b for r in range(len(link_cons)))
+            for k, (status, xk, zk) in enumerate(priced):
+                if status == "UNBOUNDED":
+                    return fallback(f"el pricing del bloque {k + 1} no es acotado", it)
+                bound += zk
+                if zk - sigma[k] > tol * (1.0 + abs(zk)):
+                    columns.append((k, xk))
+                    new_cols += 1
+
+            lower = res.objective_value
+            gap = bound - lower
+            history.append({
+                "iteration": it,
+                "master_objective": lower if model.sense == "max" else -lower,
+                "bound": bound if model.sense == "max" else -bound,
+                "gap": gap,
+                "relative_gap": gap / max(1.0, abs(bound)),
+                "columns_added": new_cols,
+            })
+            if log:
+                print(f"[DW it={it}] lb={lower} ub={bound} gap={gap} cols+={new_cols}")
+
+            if new_cols == 0 or gap <= tol * max(1.0, abs(bound)):
+                if any(v > 1e-7 for v in res.x[n_cols:n_cols + n_art]):
+                    return fail("INFEASIBLE", "INFEASIBLE: las filas de enlace no se pueden satisfacer.", it)
+                x = _combine(n, block_vars, columns[:n_cols], res.x)
+                z = sum(cj * xj for cj, xj in zip(model.c, x))
+                extra["columns"] = len(columns)
+                return LPSolution(status="OPTIMAL", x=x, objective_value=z, iterations=it, message="OK",
+                                  method_used="dantzig_wolfe", extra=extra)
+
+        # Sin convergencia: mejor solucion del ultimo maestro (factible si no usa artificiales)
+        extra["columns"] = len(columns)
+        feasible = not any(v > 1e-7 for v in res.x[n_cols:n_cols + n_art])
+        x = _combine(n, block_vars, columns[:n_cols], res.x)
+        z = sum(cj * xj for cj, xj in zip(model.c, x)) if feasible else float("nan")
+        return LPSolution(status="ITERATION_LIMIT", x=x, objective_value=z, iterations=max_iter,
+                          message=f"Dantzig-Wolfe alcanzo max_iter={max_iter} (gap={gap}).",
+                          method_used="dantzig_wolfe", extra=extra)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+
+def _build_master(
+    c_max: List[float],
+    link_cons: List[Constraint],
+    block_vars: List[List[int]],
+    columns: List[Tuple[int, List[float]]],
+    M: float,
+) -> Tuple[LPModel, int]:
+    # Maestro restringido: lambdas por columna + artificiales penalizadas (-M)
+    # Orden de variables: [lambdas..., artificiales...]
+    L, K = len(link_cons), len(block_vars)
+    cost: List[float] = []
+    rows: List[List[float]] = [[] for _ in range(L + K)]
+    for k, xk in columns:
+        blk = block_vars[k]
+        cost.append(sum(c_max[j] * v for j, v in zip(blk, xk)))
+        for r, cst in enumerate(link_cons):
+            rows[r].append(sum(cst.a[j] * v for j, v in zip(blk, xk)))
+        for q in range(K):
+            rows[L + q].append(1.0 if q == k else 0.0)
+
+    # Artificiales: permiten factibilidad inicial de las filas de enlace
+    n_art = 0
+    for r, cst in enumerate(link_cons):
+        signs = {"<=": [-1.0], ">=": [1.0], "=": [1.0, -1.0]}[cst.op]
+        for s in signs:
+            cost.append(-M)
+            for rr in range(L + K):
+                rows[rr].append(s if rr == r else 0.0)
+            n_art += 1
+
+    constraints = [Constraint(a=rows[r], op=link_cons[r].op, b=link_cons[r].b) for r in range(L)]
+    constraints += [Constraint(a=rows[L + q], op="=", b=1.0) for q in range(K)]
+    return LPModel(name="DW-master", sense="max", c=cost, constraints=constraints), n_art
+
+
+def _combine(
+    n: int,
+    block_vars: List[List[int]],
+    columns: List[Tuple[int, List[float]]],
+    lambdas: List[float],
+) -> List[float]:
+    # x = sum_k sum_p lambda_p * x_p (combinacion convexa por bloque)
+    x = [0.0] * n
+    for (k, xk), lam in zip(columns, lambdas):
+        if abs(lam) <= EPS:
+            continue
+        for j, v in zip(block_vars[k], xk):
+            x[j] += lam * v
+    return x
@@ -103,3 +103,29 @@ def build_dual(primal: LPModel) -> Tuple[LPModel, dict]:
         "note": "y_i libres se representan como y_i = y_i^+ - y_i^- (ambas >=0)."
     }
     return dual_model, mapping_info
+
+
+def dual_values(primal: LPModel) -> List[float]:
+    """
+    Valores duales (precios sombra) de las restricciones del primal.
+
+    Resuelve el dual construido por ``build_dual`` con Two-Phase y deshace la
+    expansion de variables (y_i = sum signo * y'_k). Si una restriccion tenia
+    b < 0 fue normalizada (multiplicada por -1), asi que su dual cambia de signo.
+
+    Convencion: para primal MAX el costo reducido de x_j es c_j - A_j^T y
+    (<= 0 en el optimo); para primal MIN es c_j - A_j^T y (>= 0 en el optimo).
+    """
+    # Import local para evitar ciclo dual <-> two_phase
+    from .two_phase import solve_two_phase
+
+    dual_model, mapping = build_dual(primal)
+    res = solve_two_phase(dual_model)
+    if res.status != "OPTIMAL":
+        raise ValueError(f"El dual no tiene optimo ({res.status}); no hay precios sombra.")
+
+    y: List[float] = []
+    for i, cst in enumerate(primal.constraints):
+        val = sum(sign * res.x[k] for (k, sign) in mapping["per_constraint_map"][i])
+        y.append(-val if cst.b < 0 else val)
+    return y
@@ -25,7 +25,7 @@ class LPModel:
 @dataclass
 class LPSolution:
     # Contenedor estandar de la solucion retornada por los solvers
-    status: str  # "OPTIMAL" | "INFEASIBLE" | "UNBOUNDED"
+    status: str  # "OPTIMAL" | "INFEASIBLE" | "UNBOUNDED" | "ITERATION_LIMIT" (Dantzig-Wolfe)
     x: List[float]
     objective_value: float
     iterations: int
@@ -0,0 +1,310 @@
+from __future__ import annotations
+
+import heapq
+import io
+import sys
+from array import array
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, List, Union
+
+from .errors import NegativeCycleError
+from .graph import CompiledGraph, as_graph
+from .model import NetworkModel
+
+try:  # NumPy is optional: without it Floyd–Warshall runs row by row in pure Python
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
+# Diagonal tile size of the blocked Floyd–Warshall.
+DEFAULT_BLOCK = 64
+# Rough cap (bytes) of the temporary min-plus tensor built per row chunk.
+CHUNK_BYTES = 32 * 1024 * 1024
+# "auto" uses Floyd–Warshall (with NumPy) when arcs >= this fraction of n^2.
+AUTO_DENSE_FRACTION = 0.05
+
+
+@dataclass
+class AllPairsResult:
+    """All-pairs distances (row = origin, column = destination) in ``names`` order.
+
+    ``dist`` is a NumPy ``(n, n)`` float64 array when Floyd–Warshall ran with NumPy, otherwise a
+    flat row-major ``array('d')``; ``pred`` (optional) has the same layout with int64 values:
+    ``pred[i, j]`` is the node before ``j`` on a shortest ``i -> j`` path (``-1`` if none).
+    """
+
+    names: List[str]
+    dist: Any
+    pred: Any = None
+    algorithm: str = ""
+    index: dict = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.index = {name: i for i, name in enumerate(self.names)}
+
+    @property
+    def n(self) -> int:
+        return len(self.names)
+
+    def _at(self, mat: Any, i: int, j: int) -> Any:
+        return mat[i, j] if np is not None and isinstance(mat, np.ndarray) else mat[i * self.n + j]
+
+    def distance(self, u: str, v: str) -> float:
+        return float(self._at(self.dist, self.index[u], self.index[v]))
+
+    def path(self, u: str, v: str) -> List[str]:
+        if self.pred is None:
+            raise ValueError("Paths need predecessors (predecessors=True)")
+        i, j = self.index[u], self.index[v]
+        if i == j:
+            return [u]
+        if self._at(self.dist, i, j) == float("inf"):
+            return []
+        out = [j]
+        while out[-1] != i:
+            out.append(int(self._at(self.pred, i, out[-1])))
+        return [self.names[x] for x in reversed(out)]
+
+    def rows(self, which: str = "dist") -> List[List[float]]:
+        mat = self.dist if which == "dist" else self.pred
+        if np is not None and isinstance(mat, np.ndarray):
+            return mat.tolist()
+        n = self.n
+        return [list(mat[i * n:(i + 1) * n]) for i in range(n)]
+
+    def to_npy_bytes(self, which: str = "dist") -> bytes:
+        """Matrix as the bytes of a ``.npy`` file (loadable with ``numpy.load``)."""
+        mat = self.dist if which == "dist" else self.pred
+        if mat is None:
+            raise ValueError(f"No '{which}' matrix")
+        if np is not None and isinstance(mat, np.ndarray):
+            buf = io.BytesIO()
+            np.save(buf, mat)
+            return buf.getvalue()
+        return _npy_bytes(mat, (self.n, self.n))
+
+
+def _npy_bytes(flat: array, shape: tuple) -> bytes:
+    # NPY format 1.0: magic, version, little-endian header length, padded dict header, raw data
+    descr = {"d": "<f8", "q": "<i8"}[flat.typecode]
+    header = "{'descr': '%s', 'fortran_order': False, 'shape': (%s), }" % (
+        descr,
+        ", ".join(str(s) for s in shape) + ("," if len(shape) == 1 else ""),
+    )
+    pad = 64 - (10 + len(header) + 1) % 64
+    header_bytes = (header + " " * (pad % 64) + "\n").encode("latin1")
+    data = array(flat.typecode, flat)
+    if sys.byteorder == "big":
+        data.byteswap()
+    return b"\x93NUMPY\x01\x00" + len(header_bytes).to_bytes(2, "little") + header_bytes + data.tobytes()
+
+
+def choose_apsp_algorithm(g: CompiledGraph) -> str:
+    if np is None or g.n == 0:
+        return "johnson"
+    if any(w < 0 for w in g.weight) or g.m < AUTO_DENSE_FRACTION * g.n * g.n:
+        return "johnson"
+    return "floyd_warshall"
+
+
+def all_pairs_shortest_paths(
+    model: Union[NetworkModel, CompiledGraph],
+    algorithm: str = "auto",
+    predecessors: bool = False,
+) -> AllPairsResult:
+    """All-pairs shortest paths on ``edge.weight``.
+
+    ``floyd_warshall`` (blocked min-plus on NumPy, row-by-row without it) or ``johnson``
+    (Bellman–Ford reweighting + one Dijkstra per source). ``auto`` picks Floyd–Warshall for
+    dense graphs with non-negative weights when NumPy is available, Johnson otherwise.
+    Raises ``NegativeCycleError`` on a negative cycle.
+    """
+    g = as_graph(model)
+    if algorithm == "auto":
+        algorithm = choose_apsp_algorithm(g)
+    if algorithm == "floyd_warshall":
+        return floyd_warshall(g, predecessors)
+    if algorithm == "johnson":
+        return johnson(g, predecessors)
+    raise ValueError(f"Unknown all-pairs algorithm: {algorithm}")
+
+
+def floyd_warshall(
+    model: Union[NetworkModel, CompiledGraph],
+    predecessors: bool = False,
+    block: int = DEFAULT_BLOCK,
+) -> AllPairsResult:
+    """Floyd–Warshall. With NumPy, a blocked variant: for each block ``K`` of ``block``
+    intermediate nodes, the rows and columns of ``K`` are closed first (``k`` by ``k``), then the
+    rest of the matrix gets one min-plus product ``D[:, K] (x) D[K, :]`` computed in row chunks.
+    """
+    g = as_graph(model)
+    if np is not None:
+        dist, pred = _fw_numpy(g, predecessors, max(1, block))
+    else:
+        dist, pred = _fw_python(g, predecessors)
+    return AllPairsResult(g.names, dist, pred, "floyd_warshall")
+
+
+def _fw_numpy(g: CompiledGraph, predecessors: bool, block: int):
+    n = g.n
+    D = np.full((n, n), np.inf)
+    tail = np.frombuffer(g.tail, dtype=np.int64) if g.tail.itemsize == 8 else np.array(g.tail, dtype=np.int64)
+    head = np.frombuffer(g.head, dtype=np.int64) if g.head.itemsize == 8 else np.array(g.head, dtype=np.int64)
+    weight = np.array(g.weight, dtype=np.float64)
+    # Parallel arcs: keep the lightest one
+    np.minimum.at(D, (tail, head), weight)
+    diag = np.arange(n)
+    D[diag, diag] = np.minimum(D[diag, diag], 0.0)
+    P = None
+    if predecessors:
+        P = np.where(np.isfinite(D), np.arange(n)[:, None], -1).astype(np.int64)
+        P[diag, diag] = -1
+
+    cols = np.arange(n)
+    for kb in range(0, n, block):
+        ke = min(n, kb + block)
+        # Close the cross (rows and columns kb..ke) with plain Floyd–Warshall steps
+        for k in range(kb, ke):
+            cand = D[kb:ke, k, None] + D[None, k, :]
+            mask = cand < D[kb:ke]
+            if mask.any():
+                D[kb:ke][mask] = cand[mask]
+                if P is not None:
+                    P[kb:ke][mask] = np.broadcast_to(P[k], mask.shape)[mask]
+            cand = D[:, k, None] + D[None, k, kb:ke]
+            mask = cand < D[:, kb:ke]
+            if mask.any():
+                D[:, kb:ke][mask] = cand[mask]
+                if P is not None:
+                    P[:, kb:ke][mask] = np.broadcast_to(P[k, kb:ke], mask.shape)[mask]
+        # Min-plus update of the whole matrix through the block
+        DK = D[:, kb:ke]
+        KD = D[kb:ke, :]
+        PK = P[kb:ke, :] if P is not None else None
+        b = ke - kb
+        rows = max(1, CHUNK_BYTES // (8 * b * max(1, n)))
+        for r0 in range(0, n, rows):
+            r1 = min(n, r0 + rows)
+            cand = DK[r0:r1, :, None] + KD[None, :, :]
+            if P is None:
+                np.minimum(D[r0:r1], cand.min(axis=1), out=D[r0:r1])
+                continue
+            arg = cand.argmin(axis=1)
+            best = np.take_along_axis(cand, arg[:, None, :], axis=1)[:, 0, :]
+            mask = best < D[r0:r1]
+            D[r0:r1][mask] = best[mask]
+            P[r0:r1][mask] = PK[arg, cols[None, :]][mask]
+
+    if n and (np.diagonal(D) < 0).any():
+        raise NegativeCycleError("Negative cycle detected")
+    return D, P
+
+
+def _fw_python(g: CompiledGraph, predecessors: bool):
+    n = g.n
+    inf = float("inf")
+    D = [[inf] * n for _ in range(n)]
+    P = [[-1] * n for _ in range(n)] if predecessors else None
+    for a in range(g.m):
+        u, v, w = g.tail[a], g.head[a], g.weight[a]
+        if w < D[u][v]:
+            D[u][v] = w
+            if P is not None:
+                P[u][v] = u
+    for i in range(n):
+        if D[i][i] > 0:
+            D[i][i] = 0.0
+            if P is not None:
+                P[i][i] = -1
+
+    for k in range(n):
+        Dk = D[k]
+        Pk = P[k] if P is not None else None
+        for i in range(n):
+            dik = D[i][k]
+            if dik == inf or i == k:
+                continue
+            Di = D[i]
+            if Pk is None:
+                D[i] = [a if a <= dik + b else dik + b for a, b in zip(Di, Dk)]
+                continue
+            Pi = P[i]
+            for j in range(n):
+                c = dik + Dk[j]
+                if c < Di[j]:
+                    Di[j] = c
+                    Pi[j] = Pk[j]
+
+    if any(D[i][i] < 0 for i in range(n)):
+        raise NegativeCycleError("Negative cycle detected")
+    dist = array("d", (x for row in D for x in row))
+    pred = array("q", (x for row in P for x in row)) if P is not None else None
+    return dist, pred
+
+
+def _johnson_potentials(g: CompiledGraph) -> List[float]:
+    # Queue-based Bellman–Ford from a virtual source joined to every node with weight 0
+    n = g.n
+    h = [0.0] * n
+    if all(w >= 0 for w in g.weight):
+        return h
+    out_start, head, weight = g.out_start, g.head, g.weight
+    passes = [0] * n
+    queued = [True] * n
+    q = deque(range(n))
+    while q:
+        u = q.popleft()
+        queued[u] = False
+        passes[u] += 1
+        if passes[u] > n:
+            raise NegativeCycleError("Negative cycle detected")
+        hu = h[u]
+        for a in range(out_start[u], out_start[u + 1]):
+            v = head[a]
+            if hu + weight[a] < h[v]:
+                h[v] = hu + weight[a]
+                if not queued[v]:
+                    queued[v] = True
+                    q.append(v)
+    return h
+
+
+def johnson(model: Union[NetworkModel, CompiledGraph], predecessors: bool = False) -> AllPairsResult:
+    """Johnson: Bellman–Ford potentials ``h``, then one Dijkstra per source on the non-negative
+    weights ``w(u, v) + h(u) - h(v)``; distances are mapped back with ``- h(s) + h(v)``.
+    """
+    g = as_graph(model)
+    n = g.n
+    h = _johnson_potentials(g)
+    out_start, head, weight = g.out_start, g.head, g.weight
+    rw = [weight[a] + h[g.tail[a]] - h[head[a]] for a in range(g.m)]
+    inf = float("inf")
+    dist = array("d", [inf]) * (n * n)
+    pred = array("q", [-1]) * (n * n) if predecessors else None
+
+    for s in range(n):
+        d = [inf] * n
+        prev = [-1] * n
+        d[s] = 0.0
+        pq = [(0.0, s)]
+        while pq:
+            du, u = heapq.heappop(pq)
+            if du != d[u]:
+                continue
+            for a in range(out_start[u], out_start[u + 1]):
+                v = head[a]
+                nd = du + rw[a]
+                if nd < d[v]:
+                    d[v] = nd
+                    prev[v] = u
+                    heapq.heappush(pq, (nd, v))
+        base = s * n
+        hs = h[s]
+        for v in range(n):
+            if d[v] < inf:
+                dist[base + v] = d[v] - hs + h[v]
+        if pred is not None:
+            pred[base:base + n] = array("q", prev)
+    return AllPairsResult(g.names, dist, pred, "johnson")
@@ -0,0 +1,381 @@
+from __future__ import annotations
+
+import heapq
+import json
+import math
+import sys
+from array import array
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from .errors import NetworkModelError
+from .graph import CompiledGraph, as_graph
+from .model import NetworkModel
+
+# Witness searches give up (and keep the shortcut) after settling this many nodes.
+WITNESS_SETTLE_LIMIT = 200
+# Same cap while estimating priorities (simulated contractions).
+PRIORITY_SETTLE_LIMIT = 30
+
+FORMAT_VERSION = 1
+
+
+class ContractionHierarchy:
+    """Contraction hierarchy for repeated point-to-point shortest-path queries on ``edge.weight``.
+
+    Nodes are contracted in ``rank`` order. The hierarchy keeps two CSR arc sets, both pointing
+    to higher-ranked nodes:
+
+    - ``up``: arcs ``u -> v`` with ``rank[v] > rank[u]`` (searched forward from the source);
+    - ``down``: arcs ``v -> u`` stored at ``u`` with ``rank[v] > rank[u]`` (searched backward
+      from the target).
+
+    Every arc has a weight and a ``mid`` node (``-1`` for an original arc, otherwise the
+    contracted node the shortcut bypasses), which is enough to unpack paths.
+    """
+
+    def __init__(
+        self,
+        names: List[str],
+        rank: List[int],
+        up: Tuple[List[int], List[int], List[float], List[int]],
+        down: Tuple[List[int], List[int], List[float], List[int]],
+        directed: bool = True,
+    ) -> None:
+        self.names = list(names)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.n = len(self.names)
+        self.rank = array("l", rank)
+        self.directed = directed
+        self.up_start, self.up_head, self.up_weight, self.up_mid = (
+            array("l", up[0]), array("l", up[1]), array("d", up[2]), array("l", up[3])
+        )
+        self.down_start, self.down_head, self.down_weight, self.down_mid = (
+            array("l", down[0]), array("l", down[1]), array("d", down[2]), array("l", down[3])
+        )
+
+    @property
+    def num_arcs(self) -> int:
+        return len(self.up_head) + len(self.down_head)
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held: the typed arc arrays, the name strings and their index."""
+        arrays = (self.rank, self.up_start, self.up_head, self.up_weight, self.up_mid,
+                  self.down_start, self.down_head, self.down_weight, self.down_mid)
+        total = sys.getsizeof(self) + sum(a.buffer_info()[1] * a.itemsize for a in arrays)
+        total += sys.getsizeof(self.names) + sys.getsizeof(self.index) + sum(map(sys.getsizeof, self.names))
+        # One int object per index value beyond the small-int cache
+        return total + 28 * max(0, self.n - 257)
+
+    def node(self, name: str) -> int:
+        try:
+            return self.index[name]
+        except KeyError:
+            raise NetworkModelError(f"Unknown node: {name}") from None
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    def distance(self, source: str, target: str) -> float:
+        return self._search(self.node(source), self.node(target))[0]
+
+    def query(
+        self, source: str, target: str, stats: Optional[Dict[str, Any]] = None
+    ) -> Tuple[float, List[str]]:
+        """Shortest ``source -> target`` distance and unpacked node path (``(inf, [])`` if none)."""
+        s, t = self.node(source), self.node(target)
+        mu, meet, prev_f, prev_b, settled = self._search(s, t)
+        if stats is not None:
+            stats["settled"] = settled
+        if meet < 0:
+            return mu, []
+        # Upward arcs s ... meet, then the backward tree meet ... t
+        nodes = [meet]
+        x = meet
+        while prev_f[x][0] != -1:
+            p, mid = prev_f[x]
+            nodes[:0] = self._unpack(p, x, mid)[:-1]
+            x = p
+        x = meet
+        while prev_b[x][0] != -1:
+            p, mid = prev_b[x]
+            nodes.extend(self._unpack(x, p, mid)[1:])
+            x = p
+        return mu, [self.names[v] for v in nodes]
+
+    def _search(self, s: int, t: int):
+        # Bidirectional upward Dijkstra; each side stops once its smallest key reaches mu
+        inf = float("inf")
+        dist = ({s: 0.0}, {t: 0.0})
+        prev: Tuple[Dict[int, Tuple[int, int]], Dict[int, Tuple[int, int]]] = ({s: (-1, -1)}, {t: (-1, -1)})
+        heaps: Tuple[List[Tuple[float, int]], List[Tuple[float, int]]] = ([(0.0, s)], [(0.0, t)])
+        arcs = (
+            (self.up_start, self.up_head, self.up_weight, self.up_mid),
+            (self.down_start, self.down_head, self.down_weight, self.down_mid),
+        )
+        mu, meet = (0.0, s) if s == t else (inf, -1)
+        settled = 0
+        while True:
+            side = -1
+            for k in (0, 1):
+                h = heaps[k]
+                if h and h[0][0] < mu and (side < 0 or h[0][0] < heaps[side][0][0]):
+                    side = k
+            if side < 0:
+                break
+            d, u = heapq.heappop(heaps[side])
+            my_dist = dist[side]
+            if d > my_dist[u]:
+                continue
+            settled += 1
+            other = dist[1 - side]
+            if u in other and d + other[u] < mu:
+                mu, meet = d + other[u], u
+            start, head, weight, mid = arcs[side]
+            my_prev = prev[side]
+            for i in range(start[u], start[u + 1]):
+                v = head[i]
+                nd = d + weight[i]
+                if nd < my_dist.get(v, inf):
+                    my_dist[v] = nd
+                    my_prev[v] = (u, mid[i])
+                    heapq.heappush(heaps[side], (nd, v))
+        return mu, meet, prev[0], prev[1], settled
+
+    def _arc_mid(self, u: int, v: int) -> int:
+        # Cheapest hierarchy arc u -> v and its middle node
+        best, mid = float("inf"), -1
+        if self.rank[v] > self.rank[u]:
+            start, head, weight, mids, x, y = self.up_start, self.up_head, self.up_weight, self.up_mid, u, v
+        else:
+            start, head, weight, mids, x, y = self.down_start, self.down_head, self.down_weight, self.down_mid, v, u
+        for i in range(start[x], start[x + 1]):
+            if head[i] == y and weight[i] < best:
+                best, mid = weight[i], mids[i]
+        return mid
+
+    def _unpack(self, u: int, v: int, mid: int) -> List[int]:
+        # Expand arc u -> v (with middle node ``mid``) into original nodes, iteratively
+        out = [u]
+        stack = [(u, v, mid)]
+        while stack:
+            a, b, m = stack.pop()
+            if m < 0:
+                out.append(b)
+                continue
+            stack.append((m, b, self._arc_mid(m, b)))
+            stack.append((a, m, self._arc_mid(a, m)))
+        return out
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "format": "contraction_hierarchy",
+            "version": FORMAT_VERSION,
+            "directed": self.directed,
+            "names": self.names,
+            "rank": list(self.rank),
+            "up": [list(self.up_start), list(self.up_head), list(self.up_weight), list(self.up_mid)],
+            "down": [list(self.down_start), list(self.down_head), list(self.down_weight), list(self.down_mid)],
+        }
+
+    @staticmethod
+    def from_dict(d: Dict[str, Any]) -> "ContractionHierarchy":
+        """Hierarchy from ``to_dict`` output, checked with ``validate`` (the data may come from
+        outside: a bad ``mid`` would make path unpacking loop forever)."""
+        if not isinstance(d, dict) or d.get("format") != "contraction_hierarchy" or d.get("version") != FORMAT_VERSION:
+            raise ValueError("Not a contraction hierarchy file (or unsupported version)")
+        try:
+            names, rank, up, down = d["names"], d["rank"], d["up"], d["down"]
+            if not isinstance(names, list) or not all(isinstance(x, str) for x in names):
+                raise ValueError("'names' must be a list of strings")
+            if len(up) != 4 or len(down) != 4:
+                raise ValueError("'up' and 'down' must be [start, head, weight, mid]")
+            ch = ContractionHierarchy(names, rank, tuple(up), tuple(down), directed=bool(d.get("directed", True)))
+        except (KeyError, TypeError, OverflowError) as exc:
+            raise ValueError(f"Malformed contraction hierarchy: {exc!r}") from None
+        ch.validate()
+        return ch
+
+    def validate(self) -> None:
+        """Raise ``ValueError`` unless the arrays describe a hierarchy that queries can trust:
+        unique names, ``rank`` a permutation, CSR offsets monotonic and in range, heads in
+        range and ranked above their tail, finite non-negative weights, and every shortcut's
+        ``mid`` ranked below both endpoints (so unpacking always terminates)."""
+        n, rank = self.n, self.rank
+        if len(self.index) != n:
+            raise ValueError("Duplicate node names")
+        if len(rank) != n or sorted(rank) != list(range(n)):
+            raise ValueError("'rank' must be a permutation of the node indices")
+        for side, (start, head, weight, mid) in (
+            ("up", (self.up_start, self.up_head, self.up_weight, self.up_mid)),
+            ("down", (self.down_start, self.down_head, self.down_weight, self.down_mid)),
+        ):
+            m = len(head)
+            if len(start) != n + 1 or len(weight) != m or len(mid) != m:
+                raise ValueError(f"'{side}': array lengths do not match the node / arc counts")
+            if start[0] != 0 or start[n] != m or any(start[u] > start[u + 1] for u in range(n)):
+                raise ValueError(f"'{side}': CSR offsets must grow from 0 to the arc count")
+            for u in range(n):
+                ru = rank[u]
+                for i in range(start[u], start[u + 1]):
+                    v, x = head[i], mid[i]
+                    if not 0 <= v < n or rank[v] <= ru:
+                        raise ValueError(f"'{side}': arc {i} must point to a higher-ranked node")
+                    w = weight[i]
+                    if not (w >= 0 and math.isfinite(w)):
+                        raise ValueError(f"'{side}': arc {i} needs a finite non-negative weight")
+                    if x != -1 and not (0 <= x < n and rank[x] < ru):
+                        raise ValueError(f"'{side}': shortcut {i} must bypass a lower-ranked node")
+
+    def save(self, path: Union[str, Path]) -> None:
+        Path(path).write_text(json.dumps(self.to_dict(), separators=(",", ":")), encoding="utf-8")
+
+    @staticmethod
+    def load(path: Union[str, Path]) -> "ContractionHierarchy":
+        return ContractionHierarchy.from_dict(json.loads(Path(path).read_text(encoding="utf-8")))
+
+
+def build_contraction_hierarchy(
+    model: Union[NetworkModel, CompiledGraph],
+    stats: Optional[Dict[str, Any]] = None,
+    witness_limit: int = WITNESS_SETTLE_LIMIT,
+) -> ContractionHierarchy:
+    """Preprocess ``edge.weight`` (non-negative) into a ``ContractionHierarchy``.
+
+    Nodes are contracted lazily by priority ``edge difference + contracted neighbours``
+    (shortcuts added minus arcs removed). Contracting ``u`` adds a shortcut ``x -> y`` for an
+    in-neighbour ``x`` and out-neighbour ``y`` unless a witness path avoiding ``u`` is at most as
+    short (local Dijkstra, capped at ``witness_limit`` settled nodes).
+    """
+    g = as_graph(model)
+    n = g.n
+    # Remaining graph: out_adj[u][v] = (weight, mid), in_adj[v][u] = same arc
+    out_adj: List[Dict[int, Tuple[float, int]]] = [{} for _ in range(n)]
+    in_adj: List[Dict[int, Tuple[float, int]]] = [{} for _ in range(n)]
+    for a in range(g.m):
+        u, v, w = g.tail[a], g.head[a], g.weight[a]
+        if w < 0:
+            raise ValueError("Contraction hierarchies require non-negative weights")
+        if u != v and w < out_adj[u].get(v, (float("inf"), -1))[0]:
+            out_adj[u][v] = (w, -1)
+            in_adj[v][u] = (w, -1)
+
+    contracted = [False] * n
+    deleted_neighbours = [0] * n
+
+    def witness_distances(x: int, skip: int, bound: float, targets: int, limit: int) -> Dict[int, float]:
+        # Dijkstra from x avoiding ``skip``; stops past ``bound``, after ``limit`` settled nodes
+        # or once all ``targets`` out-neighbours of ``skip`` (other than x) are settled
+        dist = {x: 0.0}
+        pq = [(0.0, x)]
+        settled = 0
+        outs = out_adj[skip]
+        while pq:
+            d, u = heapq.heappop(pq)
+            if d > dist[u]:
+                continue
+            if d > bound or settled >= limit:
+                break
+            settled += 1
+            if u in outs and u != x:
+                targets -= 1
+                if targets == 0:
+                    break
+            for v, (w, _) in out_adj[u].items():
+                if v == skip:
+                    continue
+                nd = d + w
+                if nd < dist.get(v, float("inf")):
+                    dist[v] = nd
+                    heapq.heappush(pq, (nd, v))
+        return dist
+
+    def shortcuts(u: int, limit: int = witness_limit) -> List[Tuple[int, int, float]]:
+        needed = []
+        outs = out_adj[u]
+        if not outs:
+            return needed
+        max_out = max(w for w, _ in outs.values())
+        for x, (wx, _) in in_adj[u].items():
+            targets = len(outs) - (x in outs)
+            if not targets:
+                continue
+            dist = witness_distances(x, u, wx + max_out, targets, limit)
+            for y, (wy, _) in outs.items():
+                if y != x and dist.get(y, float("inf")) > wx + wy:
+                    needed.append((x, y, wx + wy))
+        return needed
+
+    level = [0] * n
+
+    def priority(u: int) -> int:
+        # Simulated contraction uses a cheaper witness search than the real one
+        return len(shortcuts(u, min(witness_limit, PRIORITY_SETTLE_LIMIT))) - len(in_adj[u]) - len(out_adj[u]) + deleted_neighbours[u] + level[u]
+
+    current = [priority(u) for u in range(n)]
+    pq = [(p, u) for u, p in enumerate(current)]
+    heapq.heapify(pq)
+    rank = [0] * n
+    up: List[List[Tuple[int, float, int]]] = [[] for _ in range(n)]
+    down: List[List[Tuple[int, float, int]]] = [[] for _ in range(n)]
+    added = 0
+    order = 0
+    while pq:
+        p, u = heapq.heappop(pq)
+        if contracted[u] or p != current[u]:
+            continue
+        # Lazy update: re-evaluate and postpone if it is no longer the minimum
+        p = priority(u)
+        if pq and p > pq[0][0]:
+            current[u] = p
+            heapq.heappush(pq, (p, u))
+            continue
+
+        for x, y, w in shortcuts(u):
+            if w < out_adj[x].get(y, (float("inf"), -1))[0]:
+                out_adj[x][y] = (w, u)
+                in_adj[y][x] = (w, u)
+                added += 1
+
+        rank[u] = order
+        order += 1
+        contracted[u] = True
+        # Arcs to remaining nodes become hierarchy arcs (all neighbours rank higher)
+        for v, (w, mid) in out_adj[u].items():
+            up[u].append((v, w, mid))
+            del in_adj[v][u]
+            deleted_neighbours[v] += 1
+        for x, (w, mid) in in_adj[u].items():
+            down[u].append((x, w, mid))
+            del out_adj[x][u]
+            deleted_neighbours[x] += 1
+        out_adj[u] = {}
+        in_adj[u] = {}
+        # Neighbours' priorities changed: refresh them
+        for v in {v for v, _, _ in up[u]} | {x for x, _, _ in down[u]}:
+            level[v] = max(level[v], level[u] + 1)
+            current[v] = priority(v)
+            heapq.heappush(pq, (current[v], v))
+
+    if stats is not None:
+        stats["shortcuts"] = added
+        stats["arcs"] = sum(len(a) for a in up) + sum(len(a) for a in down)
+
+    def to_csr(lists: List[List[Tuple[int, float, int]]]) -> Tuple[List[int], List[int], List[float], List[int]]:
+        start = [0]
+        heads: List[int] = []
+        weights: List[float] = []
+        mids: List[int] = []
+        for arcs in lists:
+            for v, w, mid in arcs:
+                heads.append(v)
+                weights.append(w)
+                mids.append(mid)
+            start.append(len(heads))
+        return start, heads, weights, mids
+
+    return ContractionHierarchy(g.names, rank, to_csr(up), to_csr(down), directed=g.directed)
@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from .graph import CompiledGraph, as_graph
+from .model import NetworkModel
+from .shortest_path import _label_dicts
+
+
+def is_dag(model: Union[NetworkModel, CompiledGraph]) -> bool:
+    """True if the (directed) arcs have no cycle. The order is cached on the compiled graph."""
+    return as_graph(model).topological_order is not None
+
+
+def dag_shortest_path(
+    model: Union[NetworkModel, CompiledGraph],
+    source: str,
+    target: str,
+    stats: Optional[Dict[str, Any]] = None,
+    longest: bool = False,
+) -> Tuple[Dict[str, float], Dict[str, Optional[str]]]:
+    """Shortest (``longest=True``: longest) paths from ``source`` in an acyclic graph.
+
+    Every arc is relaxed once, in topological order: O(V + E), no priority queue, and any
+    weights (negative ones included). The scan starts at ``source``'s position in the order
+    and stops at ``target``, whose label is final by then. Same contract as ``dijkstra``;
+    unreachable nodes keep ``inf`` (``-inf`` for longest paths). ``stats["settled"]`` counts
+    the reached nodes scanned.
+    """
+    g = as_graph(model)
+    order = g.topological_order
+    if order is None:
+        raise ValueError("DAG paths require an acyclic directed graph (the graph has a cycle)")
+    s, t = g.node(source), g.node(target)
+    out_start, head, weight = g.out_start, g.head, g.weight
+
+    # Longest paths are shortest paths on negated weights
+    sign = -1.0 if longest else 1.0
+    inf = float("inf")
+    dist = [inf] * g.n
+    prev = [-1] * g.n
+    dist[s] = 0.0
+    settled = 0
+    pos = order.index(s)
+    for i in range(pos, g.n):
+        u = order[i]
+        d = dist[u]
+        if d == inf:
+            continue
+        settled += 1
+        if u == t:
+            break
+        for a in range(out_start[u], out_start[u + 1]):
+            v = head[a]
+            nd = d + sign * weight[a]
+            if nd < dist[v]:
+                dist[v] = nd
+                prev[v] = u
+
+    if stats is not None:
+        stats["settled"] = settled
+    if longest:
+        dist = [-d for d in dist]
+    return _label_dicts(g, dist, prev)
+
+
+# ----------------------------------------------------------------------
+# Project scheduling (CPM / PERT), activity-on-node
+# ----------------------------------------------------------------------
+@dataclass
+class Activity:
+    """A project activity.
+
+    Either a fixed ``duration`` or a PERT three-point estimate (``optimistic``,
+    ``most_likely``, ``pessimistic``), whose expected duration ``(a + 4m + b) / 6`` and
+    variance ``((b - a) / 6)^2`` are used instead.
+    """
+
+    name: str
+    duration: float = 0.0
+    predecessors: List[str] = field(default_factory=list)
+    optimistic: Optional[float] = None
+    most_likely: Optional[float] = None
+    pessimistic: Optional[float] = None
+
+    def estimate(self) -> Tuple[float, float]:
+        """``(expected duration, variance)``."""
+        a, m, b = self.optimistic, self.most_likely, self.pessimistic
+        if a is None and m is None and b is None:
+            if self.duration < 0:
+                raise ValueError(f"Activity {self.name}: duration must be non-negative")
+            return float(self.duration), 0.0
+        if a is None or m is None or b is None:
+            raise ValueError(f"Activity {self.name}: PERT needs optimistic, most_likely and pessimistic")
+        if not 0 <= a <= m <= b:
+            raise ValueError(f"Activity {self.name}: expected 0 <= optimistic <= most_likely <= pessimistic")
+        return (a + 4 * m + b) / 6, ((b - a) / 6) ** 2
+
+
+@dataclass
+class ProjectSchedule:
+    """CPM times per activity (``names[i]``) plus the critical path.
+
+    ``project_variance`` is the PERT variance summed along ``critical_path`` (the longest path;
+    among equally long ones, the one with the largest variance).
+    """
+
+    names: List[str]
+    duration: List[float]
+    variance: List[float]
+    es: List[float]
+    ef: List[float]
+    ls: List[float]
+    lf: List[float]
+    slack: List[float]
+    critical: List[bool]
+    project_duration: float
+    project_variance: float
+    critical_path: List[str]
+
+    def completion_probability(self, deadline: float) -> float:
+        """P(project finishes by ``deadline``) under PERT's normal approximation."""
+        if self.project_variance <= 0:
+            return 1.0 if deadline >= self.project_duration else 0.0
+        z = (deadline - self.project_duration) / math.sqrt(self.project_variance)
+        return 0.5 * (1.0 + math.erf(z / math.sqrt(2.0)))
+
+
+def critical_path_method(
+    activities: Sequence[Activity], stats: Optional[Dict[str, Any]] = None
+) -> ProjectSchedule:
+    """CPM / PERT schedule of an activity-on-node project in O(V + E).
+
+    The precedences are compiled into a ``CompiledGraph`` (arc ``p -> a`` per predecessor) and
+    scanned in its topological order: a forward pass gives the earliest start/finish (and the
+    variance of the longest path into each activity), a backward pass the latest start/finish;
+    ``slack = ls - es`` and activities with zero slack are critical. ``stats["arcs"]`` receives
+    the number of precedence arcs.
+    """
+    names = [a.name for a in activities]
+    index = {name: i for i, name in enumerate(names)}
+    if len(index) != len(names):
+        raise ValueError("Activity names must be unique")
+    eu: List[int] = []
+    ev: List[int] = []
+    for i, act in enumerate(activities):
+        for p in act.predecessors:
+            if p not in index:
+                raise ValueError(f"Activity {act.name}: unknown predecessor {p}")
+            eu.append(index[p])
+            ev.append(i)
+    zeros = [0.0] * len(eu)
+    g = CompiledGraph(names, eu, ev, zeros, zeros, zeros, directed=True)
+    order = g.topological_order
+    if order is None:
+        raise ValueError("Activity precedences contain a cycle")
+
+    n = g.n
+    estimates = [act.estimate() for act in activities]
+    dur = [d for d, _ in estimates]
+    var = [v for _, v in estimates]
+    in_start, in_arc, out_start, head, tail = g.in_start, g.in_arc, g.out_start, g.head, g.tail
+
+    # Forward pass: es = max ef of the predecessors; PERT variance follows that predecessor
+    es = [0.0] * n
+    ef = [0.0] * n
+    path_var = [0.0] * n
+    crit_pred = [-1] * n
+    for v in order:
+        best, best_var, best_u = 0.0, 0.0, -1
+        for i in range(in_start[v], in_start[v + 1]):
+            u = tail[in_arc[i]]
+            if best_u < 0 or ef[u] > best or (ef[u] == best and path_var[u] > best_var):
+                best, best_var, best_u = ef[u], path_var[u], u
+        es[v] = best
+        ef[v] = best + dur[v]
+        path_var[v] = best_var + var[v]
+        crit_pred[v] = best_u
+
+    total = max(ef, default=0.0)
+    # Backward pass: lf = min ls of the successors (the project end for the last activities)
+    lf = [total] * n
+    ls = [0.0] * n
+    for v in reversed(order):
+        for a in range(out_start[v], out_start[v + 1]):
+            w = ls[head[a]]
+            if w < lf[v]:
+                lf[v] = w
+        ls[v] = lf[v] - dur[v]
+    tol = 1e-9 * max(1.0, total)
+    slack = [s if s > tol else 0.0 for s in (ls[v] - es[v] for v in range(n))]
+
+    critical_path: List[str] = []
+    project_variance = 0.0
+    if n:
+        end = max(range(n), key=lambda v: (ef[v], path_var[v]))
+        project_variance = path_var[end]
+        v = end
+        while v >= 0:
+            critical_path.append(names[v])
+            v = crit_pred[v]
+        critical_path.reverse()
+
+    if stats is not None:
+        stats["arcs"] = g.m
+    return ProjectSchedule(
+        names=names,
+        duration=dur,
+        variance=var,
+        es=es,
+        ef=ef,
+        ls=ls,
+        lf=lf,
+        slack=slack,
+        critical=[s == 0.0 for s in slack],
+        project_duration=total,
+        project_variance=project_variance,
+        critical_path=critical_path,
+    )
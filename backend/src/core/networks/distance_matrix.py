@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import heapq
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple, Union
+
+from .graph import CompiledGraph, as_graph
+from .model import NetworkModel
+
+
+@dataclass
+class DistanceMatrix:
+    """Shortest-path distances from ``origins`` (rows) to ``destinations`` (columns).
+
+    ``values`` is a flat row-major ``array('d')`` of size ``m * n`` (``inf`` = unreachable);
+    ``routes[i][j]`` is the node path when routes were requested.
+    """
+
+    origins: List[str]
+    destinations: List[str]
+    values: array
+    routes: Optional[List[List[List[str]]]] = None
+
+    def get(self, i: int, j: int) -> float:
+        return self.values[i * len(self.destinations) + j]
+
+    def row(self, i: int) -> List[float]:
+        n = len(self.destinations)
+        return list(self.values[i * n:(i + 1) * n])
+
+    def rows(self) -> List[List[float]]:
+        return [self.row(i) for i in range(len(self.origins))]
+
+
+def _one_to_many(
+    g: CompiledGraph, s: int, targets: Sequence[int], with_routes: bool
+) -> Tuple[List[float], Optional[List[List[str]]]]:
+    # One Dijkstra from s, stopped once every target is settled
+    out_start, head, weight = g.out_start, g.head, g.weight
+    inf = float("inf")
+    dist = [inf] * g.n
+    prev = [-1] * g.n
+    dist[s] = 0.0
+    pending = set(targets)
+    pq: List[Tuple[float, int]] = [(0.0, s)]
+    while pq and pending:
+        d, u = heapq.heappop(pq)
+        if d != dist[u]:
+            continue
+        pending.discard(u)
+        for a in range(out_start[u], out_start[u + 1]):
+            w = weight[a]
+            if w < 0:
+                raise ValueError("Distance matrix requires non-negative weights")
+            v = head[a]
+            if d + w < dist[v]:
+                dist[v] = d + w
+                prev[v] = u
+                heapq.heappush(pq, (d + w, v))
+
+    row = [dist[t] for t in targets]
+    if not with_routes:
+        return row, None
+    routes: List[List[str]] = []
+    for t in targets:
+        if dist[t] == inf:
+            routes.append([])
+            continue
+        path = [t]
+        while path[-1] != s:
+            path.append(prev[path[-1]])
+        routes.append([g.names[v] for v in reversed(path)])
+    return row, routes
+
+
+# Graph shared by the rows computed in a worker process (set once by the pool initializer).
+_WORKER_GRAPH: Optional[CompiledGraph] = None
+
+
+def _init_worker(g: CompiledGraph) -> None:
+    global _WORKER_GRAPH
+    _WORKER_GRAPH = g
+
+
+def _worker_rows(
+    task: Tuple[Sequence[int], Sequence[int], bool]
+) -> List[Tuple[List[float], Optional[List[List[str]]]]]:
+    sources, targets, with_routes = task
+    assert _WORKER_GRAPH is not None
+    return [_one_to_many(_WORKER_GRAPH, s, targets, with_routes) for s in sources]
+
+
+def distance_matrix(
+    model: Union[NetworkModel, CompiledGraph],
+    origins: Sequence[str],
+    destinations: Sequence[str],
+    workers: Optional[int] = None,
+    routes: bool = False,
+) -> DistanceMatrix:
+    """Many-to-many shortest-path distances on ``edge.weight``.
+
+    Runs one one-to-all Dijkstra per origin (stopped once all destinations are settled) instead
+    of one search per pair. With ``workers`` > 1 the origins are split into chunks and solved in
+    a process pool; the compiled graph is sent once to each worker.
+    """
+    g = as_graph(model)
+    src = [g.node(str(o)) for o in origins]
+    dst = [g.node(str(d)) for d in destinations]
+
+    if workers and workers > 1 and len(src) > 1:
+        size = max(1, -(-len(src) // (workers * 4)))
+        chunks = [src[i:i + size] for i in range(0, len(src), size)]
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(g,)) as pool:
+            results = [r for part in pool.map(_worker_rows, [(c, dst, routes) for c in chunks]) for r in part]
+    else:
+        results = [_one_to_many(g, s, dst, routes) for s in src]
+
+    values = array("d")
+    for row, _ in results:
+        values.extend(row)
+    return DistanceMatrix(
+        origins=[str(o) for o in origins],
+        destinations=[str(d) for d in destinations],
+        values=values,
+        routes=[r for _, r in results] if routes else None,
+    )
@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import heapq
+from array import array
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple, Union
+
+from .graph import CompiledGraph, as_graph
+from .model import NetworkModel
+
+
+class DynamicShortestPathTree:
+    """One-to-all shortest-path tree that follows edge-weight changes (Ramalingam–Reps style).
+
+    Keeps ``dist``, the tree arc into each node (``pred_arc``) and the tree children. After a
+    batch of weight changes only the affected part is recomputed:
+
+    - an increase on a tree arc invalidates the subtree below it; each node of that subtree is
+      re-seeded from its best in-arc coming from outside the subtree;
+    - a decrease that improves its head seeds that head;
+
+    and a Dijkstra pass propagates from the seeds, touching only nodes whose distance changes.
+    Non-tree increases cost O(1). Weights are the tree's own copy (the compiled graph is not
+    modified) and must be non-negative.
+    """
+
+    def __init__(self, model: Union[NetworkModel, CompiledGraph], source: str) -> None:
+        self.graph = g = as_graph(model)
+        self.source = source
+        self.s = g.node(source)
+        if any(w < 0 for w in g.weight):
+            raise ValueError("Dynamic shortest paths require non-negative weights")
+        self.weight = array("d", g.weight)
+        inf = float("inf")
+        self.dist: List[float] = [inf] * g.n
+        self.pred_arc: List[int] = [-1] * g.n
+        self.children: List[Set[int]] = [set() for _ in range(g.n)]
+        self.dist[self.s] = 0.0
+        self.last_update: Dict[str, Any] = {}
+        self._propagate([(0.0, self.s)])
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    def distance(self, node: str) -> float:
+        return self.dist[self.graph.node(node)]
+
+    def path(self, node: str) -> List[str]:
+        """Tree path from the source to ``node`` (empty if unreachable)."""
+        g = self.graph
+        v = g.node(node)
+        if self.dist[v] == float("inf"):
+            return []
+        out = [v]
+        while out[-1] != self.s:
+            out.append(g.tail[self.pred_arc[out[-1]]])
+        return [g.names[x] for x in reversed(out)]
+
+    def distances(self) -> Dict[str, float]:
+        return dict(zip(self.graph.names, self.dist))
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+    def set_weight(self, u: str, v: str, weight: float) -> Dict[str, Any]:
+        return self.update([(u, v, weight)])
+
+    def update(self, changes: Sequence[Tuple[str, str, float]]) -> Dict[str, Any]:
+        """Apply ``(u, v, weight)`` changes and repair the tree.
+
+        Returns (and keeps in ``last_update``) ``invalidated`` (nodes of the cut-off subtrees),
+        ``changed`` (nodes whose distance changed) and ``scanned`` (nodes relaxed).
+        """
+        g = self.graph
+        arcs = []
+        for u, v, w in changes:
+            w = float(w)
+            if w < 0:
+                raise ValueError("Dynamic shortest paths require non-negative weights")
+            arcs += [(a, w) for a in g.edge_arcs[g.find_edge(u, v)]]
+
+        dist, pred_arc, weight, tail, head = self.dist, self.pred_arc, self.weight, g.tail, g.head
+        roots = []
+        decreased = []
+        for a, w in arcs:
+            was = weight[a]
+            weight[a] = w
+            if w > was and pred_arc[head[a]] == a:
+                roots.append(head[a])
+            elif w < was:
+                decreased.append(a)
+
+        # Weight increases on tree arcs: cut off the subtrees below them
+        inf = float("inf")
+        invalid: Set[int] = set()
+        for r in roots:
+            if r in invalid:
+                continue
+            stack = [r]
+            while stack:
+                x = stack.pop()
+                if x in invalid:
+                    continue
+                invalid.add(x)
+                stack.extend(self.children[x])
+        # Previous distance of every node touched by this update
+        old: Dict[int, float] = {x: dist[x] for x in invalid}
+        for x in invalid:
+            dist[x] = inf
+            self._set_pred(x, -1)
+
+        seeds: List[Tuple[float, int]] = []
+        for x in invalid:
+            # Best way back into the tree from outside the cut-off part
+            best, best_arc = inf, -1
+            for i in range(g.in_start[x], g.in_start[x + 1]):
+                a = g.in_arc[i]
+                d = dist[tail[a]] + weight[a]
+                if d < best:
+                    best, best_arc = d, a
+            if best_arc >= 0:
+                dist[x] = best
+                self._set_pred(x, best_arc)
+                seeds.append((best, x))
+        for a in decreased:
+            y = head[a]
+            d = dist[tail[a]] + weight[a]
+            if d < dist[y]:
+                old.setdefault(y, dist[y])
+                dist[y] = d
+                self._set_pred(y, a)
+                seeds.append((d, y))
+
+        scanned = self._propagate(seeds, old)
+        changed = sum(1 for x, d in old.items() if dist[x] != d)
+        self.last_update = {"invalidated": len(invalid), "changed": changed, "scanned": scanned}
+        return self.last_update
+
+    def _set_pred(self, v: int, a: int) -> None:
+        old = self.pred_arc[v]
+        if old == a:
+            return
+        if old >= 0:
+            self.children[self.graph.tail[old]].discard(v)
+        self.pred_arc[v] = a
+        if a >= 0:
+            self.children[self.graph.tail[a]].add(v)
+
+    def _propagate(self, pq: List[Tuple[float, int]], old: Optional[Dict[int, float]] = None) -> int:
+        # Label-correcting Dijkstra from the seeds; labels only go down
+        g = self.graph
+        out_start, head, weight, dist = g.out_start, g.head, self.weight, self.dist
+        heapq.heapify(pq)
+        scanned = 0
+        while pq:
+            d, u = heapq.heappop(pq)
+            if d != dist[u]:
+                continue
+            scanned += 1
+            for a in range(out_start[u], out_start[u + 1]):
+                v = head[a]
+                nd = d + weight[a]
+                if nd < dist[v]:
+                    if old is not None:
+                        old.setdefault(v, dist[v])
+                    dist[v] = nd
+                    self._set_pred(v, a)
+                    heapq.heappush(pq, (nd, v))
+        return scanned
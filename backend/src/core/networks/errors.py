@@ -1,2 +1,14 @@
 class NetworkModelError(ValueError):
     """Raised when the provided network model is invalid."""
+
+
+class NegativeCycleError(ValueError):
+    """Raised when the graph has a cycle of negative total weight.
+
+    ``cycle`` lists the node names around the cycle (first node repeated at the end) when the
+    algorithm can recover it, otherwise it is empty.
+    """
+
+    def __init__(self, message: str = "Negative cycle detected", cycle=None) -> None:
+        super().__init__(message)
+        self.cycle = list(cycle or [])
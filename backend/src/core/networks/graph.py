@@ -0,0 +1,383 @@
+from __future__ import annotations
+
+import struct
+import sys
+from array import array
+from functools import cached_property
+from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from .errors import NetworkModelError
+
+if TYPE_CHECKING:
+    from .model import Edge, NetworkModel
+
+
+def _zeros(typecode: str, k: int) -> array:
+    return array(typecode, [0]) * k
+
+
+# Binary graph file: magic, header, NUL-separated UTF-8 names, then the columns below as
+# little-endian int64 / float64 arrays (edge columns first, then the CSR, then coordinates).
+BINARY_MAGIC = b"IOGRAPH1"
+_BINARY_HEADER = struct.Struct("<8sBBqqqq")  # magic, directed, has coords, n, edges, arcs, names bytes
+_EDGE_INT_COLUMNS = ("edge_u", "edge_v")
+_EDGE_FLOAT_COLUMNS = ("edge_capacity", "edge_cost", "edge_weight")
+_CSR_INT_COLUMNS = ("out_start", "tail", "head", "arc_edge", "in_start", "in_arc")
+_CSR_FLOAT_COLUMNS = ("capacity", "cost", "weight")
+_BIG_ENDIAN = sys.byteorder == "big"
+
+
+def _write_column(fh: BinaryIO, values: array, typecode: str) -> None:
+    out = array(typecode, values)
+    if _BIG_ENDIAN:
+        out.byteswap()
+    out.tofile(fh)
+
+
+def _read_column(fh: BinaryIO, typecode: str, count: int) -> array:
+    out = array(typecode)
+    try:
+        out.fromfile(fh, count)
+    except EOFError:
+        raise ValueError("Truncated graph file") from None
+    if _BIG_ENDIAN:
+        out.byteswap()
+    # CompiledGraph keeps indices in native "l" arrays
+    return array("l", out) if typecode == "q" else out
+
+
+class EdgeView(Sequence["Edge"]):
+    """Read-only sequence of ``Edge`` objects built on demand from a graph's edge columns
+    (for graphs loaded from files, which keep no per-edge objects)."""
+
+    def __init__(self, graph: "CompiledGraph") -> None:
+        self.graph = graph
+
+    def __len__(self) -> int:
+        return self.graph.num_edges
+
+    def __getitem__(self, e):  # type: ignore[override]
+        if isinstance(e, slice):
+            return [self.graph.edge(i) for i in range(*e.indices(len(self)))]
+        if e < 0:
+            e += len(self)
+        if not 0 <= e < len(self):
+            raise IndexError(e)
+        return self.graph.edge(e)
+
+    def __iter__(self) -> Iterator["Edge"]:
+        return (self.graph.edge(e) for e in range(len(self)))
+
+
+class CompiledGraph:
+    """Integer-indexed, CSR-compiled view of a network.
+
+    Node names are interned once (``names[i]`` <-> ``index[name]``). Edges are kept as
+    typed columns (``edge_u``, ``edge_v``, ``edge_capacity``, ``edge_cost``, ``edge_weight``)
+    and expanded into directed *arcs* stored in CSR order:
+
+    - arcs ``out_start[u] .. out_start[u + 1] - 1`` leave node ``u`` (forward CSR);
+    - ``in_arc[in_start[v] .. in_start[v + 1] - 1]`` are the arcs entering ``v`` (reverse CSR);
+    - each arc has ``tail``, ``head``, ``arc_edge`` (originating edge) and its own
+      ``capacity``/``cost``/``weight`` columns.
+
+    Undirected models produce two arcs per edge (one per direction) that point back to the
+    same edge index, so no ``Edge`` objects are duplicated.
+
+    Optional node coordinates are kept as columns ``coord_x``/``coord_y`` (NaN when missing).
+    """
+
+    def __init__(
+        self,
+        names: Sequence[str],
+        edge_u: Sequence[int],
+        edge_v: Sequence[int],
+        edge_capacity: Sequence[float],
+        edge_cost: Sequence[float],
+        edge_weight: Sequence[float],
+        directed: bool = True,
+        edges: Optional[Sequence["Edge"]] = None,
+        coords: Optional[Dict[str, Tuple[float, float]]] = None,
+    ) -> None:
+        self.names: List[str] = list(names)
+        self.index: Dict[str, int] = {name: i for i, name in enumerate(self.names)}
+        self.n = len(self.names)
+        self.directed = bool(directed)
+        self.edges = edges
+
+        self.edge_u = array("l", edge_u)
+        self.edge_v = array("l", edge_v)
+        self.edge_capacity = array("d", edge_capacity)
+        self.edge_cost = array("d", edge_cost)
+        self.edge_weight = array("d", edge_weight)
+        self.num_edges = len(self.edge_u)
+
+        self.coord_x: Optional[array] = None
+        self.coord_y: Optional[array] = None
+        if coords:
+            nan = float("nan")
+            self.coord_x = array("d", (coords.get(name, (nan, nan))[0] for name in self.names))
+            self.coord_y = array("d", (coords.get(name, (nan, nan))[1] for name in self.names))
+
+        self._build_csr()
+
+    @staticmethod
+    def from_model(model: "NetworkModel") -> "CompiledGraph":
+        index = {name: i for i, name in enumerate(model.nodes)}
+        try:
+            eu = [index[e.u] for e in model.edges]
+            ev = [index[e.v] for e in model.edges]
+        except KeyError as exc:
+            raise NetworkModelError(f"Edge references unknown node: {exc.args[0]}") from None
+        return CompiledGraph(
+            model.nodes,
+            eu,
+            ev,
+            [float(e.capacity) for e in model.edges],
+            [float(e.cost) for e in model.edges],
+            [float(e.weight) for e in model.edges],
+            directed=model.directed,
+            edges=model.edges,
+            coords=model.coords,
+        )
+
+    # ------------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------------
+    def _build_csr(self) -> None:
+        n, E = self.n, self.num_edges
+        m = E if self.directed else 2 * E
+
+        # Arc list before sorting: arc k < E is edge k forward, arc E + k is edge k mirrored.
+        def arc_tail(k: int) -> int:
+            return self.edge_u[k] if k < E else self.edge_v[k - E]
+
+        # Counting sort by tail -> forward CSR, O(V + E).
+        start = [0] * (n + 1)
+        for k in range(E):
+            start[self.edge_u[k] + 1] += 1
+            if not self.directed:
+                start[self.edge_v[k] + 1] += 1
+        for u in range(n):
+            start[u + 1] += start[u]
+        fill = start[:-1]
+
+        tail = _zeros("l", m)
+        head = array("l", tail)
+        arc_edge = array("l", tail)
+        for k in range(m):
+            e = k if k < E else k - E
+            u = arc_tail(k)
+            a = fill[u]
+            fill[u] += 1
+            tail[a] = u
+            head[a] = self.edge_v[e] if k < E else self.edge_u[e]
+            arc_edge[a] = e
+
+        self.m = m
+        self.out_start = array("l", start)
+        self.tail = tail
+        self.head = head
+        self.arc_edge = arc_edge
+        self.capacity = array("d", (self.edge_capacity[e] for e in arc_edge))
+        self.cost = array("d", (self.edge_cost[e] for e in arc_edge))
+        self.weight = array("d", (self.edge_weight[e] for e in arc_edge))
+
+        # Reverse CSR (arcs grouped by head).
+        in_start = [0] * (n + 1)
+        for a in range(m):
+            in_start[head[a] + 1] += 1
+        for v in range(n):
+            in_start[v + 1] += in_start[v]
+        fill = in_start[:-1]
+        in_arc = _zeros("l", m)
+        for a in range(m):
+            v = head[a]
+            in_arc[fill[v]] = a
+            fill[v] += 1
+        self.in_start = array("l", in_start)
+        self.in_arc = in_arc
+
+    @cached_property
+    def residual(self) -> Tuple[array, array, array]:
+        """Residual-network CSR shared by the flow algorithms.
+
+        Residual arc ``2a`` is arc ``a`` itself and ``2a + 1`` its reversal, so the
+        partner of residual arc ``r`` is ``r ^ 1``. Returns ``(res_start, res_arc, res_head)``
+        where ``res_arc[res_start[u] .. res_start[u + 1] - 1]`` are the residual arcs leaving ``u``.
+        """
+        n, m = self.n, self.m
+        res_start = array("l", [0] * (n + 1))
+        for u in range(n):
+            res_start[u + 1] = (
+                res_start[u]
+                + (self.out_start[u + 1] - self.out_start[u])
+                + (self.in_start[u + 1] - self.in_start[u])
+            )
+        res_arc = _zeros("l", 2 * m)
+        pos = 0
+        for u in range(n):
+            for a in range(self.out_start[u], self.out_start[u + 1]):
+                res_arc[pos] = 2 * a
+                pos += 1
+            for i in range(self.in_start[u], self.in_start[u + 1]):
+                res_arc[pos] = 2 * self.in_arc[i] + 1
+                pos += 1
+        res_head = _zeros("l", 2 * m)
+        for a in range(m):
+            res_head[2 * a] = self.head[a]
+            res_head[2 * a + 1] = self.tail[a]
+        return res_start, res_arc, res_head
+
+    @cached_property
+    def topological_order(self) -> Optional[array]:
+        """Nodes in topological order (Kahn, O(V + E)), or ``None`` if the arcs have a cycle.
+
+        Undirected graphs with at least one edge are never acyclic (mirrored arcs).
+        """
+        indeg = [self.in_start[v + 1] - self.in_start[v] for v in range(self.n)]
+        order = array("l", (v for v in range(self.n) if indeg[v] == 0))
+        out_start, head = self.out_start, self.head
+        i = 0
+        while i < len(order):
+            u = order[i]
+            i += 1
+            for a in range(out_start[u], out_start[u + 1]):
+                v = head[a]
+                indeg[v] -= 1
+                if indeg[v] == 0:
+                    order.append(v)
+        return order if len(order) == self.n else None
+
+    def residual_capacities(self) -> array:
+        """Fresh residual capacities for a zero flow: ``[cap(a0), 0, cap(a1), 0, ...]``."""
+        rcap = _zeros("d", 2 * self.m)
+        rcap[0::2] = self.capacity
+        return rcap
+
+    # ------------------------------------------------------------------
+    # Binary persistence
+    # ------------------------------------------------------------------
+    def save_binary(self, path: Union[str, Path]) -> None:
+        """Write the graph (names, edge columns and the compiled CSR) as typed arrays."""
+        names = "\0".join(self.names).encode("utf-8")
+        if any("\0" in name for name in self.names):
+            raise ValueError("Node names cannot contain NUL characters")
+        has_coords = self.coord_x is not None and self.coord_y is not None
+        with open(path, "wb") as fh:
+            fh.write(_BINARY_HEADER.pack(
+                BINARY_MAGIC, self.directed, has_coords, self.n, self.num_edges, self.m, len(names)
+            ))
+            fh.write(names)
+            for name in _EDGE_INT_COLUMNS + _CSR_INT_COLUMNS:
+                _write_column(fh, getattr(self, name), "q")
+            for name in _EDGE_FLOAT_COLUMNS + _CSR_FLOAT_COLUMNS:
+                _write_column(fh, getattr(self, name), "d")
+            if has_coords:
+                _write_column(fh, self.coord_x, "d")
+                _write_column(fh, self.coord_y, "d")
+
+    @staticmethod
+    def load_binary(path: Union[str, Path]) -> "CompiledGraph":
+        """Read a file written by ``save_binary``. The arrays are read in bulk and the CSR is
+        not rebuilt; only the name index is a per-node Python structure."""
+        with open(path, "rb") as fh:
+            raw = fh.read(_BINARY_HEADER.size)
+            if len(raw) != _BINARY_HEADER.size or raw[:8] != BINARY_MAGIC:
+                raise ValueError("Not a binary graph file (or unsupported version)")
+            _, directed, has_coords, n, num_edges, m, names_len = _BINARY_HEADER.unpack(raw)
+            raw_names = fh.read(names_len)
+            if len(raw_names) != names_len:
+                raise ValueError("Truncated graph file")
+            g = CompiledGraph.__new__(CompiledGraph)
+            g.names = raw_names.decode("utf-8").split("\0") if n else []
+            if len(g.names) != n:
+                raise ValueError("Corrupt graph file: node count mismatch")
+            g.index = {name: i for i, name in enumerate(g.names)}
+            g.n, g.m, g.num_edges = n, m, num_edges
+            g.directed = bool(directed)
+            g.edges = None
+            sizes = {"out_start": n + 1, "in_start": n + 1}
+            for name in _EDGE_INT_COLUMNS:
+                setattr(g, name, _read_column(fh, "q", num_edges))
+            for name in _CSR_INT_COLUMNS:
+                setattr(g, name, _read_column(fh, "q", sizes.get(name, m)))
+            for name in _EDGE_FLOAT_COLUMNS:
+                setattr(g, name, _read_column(fh, "d", num_edges))
+            for name in _CSR_FLOAT_COLUMNS:
+                setattr(g, name, _read_column(fh, "d", m))
+            g.coord_x = _read_column(fh, "d", n) if has_coords else None
+            g.coord_y = _read_column(fh, "d", n) if has_coords else None
+        return g
+
+    # ------------------------------------------------------------------
+    # Name <-> id helpers
+    # ------------------------------------------------------------------
+    def node(self, name: str) -> int:
+        try:
+            return self.index[name]
+        except KeyError:
+            raise NetworkModelError(f"Unknown node: {name}") from None
+
+    def edge(self, e: int) -> "Edge":
+        """Edge ``e`` as an ``Edge`` object (the model's own object when available)."""
+        if self.edges is not None:
+            return self.edges[e]
+        from .model import Edge
+
+        return Edge(
+            u=self.names[self.edge_u[e]],
+            v=self.names[self.edge_v[e]],
+            capacity=self.edge_capacity[e],
+            cost=self.edge_cost[e],
+            weight=self.edge_weight[e],
+        )
+
+    @cached_property
+    def edge_arcs(self) -> List[List[int]]:
+        """Arcs of each edge (two for an undirected edge)."""
+        arcs: List[List[int]] = [[] for _ in range(self.num_edges)]
+        for a in range(self.m):
+            arcs[self.arc_edge[a]].append(a)
+        return arcs
+
+    @cached_property
+    def _pair_edges(self) -> Dict[Tuple[int, int], List[int]]:
+        pairs: Dict[Tuple[int, int], List[int]] = {}
+        for e in range(self.num_edges):
+            pairs.setdefault((self.edge_u[e], self.edge_v[e]), []).append(e)
+        return pairs
+
+    def find_edge(self, u: str, v: str) -> int:
+        """Index of the unique edge ``u -> v`` (either orientation if the graph is undirected)."""
+        iu, iv = self.node(u), self.node(v)
+        found = list(self._pair_edges.get((iu, iv), []))
+        if not self.directed and iu != iv:
+            found += self._pair_edges.get((iv, iu), [])
+        if len(found) != 1:
+            problem = "not found" if not found else "is ambiguous (parallel edges)"
+            raise NetworkModelError(f"Edge {u}->{v} {problem}")
+        return found[0]
+
+    def pair_flows(self, arc_flow: Sequence[float], eps: float = 1e-12) -> Dict[Tuple[str, str], float]:
+        """Aggregate per-arc flows into net flows per ordered node pair (positive ones only)."""
+        net: Dict[Tuple[int, int], float] = {}
+        for a in range(self.m):
+            f = arc_flow[a]
+            if f == 0.0:
+                continue
+            u, v = self.tail[a], self.head[a]
+            if u == v:
+                continue
+            net[(u, v)] = net.get((u, v), 0.0) + f
+            net[(v, u)] = net.get((v, u), 0.0) - f
+        names = self.names
+        return {(names[u], names[v]): f for (u, v), f in net.items() if f > eps}
+
+
+def as_graph(model: Union["NetworkModel", CompiledGraph]) -> CompiledGraph:
+    """Return the compiled graph for a model (built once and cached on the model)."""
+    if isinstance(model, CompiledGraph):
+        return model
+    return model.graph
@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import heapq
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
+
+from .graph import CompiledGraph, as_graph
+from .model import NetworkModel
+
+# (cost, node ids, cost from the source to each node of the path)
+_Path = Tuple[float, List[int], List[float]]
+
+
+def _reverse_tree(g: CompiledGraph, t: int) -> Tuple[List[float], List[int]]:
+    # Dijkstra towards t on reversed arcs: h[v] = dist(v, t), next_arc[v] = first arc of that path
+    inf = float("inf")
+    h = [inf] * g.n
+    next_arc = [-1] * g.n
+    h[t] = 0.0
+    pq: List[Tuple[float, int]] = [(0.0, t)]
+    in_start, in_arc, tail, weight = g.in_start, g.in_arc, g.tail, g.weight
+    while pq:
+        d, v = heapq.heappop(pq)
+        if d != h[v]:
+            continue
+        for i in range(in_start[v], in_start[v + 1]):
+            a = in_arc[i]
+            w = weight[a]
+            if w < 0:
+                raise ValueError("K shortest paths require non-negative weights")
+            u = tail[a]
+            if d + w < h[u]:
+                h[u] = d + w
+                next_arc[u] = a
+                heapq.heappush(pq, (d + w, u))
+    return h, next_arc
+
+
+def _tree_path(
+    g: CompiledGraph, spur: int, t: int, next_arc: List[int], blocked: Set[int], banned_first: Set[int]
+) -> Optional[List[int]]:
+    # The reverse tree's own path from spur, if it avoids the blocked nodes and first hops
+    path = [spur]
+    v = spur
+    while v != t:
+        v = g.head[next_arc[v]]
+        if v in blocked or (len(path) == 1 and v in banned_first):
+            return None
+        path.append(v)
+    return path
+
+
+def _spur_search(
+    g: CompiledGraph,
+    spur: int,
+    t: int,
+    h: List[float],
+    next_arc: List[int],
+    blocked: Set[int],
+    banned_first: Set[int],
+    limit: float,
+) -> Optional[Tuple[float, List[int]]]:
+    # A* with the exact reverse-tree distances (admissible once nodes/arcs are removed). It
+    # stops at the first popped node whose tree path to t avoids the removed nodes: that path
+    # costs exactly h, so nothing left in the queue can beat it. It also gives up once the
+    # best f-value exceeds ``limit``.
+    out_start, head, weight = g.out_start, g.head, g.weight
+    inf = float("inf")
+    clean: Dict[int, bool] = {t: True, spur: False}
+    for b in blocked:
+        clean[b] = False
+
+    def tree_is_clean(v: int) -> bool:
+        walk = []
+        while v not in clean:
+            walk.append(v)
+            v = head[next_arc[v]]
+        ok = clean[v]
+        for x in walk:
+            clean[x] = ok
+        return ok
+
+    dist: Dict[int, float] = {spur: 0.0}
+    prev: Dict[int, int] = {}
+    pq: List[Tuple[float, float, int]] = [(h[spur], 0.0, spur)]
+    while pq:
+        f, d, u = heapq.heappop(pq)
+        if f > limit:
+            return None
+        if d != dist[u]:
+            continue
+        if u != spur and tree_is_clean(u):
+            path = [u]
+            while path[-1] != spur:
+                path.append(prev[path[-1]])
+            path.reverse()
+            while u != t:
+                u = head[next_arc[u]]
+                path.append(u)
+            return f, path
+        for a in range(out_start[u], out_start[u + 1]):
+            v = head[a]
+            if v in blocked or (u == spur and v in banned_first) or h[v] == inf:
+                continue
+            nd = d + weight[a]
+            if nd < dist.get(v, inf):
+                dist[v] = nd
+                prev[v] = u
+                heapq.heappush(pq, (nd + h[v], nd, v))
+    return None
+
+
+def _pair_weight(g: CompiledGraph, u: int, v: int) -> float:
+    # Lightest arc u -> v (a path is a node sequence)
+    return min(g.weight[a] for a in range(g.out_start[u], g.out_start[u + 1]) if g.head[a] == v)
+
+
+def k_shortest_paths(
+    model: Union[NetworkModel, CompiledGraph],
+    source: str,
+    target: str,
+    k: int,
+    stats: Optional[Dict[str, Any]] = None,
+) -> List[Tuple[float, List[str]]]:
+    """Up to ``k`` shortest loopless ``source -> target`` paths (Yen), cheapest first.
+
+    One reverse Dijkstra from ``target`` gives the exact distance-to-target ``h`` and its
+    shortest-path tree, which are reused by every spur search:
+
+    - if the tree path from the spur node avoids the root path and the banned first hops, it
+      is the spur path (no search at all);
+    - otherwise A* guided by ``h`` runs and stops at the first node whose tree path is clean;
+    - spur nodes whose bound ``root cost + h`` cannot beat the candidates still needed are
+      skipped, and the A* stops once its f-value passes that bound.
+
+    Candidates live in a lazy heap, de-duplicated by node sequence. Weights must be
+    non-negative. ``stats`` receives ``spur_nodes``, ``tree_hits``, ``searches`` and ``pruned``.
+    """
+    g = as_graph(model)
+    s, t = g.node(source), g.node(target)
+    if k <= 0:
+        return []
+    h, next_arc = _reverse_tree(g, t)
+    counters = {"spur_nodes": 0, "tree_hits": 0, "searches": 0, "pruned": 0}
+    if stats is not None:
+        stats.update(counters)
+    if h[s] == float("inf"):
+        return []
+    def with_prefix(nodes: List[int]) -> _Path:
+        prefix = [0.0]
+        for a, b in zip(nodes, nodes[1:]):
+            prefix.append(prefix[-1] + _pair_weight(g, a, b))
+        return prefix[-1], nodes, prefix
+
+    first = _tree_path(g, s, t, next_arc, set(), set())
+    assert first is not None
+    found: List[_Path] = [with_prefix(first)]
+    candidates: List[Tuple[float, int, List[int]]] = []
+    seen = {tuple(first)}
+    tie = 0
+    while len(found) < k:
+        _, last, prefix = found[-1]
+        # Only the (k - |found|) best candidates can still be used; new ones only lower this
+        need = k - len(found)
+        limit = heapq.nsmallest(need, candidates)[-1][0] if len(candidates) >= need else float("inf")
+        for i in range(len(last) - 1):
+            spur = last[i]
+            root = last[: i + 1]
+            counters["spur_nodes"] += 1
+            bound = prefix[i] + h[spur]
+            if bound > limit:
+                counters["pruned"] += 1
+                continue
+            banned = {p[i + 1] for _, p, _ in found if len(p) > i + 1 and p[: i + 1] == root}
+            blocked = set(root[:-1])
+            spur_path = _tree_path(g, spur, t, next_arc, blocked, banned)
+            if spur_path is not None:
+                counters["tree_hits"] += 1
+                spur_cost = h[spur]
+            else:
+                counters["searches"] += 1
+                result = _spur_search(g, spur, t, h, next_arc, blocked, banned, limit - prefix[i])
+                if result is None:
+                    continue
+                spur_cost, spur_path = result
+            nodes = root[:-1] + spur_path
+            key = tuple(nodes)
+            if key in seen:
+                continue
+            seen.add(key)
+            tie += 1
+            heapq.heappush(candidates, (prefix[i] + spur_cost, tie, nodes))
+        if not candidates:
+            break
+        _, _, nodes = heapq.heappop(candidates)
+        found.append(with_prefix(nodes))
+
+    if stats is not None:
+        stats.update(counters)
+    return [(cost, [g.names[v] for v in nodes]) for cost, nodes, _ in found]
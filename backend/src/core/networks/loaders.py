@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import csv
+import json
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+from .graph import CompiledGraph
+from .parsers import model_from_dict
+
+# Header names accepted for each column (first match wins)
+_COLUMN_NAMES = {
+    "u": ("u", "source", "from", "tail"),
+    "v": ("v", "target", "to", "head"),
+    "weight": ("weight", "w", "length"),
+    "capacity": ("capacity", "cap"),
+    "cost": ("cost",),
+}
+# Column order of files without a header
+_POSITIONAL = ("u", "v", "weight", "capacity", "cost")
+
+BINARY_SUFFIXES = (".graph", ".bin")
+
+
+def _rows(path: Path, delimiter: Optional[str]) -> Iterator[List[str]]:
+    # Rows of a delimited file; without a delimiter, ".csv" means ",", ".tsv" tab and anything
+    # else runs of whitespace. Blank lines and "#" comments are skipped.
+    if delimiter is None:
+        delimiter = {".csv": ",", ".tsv": "\t"}.get(path.suffix.lower())
+    with open(path, newline="", encoding="utf-8") as fh:
+        lines: Iterable[str] = (line for line in fh if line.strip() and not line.lstrip().startswith("#"))
+        if delimiter is None:
+            for line in lines:
+                yield line.split()
+        else:
+            yield from csv.reader(lines, delimiter=delimiter)
+
+
+def _layout(header: Sequence[str]) -> Optional[Dict[str, int]]:
+    # Column positions from a header row, or None if the row is data
+    names = [h.strip().lower() for h in header]
+    layout = {}
+    for key, options in _COLUMN_NAMES.items():
+        for opt in options:
+            if opt in names:
+                layout[key] = names.index(opt)
+                break
+    if "u" not in layout or "v" not in layout:
+        return None
+    return layout
+
+
+def read_edge_list(
+    path: Union[str, Path],
+    directed: bool = True,
+    delimiter: Optional[str] = None,
+) -> CompiledGraph:
+    """Compile a CSV / TSV / whitespace edge list straight into a ``CompiledGraph``.
+
+    One edge per row. With a header row, columns are found by name (``u``/``source``/``from``,
+    ``v``/``target``/``to``, ``weight``/``w``, ``capacity``, ``cost``); without one they are
+    ``u, v[, weight[, capacity[, cost]]]``. As in the JSON models, a missing weight falls back
+    to the cost. Node names are interned on the fly and the values go into typed arrays: no
+    ``Edge`` objects are created.
+    """
+    path = Path(path)
+    index: Dict[str, int] = {}
+    names: List[str] = []
+    eu, ev = array("l"), array("l")
+    cap, cost, weight = array("d"), array("d"), array("d")
+
+    def node(name: str) -> int:
+        i = index.get(name)
+        if i is None:
+            i = index[name] = len(names)
+            names.append(name)
+        return i
+
+    rows = _rows(path, delimiter)
+    first = next(rows, None)
+    if first is None:
+        raise ValueError(f"{path}: empty edge list")
+    layout = _layout(first)
+    start = 2
+    if layout is None:
+        layout = {key: i for i, key in enumerate(_POSITIONAL)}
+        rows = _chain(first, rows)
+        start = 1
+    iu, iv = layout["u"], layout["v"]
+    iw = layout.get("weight", -1)
+    ic = layout.get("capacity", -1)
+    ik = layout.get("cost", -1)
+
+    line = start
+    try:
+        for line, row in enumerate(rows, start=start):
+            width = len(row)
+            k = float(row[ik]) if 0 <= ik < width and row[ik] else 0.0
+            eu.append(node(row[iu].strip()))
+            ev.append(node(row[iv].strip()))
+            cap.append(float(row[ic]) if 0 <= ic < width and row[ic] else 0.0)
+            cost.append(k)
+            weight.append(float(row[iw]) if 0 <= iw < width and row[iw] else k)
+    except (IndexError, ValueError) as exc:
+        raise ValueError(f"{path}: invalid row {line}: {exc}") from None
+    return CompiledGraph(names, eu, ev, cap, cost, weight, directed=directed)
+
+
+def _chain(first: List[str], rest: Iterator[List[str]]) -> Iterator[List[str]]:
+    yield first
+    yield from rest
+
+
+def load_graph(
+    path: Union[str, Path],
+    directed: bool = True,
+    delimiter: Optional[str] = None,
+) -> CompiledGraph:
+    """Load a graph by file type: binary (``.graph`` / ``.bin``, see
+    ``CompiledGraph.save_binary``), JSON model (``.json``) or a delimited edge list.
+    ``directed`` only applies to edge lists (the other formats record it)."""
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if suffix in BINARY_SUFFIXES:
+        return CompiledGraph.load_binary(path)
+    if suffix == ".json":
+        return model_from_dict(json.loads(path.read_text(encoding="utf-8"))).graph
+    return read_edge_list(path, directed=directed, delimiter=delimiter)
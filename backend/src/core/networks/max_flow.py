@@ -1,72 +1,526 @@
 from __future__ import annotations
 
+from array import array
 from collections import deque
-from typing import Dict, List, Tuple
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
 
+from .graph import CompiledGraph, as_graph
 from .model import NetworkModel
+from .reduction import reduce_graph
 
+EPS = 1e-12
 
-def edmonds_karp(model: NetworkModel, source: str, sink: str) -> Tuple[float, Dict[Tuple[str, str], float]]:
+# Above this many arcs "auto" switches from Edmonds–Karp to Dinic.
+AUTO_DINIC_MIN_ARCS = 1000
+
+
+def edmonds_karp(
+    model: Union[NetworkModel, CompiledGraph], source: str, sink: str
+) -> Tuple[float, Dict[Tuple[str, str], float]]:
     """Max Flow (Edmonds–Karp).
 
     Uses ``edge.capacity``. Graph is treated as directed; if ``model.directed`` is False, edges are mirrored.
+    Runs on the model's compiled residual network (``CompiledGraph.residual``).
     """
-    # Build capacity dictionary and adjacency for BFS over residual network.
-    cap: Dict[Tuple[str, str], float] = {}
-    adj: Dict[str, List[str]] = {n: [] for n in model.nodes}
+    return max_flow(model, source, sink, algorithm="edmonds_karp")
+
+
+def dinic(
+    model: Union[NetworkModel, CompiledGraph], source: str, sink: str
+) -> Tuple[float, Dict[Tuple[str, str], float]]:
+    """Max Flow (Dinic): BFS level graph + blocking flow with current-arc pointers. O(V^2 E)."""
+    return max_flow(model, source, sink, algorithm="dinic")
+
+
+def push_relabel(
+    model: Union[NetworkModel, CompiledGraph], source: str, sink: str
+) -> Tuple[float, Dict[Tuple[str, str], float]]:
+    """Max Flow (highest-label push-relabel with gap and global-relabel heuristics). O(V^2 sqrt(E))."""
+    return max_flow(model, source, sink, algorithm="push_relabel")
+
+
+def choose_max_flow_algorithm(g: CompiledGraph) -> str:
+    return "dinic" if g.m >= AUTO_DINIC_MIN_ARCS else "edmonds_karp"
+
+
+def max_flow(
+    model: Union[NetworkModel, CompiledGraph],
+    source: str,
+    sink: str,
+    algorithm: str = "edmonds_karp",
+    cut: Optional[Dict[str, Any]] = None,
+    reduce: bool = False,
+    stats: Optional[Dict[str, Any]] = None,
+) -> Tuple[float, Dict[Tuple[str, str], float]]:
+    """Max flow with a selectable engine (``edmonds_karp``, ``dinic``, ``push_relabel`` or ``auto``).
+
+    Returns ``(max_flow, flows)`` where ``flows`` maps ``(u, v)`` to the positive net flow.
+    When a ``cut`` dict is given it receives the minimum cut read off the final residual
+    network: ``source_side`` (nodes reachable from ``source``), ``edges`` (saturated
+    ``(u, v, capacity)`` arcs leaving that set) and ``capacity`` (equal to the max flow).
+
+    With ``reduce`` the engine runs on ``reduce_graph(..., mode="flow")`` and the flow is
+    expanded back onto the original arcs, so flows and cut refer to the original graph;
+    ``stats["reduction"]`` receives the reduction sizes.
+    """
+    g = as_graph(model)
+    s, t = g.node(source), g.node(sink)
+    if reduce:
+        reduced = reduce_graph(g, source, sink, mode="flow")
+        rg = reduced.graph
+        value, small = _run_max_flow(rg, rg.node(source), rg.node(sink), algorithm)
+        rcap = reduced.expand_residual(small)
+        if stats is not None:
+            stats["reduction"] = reduced.stats
+    else:
+        value, rcap = _run_max_flow(g, s, t, algorithm)
+    if cut is not None:
+        _fill_cut(g, s, rcap, g.capacity, cut)
+    # Net flow per node pair (flow on arc a is the residual capacity of its reversal)
+    return value, g.pair_flows(rcap[1::2])
+
+
+def _run_max_flow(g: CompiledGraph, s: int, t: int, algorithm: str) -> Tuple[float, array]:
+    # Max-flow value and the final residual capacities
+    if algorithm == "auto":
+        algorithm = choose_max_flow_algorithm(g)
+    try:
+        engine = MAX_FLOW_ENGINES[algorithm]
+    except KeyError:
+        raise ValueError(f"Unknown max-flow algorithm: {algorithm}") from None
+    rcap = g.residual_capacities()
+    value = engine(g, s, t, rcap) if s != t else 0.0
+    return value, rcap
 
-    def add_edge(u: str, v: str, c: float) -> None:
-        key = (u, v)
-        cap[key] = cap.get(key, 0.0) + c
-        if v not in adj[u]:
-            adj[u].append(v)
-        if u not in adj[v]:
-            adj[v].append(u)  # residual back-edge traversal
 
-    for e in model.edges:
-        add_edge(e.u, e.v, float(e.capacity))
-        if not model.directed:
-            add_edge(e.v, e.u, float(e.capacity))
+def _fill_cut(g: CompiledGraph, s: int, rcap: array, capacity: Sequence[float], cut: Dict[str, Any]) -> None:
+    side = source_side(g, s, rcap)
+    arcs = [a for a in range(g.m) if side[g.tail[a]] and not side[g.head[a]] and capacity[a] > EPS]
+    cut["source_side"] = [g.names[v] for v in range(g.n) if side[v]]
+    cut["edges"] = [(g.names[g.tail[a]], g.names[g.head[a]], capacity[a]) for a in arcs]
+    cut["capacity"] = sum(capacity[a] for a in arcs)
 
-    flow: Dict[Tuple[str, str], float] = {}
 
-    def residual(u: str, v: str) -> float:
-        return cap.get((u, v), 0.0) - flow.get((u, v), 0.0)
+def source_side(g: CompiledGraph, s: int, rcap: array) -> List[bool]:
+    """Nodes reachable from ``s`` in the residual network (the source side of a min cut)."""
+    res_start, res_arc, res_head = g.residual
+    seen = [False] * g.n
+    seen[s] = True
+    stack = [s]
+    while stack:
+        u = stack.pop()
+        for i in range(res_start[u], res_start[u + 1]):
+            r = res_arc[i]
+            v = res_head[r]
+            if not seen[v] and rcap[r] > EPS:
+                seen[v] = True
+                stack.append(v)
+    return seen
 
-    max_flow = 0.0
+
+# ----------------------------------------------------------------------
+# Engines. Each one augments ``rcap`` (residual capacities indexed like
+# ``CompiledGraph.residual``) in place from its current state and returns
+# the amount of flow added from ``s`` to ``t``.
+# ----------------------------------------------------------------------
+def _augment_edmonds_karp(g: CompiledGraph, s: int, t: int, rcap: array) -> float:
+    res_start, res_arc, res_head = g.residual
+    added = 0.0
     while True:
-        parent: Dict[str, str] = {source: ""}
-        q = deque([source])
-        while q and sink not in parent:
+        # BFS over residual arcs; parent_arc[v] = residual arc used to reach v
+        parent_arc = [-1] * g.n
+        parent_arc[s] = -2
+        q = deque([s])
+        while q and parent_arc[t] == -1:
             u = q.popleft()
-            for v in adj[u]:
-                if v in parent:
-                    continue
-                if residual(u, v) > 1e-12:
-                    parent[v] = u
+            for i in range(res_start[u], res_start[u + 1]):
+                r = res_arc[i]
+                v = res_head[r]
+                if parent_arc[v] == -1 and rcap[r] > EPS:
+                    parent_arc[v] = r
                     q.append(v)
 
-        if sink not in parent:
-            break
+        if parent_arc[t] == -1:
+            return added
 
         # Find bottleneck
         bottleneck = float("inf")
-        v = sink
-        while v != source:
-            u = parent[v]
-            bottleneck = min(bottleneck, residual(u, v))
-            v = u
+        v = t
+        while v != s:
+            r = parent_arc[v]
+            bottleneck = min(bottleneck, rcap[r])
+            v = res_head[r ^ 1]
 
         # Augment
-        v = sink
-        while v != source:
-            u = parent[v]
-            flow[(u, v)] = flow.get((u, v), 0.0) + bottleneck
-            flow[(v, u)] = flow.get((v, u), 0.0) - bottleneck
-            v = u
-
-        max_flow += bottleneck
-
-    # Return only positive flows on original arcs
-    clean: Dict[Tuple[str, str], float] = {k: v for k, v in flow.items() if v > 1e-12}
-    return max_flow, clean
+        v = t
+        while v != s:
+            r = parent_arc[v]
+            rcap[r] -= bottleneck
+            rcap[r ^ 1] += bottleneck
+            v = res_head[r ^ 1]
+
+        added += bottleneck
+
+
+def _augment_dinic(g: CompiledGraph, s: int, t: int, rcap: array) -> float:
+    res_start, res_arc, res_head = g.residual
+    n = g.n
+    added = 0.0
+    while True:
+        # Level graph (BFS distances from s in the residual network)
+        level = [-1] * n
+        level[s] = 0
+        q = deque([s])
+        while q:
+            u = q.popleft()
+            lu = level[u] + 1
+            for i in range(res_start[u], res_start[u + 1]):
+                r = res_arc[i]
+                v = res_head[r]
+                if level[v] < 0 and rcap[r] > EPS:
+                    level[v] = lu
+                    q.append(v)
+        if level[t] < 0:
+            return added
+
+        # Blocking flow: iterative DFS with current-arc pointers
+        it = list(res_start[:n])
+        path: List[int] = []
+        u = s
+        while True:
+            if u == t:
+                bottleneck = min(rcap[r] for r in path)
+                for r in path:
+                    rcap[r] -= bottleneck
+                    rcap[r ^ 1] += bottleneck
+                added += bottleneck
+                # Restart from the tail of the first saturated arc
+                k = next(i for i, r in enumerate(path) if rcap[r] <= EPS)
+                del path[k:]
+                u = res_head[path[-1]] if path else s
+                continue
+
+            end = res_start[u + 1]
+            i = it[u]
+            nxt = level[u] + 1
+            while i < end:
+                r = res_arc[i]
+                if rcap[r] > EPS and level[res_head[r]] == nxt:
+                    break
+                i += 1
+            it[u] = i
+            if i < end:
+                r = res_arc[i]
+                path.append(r)
+                u = res_head[r]
+                continue
+
+            # Dead end: prune u from the level graph and retreat
+            if u == s:
+                break
+            level[u] = -1
+            r = path.pop()
+            u = res_head[r ^ 1]
+            it[u] += 1
+
+
+def _augment_push_relabel(g: CompiledGraph, s: int, t: int, rcap: array) -> float:
+    res_start, res_arc, res_head = g.residual
+    n = g.n
+    excess = [0.0] * n
+    height = [n] * n
+    it = list(res_start[:n])
+
+    def bfs_heights(root: int, base: int, unreachable: int) -> None:
+        # Exact distance labels to ``root`` in the residual network (reverse BFS)
+        for v in range(n):
+            height[v] = unreachable
+        height[root] = base
+        q = deque([root])
+        while q:
+            v = q.popleft()
+            hv = height[v] + 1
+            for i in range(res_start[v], res_start[v + 1]):
+                r = res_arc[i]
+                w = res_head[r]
+                if height[w] == unreachable and rcap[r ^ 1] > EPS and w != s and w != t:
+                    height[w] = hv
+                    q.append(w)
+
+    # ---------------- Phase 1: maximum preflow (highest label) ----------------
+    buckets: List[List[int]] = [[] for _ in range(n)]
+    count = [0] * (n + 1)
+    max_active = 0
+
+    def global_relabel() -> int:
+        bfs_heights(t, 0, n)
+        height[s] = n
+        for h in range(n + 1):
+            count[h] = 0
+        for b in buckets:
+            b.clear()
+        top = -1
+        for v in range(n):
+            count[min(height[v], n)] += 1
+            it[v] = res_start[v]
+            if v != s and v != t and excess[v] > EPS and height[v] < n:
+                buckets[height[v]].append(v)
+                top = max(top, height[v])
+        return top
+
+    for i in range(res_start[s], res_start[s + 1]):
+        r = res_arc[i]
+        d = rcap[r]
+        if d > EPS:
+            rcap[r] = 0.0
+            rcap[r ^ 1] += d
+            excess[res_head[r]] += d
+            excess[s] -= d
+    max_active = global_relabel()
+
+    relabels = 0
+    while max_active >= 0:
+        bucket = buckets[max_active]
+        if not bucket:
+            max_active -= 1
+            continue
+        u = bucket.pop()
+        h = height[u]
+        if h != max_active or excess[u] <= EPS:
+            continue
+
+        # Discharge u
+        while True:
+            i, end = it[u], res_start[u + 1]
+            while i < end:
+                r = res_arc[i]
+                if rcap[r] > EPS:
+                    v = res_head[r]
+                    if height[v] == h - 1:
+                        d = excess[u] if excess[u] < rcap[r] else rcap[r]
+                        rcap[r] -= d
+                        rcap[r ^ 1] += d
+                        excess[u] -= d
+                        if v != s and v != t and excess[v] <= EPS:
+                            buckets[h - 1].append(v)
+                            if h - 1 > max_active:
+                                max_active = h - 1
+                        excess[v] += d
+                        if excess[u] <= EPS:
+                            break
+                i += 1
+            it[u] = i
+            if excess[u] <= EPS:
+                break
+
+            # Relabel (with gap heuristic)
+            count[h] -= 1
+            if count[h] == 0:
+                for v in range(n):
+                    if h < height[v] < n:
+                        count[height[v]] -= 1
+                        count[n] += 1
+                        height[v] = n
+                height[u] = n
+                count[n] += 1
+                break
+            new_h = n
+            for j in range(res_start[u], end):
+                r = res_arc[j]
+                if rcap[r] > EPS and height[res_head[r]] + 1 < new_h:
+                    new_h = height[res_head[r]] + 1
+            height[u] = new_h
+            count[new_h] += 1
+            it[u] = res_start[u]
+            if new_h >= n:
+                break
+            h = new_h
+            relabels += 1
+            if relabels % n == 0:
+                max_active = global_relabel()
+                break
+
+        if excess[u] > EPS and height[u] < n:
+            buckets[height[u]].append(u)
+            if height[u] > max_active:
+                max_active = height[u]
+
+    value = excess[t]
+
+    # ---------------- Phase 2: return excess to the source ----------------
+    bfs_heights(s, 0, 2 * n)
+    height[t] = 2 * n + 1
+    it = list(res_start[:n])
+    q = deque(v for v in range(n) if v != s and v != t and excess[v] > EPS)
+    while q:
+        u = q.popleft()
+        while excess[u] > EPS:
+            i, end = it[u], res_start[u + 1]
+            while i < end and excess[u] > EPS:
+                r = res_arc[i]
+                v = res_head[r]
+                if rcap[r] > EPS and height[u] == height[v] + 1:
+                    d = excess[u] if excess[u] < rcap[r] else rcap[r]
+                    rcap[r] -= d
+                    rcap[r ^ 1] += d
+                    excess[u] -= d
+                    if v != s and excess[v] <= EPS:
+                        q.append(v)
+                    excess[v] += d
+                    if excess[u] <= EPS:
+                        break
+                i += 1
+            it[u] = i
+            if excess[u] <= EPS:
+                break
+            new_h = 4 * n
+            for j in range(res_start[u], end):
+                r = res_arc[j]
+                v = res_head[r]
+                if rcap[r] > EPS and v != t and height[v] + 1 < new_h:
+                    new_h = height[v] + 1
+            height[u] = new_h
+            it[u] = res_start[u]
+
+    return value
+
+
+MAX_FLOW_ENGINES: Dict[str, Callable[[CompiledGraph, int, int, array], float]] = {
+    "edmonds_karp": _augment_edmonds_karp,
+    "dinic": _augment_dinic,
+    "push_relabel": _augment_push_relabel,
+}
+
+
+# ----------------------------------------------------------------------
+# Incremental re-solve after capacity changes.
+# ----------------------------------------------------------------------
+def _push(g: CompiledGraph, a: int, b: int, amount: float, rcap: array) -> float:
+    # Send up to ``amount`` from a to b along BFS residual paths; returns what was sent
+    if a == b:
+        return amount
+    res_start, res_arc, res_head = g.residual
+    sent = 0.0
+    while amount - sent > EPS:
+        parent_arc = [-1] * g.n
+        parent_arc[a] = -2
+        q = deque([a])
+        while q and parent_arc[b] == -1:
+            u = q.popleft()
+            for i in range(res_start[u], res_start[u + 1]):
+                r = res_arc[i]
+                v = res_head[r]
+                if parent_arc[v] == -1 and rcap[r] > EPS:
+                    parent_arc[v] = r
+                    q.append(v)
+        if parent_arc[b] == -1:
+            break
+        d = amount - sent
+        v = b
+        while v != a:
+            r = parent_arc[v]
+            d = min(d, rcap[r])
+            v = res_head[r ^ 1]
+        v = b
+        while v != a:
+            r = parent_arc[v]
+            rcap[r] -= d
+            rcap[r ^ 1] += d
+            v = res_head[r ^ 1]
+        sent += d
+    return sent
+
+
+class MaxFlowSession:
+    """Max flow that stays solved while arc capacities change.
+
+    Keeps the residual network of the last solution. Raising a capacity resumes augmenting
+    from the current flow; lowering it below the arc's flow cancels only that excess: the
+    surplus at the tail is first rerouted to the head, and what cannot be rerouted is sent back
+    to the source (and pulled back from the sink) before augmenting again. Capacities are the
+    session's own copy, so the compiled graph is never modified.
+    """
+
+    def __init__(
+        self,
+        model: Union[NetworkModel, CompiledGraph],
+        source: str,
+        sink: str,
+        algorithm: str = "auto",
+    ) -> None:
+        self.graph = g = as_graph(model)
+        self.s, self.t = g.node(source), g.node(sink)
+        if algorithm == "auto":
+            algorithm = choose_max_flow_algorithm(g)
+        if algorithm not in MAX_FLOW_ENGINES:
+            raise ValueError(f"Unknown max-flow algorithm: {algorithm}")
+        self.algorithm = algorithm
+        self.capacity = array("d", g.capacity)
+        self.rcap = g.residual_capacities()
+        self.last_update: Dict[str, Any] = {}
+        self._augment()
+
+    @property
+    def value(self) -> float:
+        """Current max-flow value (net flow out of the source)."""
+        g, rcap = self.graph, self.rcap
+        out = sum(rcap[2 * a + 1] for a in range(g.out_start[self.s], g.out_start[self.s + 1]))
+        back = sum(rcap[2 * g.in_arc[i] + 1] for i in range(g.in_start[self.s], g.in_start[self.s + 1]))
+        return out - back
+
+    def _augment(self) -> float:
+        if self.s == self.t:
+            return 0.0
+        return MAX_FLOW_ENGINES[self.algorithm](self.graph, self.s, self.t, self.rcap)
+
+    def set_capacity(self, u: str, v: str, capacity: float) -> float:
+        """Set the capacity of edge ``u -> v`` and return the new max flow."""
+        return self.update([(u, v, capacity)])
+
+    def update(self, changes: Sequence[Tuple[str, str, float]]) -> float:
+        """Apply several ``(u, v, capacity)`` changes, then re-augment once."""
+        g, rcap = self.graph, self.rcap
+        edges = []
+        for u, v, capacity in changes:
+            if float(capacity) < 0:
+                raise ValueError("Capacities must be non-negative")
+            edges.append((g.find_edge(u, v), float(capacity)))
+        rerouted = cancelled = 0.0
+        restart = False
+        for e, capacity in edges:
+            for a in g.edge_arcs[e]:
+                self.capacity[a] = capacity
+                if restart:
+                    continue
+                flow = rcap[2 * a + 1]
+                if flow <= capacity + EPS:
+                    rcap[2 * a] = max(0.0, capacity - flow)
+                    continue
+                # Cut the arc's flow back to the new capacity; x keeps a surplus, y a deficit
+                excess = flow - capacity
+                rcap[2 * a] = 0.0
+                rcap[2 * a + 1] = capacity
+                x, y = g.tail[a], g.head[a]
+                moved = _push(g, x, y, excess, rcap)
+                rest = excess - moved
+                if rest > EPS:
+                    back = _push(g, x, self.s, rest, rcap)
+                    pulled = _push(g, self.t, y, rest, rcap)
+                    # Leftover only on flow cycles through s or t: start over from zero flow
+                    restart = back < rest - EPS or pulled < rest - EPS
+                rerouted += moved
+                cancelled += rest
+        if restart:
+            self.rcap = g.residual_capacities()
+            self.rcap[0::2] = self.capacity
+        added = self._augment()
+        self.last_update = {"rerouted": rerouted, "cancelled": cancelled, "augmented": added, "restarted": restart}
+        return self.value
+
+    def flows(self) -> Dict[Tuple[str, str], float]:
+        return self.graph.pair_flows(self.rcap[1::2])
+
+    def min_cut(self) -> Dict[str, Any]:
+        cut: Dict[str, Any] = {}
+        _fill_cut(self.graph, self.s, self.rcap, self.capacity, cut)
+        return cut
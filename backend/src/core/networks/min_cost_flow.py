@@ -1,115 +1,601 @@
 from __future__ import annotations
 
 import heapq
-from typing import Dict, List, Optional, Tuple
+from collections import deque
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
 
+from .graph import CompiledGraph, as_graph
 from .model import NetworkModel
 
 
+EPS = 1e-12
+
+
 class InfeasibleFlow(Exception):
     pass
 
 
 def min_cost_flow_ssap(
-    model: NetworkModel,
+    model: Union[NetworkModel, CompiledGraph],
     source: str,
     sink: str,
     demand: float,
+    curve: Optional[List[Dict[str, float]]] = None,
 ) -> Tuple[float, float, Dict[Tuple[str, str], float]]:
     """Minimum-cost flow for a single source->sink demand.
 
-    Successive Shortest Augmenting Path (SSAP) with Johnson potentials.
+    Successive Shortest Augmenting Path (SSAP) with Johnson potentials (Bellman-Ford distances
+    when some cost is negative). A negative-cost cycle with capacity is saturated by
+    ``successive_shortest_paths`` instead (no ``curve`` then).
 
     - Uses ``edge.capacity`` and ``edge.cost`` (directed).
     - If ``model.directed`` is False, edges are mirrored with same capacity and cost.
+    - Runs on the compiled residual network: residual arc ``2a`` costs ``cost[a]`` and
+      its reversal ``2a + 1`` costs ``-cost[a]``.
     - Returns: (sent_flow, total_cost, flow_dict)
+
+    When a ``curve`` list is given, augmentation continues up to the maximum flow and the list
+    receives the breakpoints of the (convex, piecewise-linear) optimal cost as a function of the
+    flow value: ``{"flow", "cost", "marginal_cost"}`` per breakpoint, starting at
+    ``{"flow": 0, "cost": 0}``; ``marginal_cost`` is the cost per unit of the segment ending
+    there. The returned solution is still the one for ``demand`` (``demand=inf``: the max flow).
     """
+    g = as_graph(model)
+    s, t = g.node(source), g.node(sink)
+    res_start, res_arc, res_head = g.residual
+    rcap = g.residual_capacities()
+    cost = g.cost
+    n = g.n
+    inf = float("inf")
 
-    # Residual network representation
-    # cap[(u,v)] and cost[(u,v)] for residual arcs
-    cap: Dict[Tuple[str, str], float] = {}
-    cost: Dict[Tuple[str, str], float] = {}
-    adj: Dict[str, List[str]] = {n: [] for n in model.nodes}
-
-    def add_arc(u: str, v: str, c: float, w: float) -> None:
-        if (u, v) not in cap:
-            adj[u].append(v)
-            adj[v].append(u)  # ensure residual traversal
-            cap[(u, v)] = 0.0
-            cap[(v, u)] = 0.0
-            cost[(u, v)] = 0.0
-            cost[(v, u)] = 0.0
-        cap[(u, v)] += c
-        cost[(u, v)] = w
-        cost[(v, u)] = -w
-
-    for e in model.edges:
-        add_arc(e.u, e.v, float(e.capacity), float(e.cost))
-        if not model.directed:
-            add_arc(e.v, e.u, float(e.capacity), float(e.cost))
-
-    flow: Dict[Tuple[str, str], float] = {k: 0.0 for k in cap.keys()}
-    potential: Dict[str, float] = {n: 0.0 for n in model.nodes}
-
-    def residual(u: str, v: str) -> float:
-        return cap[(u, v)] - flow[(u, v)]
+    # Bellman-Ford potentials keep reduced costs non-negative when some costs are negative
+    potential = _initial_potentials(g)
+    if potential is None:
+        # Dijkstra never settles around a negative-cost cycle: the b-flow solver saturates it first
+        if curve is not None or demand == inf:
+            raise InfeasibleFlow("Negative-cost cycle: the cost curve is not defined")
+        arc_flow, _, total_cost = successive_shortest_paths(g, _source_sink_supply(g, source, sink, demand))
+        return demand, total_cost, g.pair_flows(arc_flow, EPS)
 
     sent = 0.0
     total_cost = 0.0
-    EPS = 1e-12
+    result = None
+    if curve is not None:
+        curve.append({"flow": 0.0, "cost": 0.0})
+
+    while True:
+        if result is None and sent + EPS >= demand:
+            result = (sent, total_cost, g.pair_flows(rcap[1::2], EPS))
+            if curve is None:
+                break
 
-    while sent + EPS < demand:
         # Dijkstra on reduced costs
-        dist: Dict[str, float] = {n: float("inf") for n in model.nodes}
-        parent: Dict[str, Optional[str]] = {n: None for n in model.nodes}
-        parent_edge: Dict[str, Optional[Tuple[str, str]]] = {n: None for n in model.nodes}
-        dist[source] = 0.0
-        pq: List[Tuple[float, str]] = [(0.0, source)]
+        dist = [inf] * n
+        parent_arc = [-1] * n
+        dist[s] = 0.0
+        pq: List[Tuple[float, int]] = [(0.0, s)]
 
         while pq:
             d, u = heapq.heappop(pq)
             if d != dist[u]:
                 continue
-            for v in adj[u]:
-                if residual(u, v) <= EPS:
+            pu = potential[u]
+            for i in range(res_start[u], res_start[u + 1]):
+                r = res_arc[i]
+                if rcap[r] <= EPS:
                     continue
-                rcost = cost[(u, v)] + potential[u] - potential[v]
-                nd = d + rcost
+                v = res_head[r]
+                c = cost[r >> 1] if not r & 1 else -cost[r >> 1]
+                nd = d + c + pu - potential[v]
                 if nd < dist[v] - 1e-15:
                     dist[v] = nd
-                    parent[v] = u
-                    parent_edge[v] = (u, v)
+                    parent_arc[v] = r
                     heapq.heappush(pq, (nd, v))
 
-        if parent[sink] is None:
-            raise InfeasibleFlow("No augmenting path: demand cannot be satisfied with given capacities")
+        if parent_arc[t] == -1 or s == t:
+            if result is None and demand < inf:
+                raise InfeasibleFlow("No augmenting path: demand cannot be satisfied with given capacities")
+            break
 
         # Update potentials
-        for n in model.nodes:
-            if dist[n] < float("inf"):
-                potential[n] += dist[n]
-
-        # Find bottleneck
-        add = demand - sent
-        v = sink
-        while v != source:
-            e = parent_edge[v]
-            assert e is not None
-            u, w = e
-            add = min(add, residual(u, w))
-            v = parent[v]  # type: ignore
+        for v in range(n):
+            if dist[v] < inf:
+                potential[v] += dist[v]
+
+        # Find bottleneck (stop exactly at the demand so it is a point of the curve)
+        add = demand - sent if result is None else inf
+        v = t
+        while v != s:
+            r = parent_arc[v]
+            add = min(add, rcap[r])
+            v = res_head[r ^ 1]
+        if add == inf:
+            raise InfeasibleFlow("Unbounded: augmenting path with infinite capacity")
 
         # Augment and accumulate true costs
-        v = sink
-        while v != source:
-            u = parent[v]
-            assert u is not None
-            flow[(u, v)] += add
-            flow[(v, u)] -= add
-            total_cost += add * cost[(u, v)]
-            v = u
+        path_cost = 0.0
+        v = t
+        while v != s:
+            r = parent_arc[v]
+            rcap[r] -= add
+            rcap[r ^ 1] += add
+            path_cost += cost[r >> 1] if not r & 1 else -cost[r >> 1]
+            v = res_head[r ^ 1]
 
         sent += add
+        total_cost += add * path_cost
+        if curve is not None:
+            last = curve[-1]
+            if "marginal_cost" in last and abs(last["marginal_cost"] - path_cost) <= 1e-12:
+                # Same slope: extend the last segment instead of adding a breakpoint
+                last["flow"], last["cost"] = sent, total_cost
+            else:
+                curve.append({"flow": sent, "cost": total_cost, "marginal_cost": path_cost})
+
+    if result is None:
+        result = (sent, total_cost, g.pair_flows(rcap[1::2], EPS))
+    return result
+
+
+def min_cost_b_flow(
+    model: Union[NetworkModel, CompiledGraph],
+    supply: Optional[Dict[str, float]] = None,
+    stats: Optional[Dict[str, Any]] = None,
+) -> Tuple[float, Dict[Tuple[str, str], float], Dict[str, float]]:
+    """Minimum-cost flow for per-node supplies (b-flow), without super-source/super-sink nodes.
+
+    ``supply`` maps node -> b(node) (> 0 supply, < 0 demand, must sum to zero); it defaults to
+    ``model.supply``. Returns ``(total_cost, flow_dict, potentials)`` where ``potentials`` give
+    reduced costs ``cost(u, v) + pi[u] - pi[v]`` >= 0 on every residual arc.
+    """
+    g = as_graph(model)
+    if supply is None:
+        supply = getattr(model, "supply", None) or {}
+    b = [0.0] * g.n
+    for name, value in supply.items():
+        b[g.node(name)] += float(value)
+    arc_flow, pot, total_cost = successive_shortest_paths(g, b, stats)
+    return total_cost, g.pair_flows(arc_flow, EPS), {name: pot[i] for i, name in enumerate(g.names)}
+
+
+def _initial_potentials(g: CompiledGraph) -> Optional[List[float]]:
+    # Bellman-Ford (queue based) from a virtual root linked to every node with cost 0, over arcs
+    # with capacity. Zero potentials when no cost is negative; None on a negative-cost cycle.
+    n = g.n
+    pot = [0.0] * n
+    if all(c >= 0 or cap <= EPS for c, cap in zip(g.cost, g.capacity)):
+        return pot
+    out_start, head, cost, cap = g.out_start, g.head, g.cost, g.capacity
+    passes = [0] * n
+    in_queue = [True] * n
+    q = deque(range(n))
+    while q:
+        u = q.popleft()
+        in_queue[u] = False
+        passes[u] += 1
+        if passes[u] > n:
+            return None
+        pu = pot[u]
+        for a in range(out_start[u], out_start[u + 1]):
+            if cap[a] <= EPS:
+                continue
+            v = head[a]
+            nd = pu + cost[a]
+            if nd < pot[v] - 1e-12:
+                pot[v] = nd
+                if not in_queue[v]:
+                    in_queue[v] = True
+                    q.append(v)
+    return pot
+
+
+def successive_shortest_paths(
+    g: CompiledGraph,
+    supply: Sequence[float],
+    stats: Optional[Dict[str, Any]] = None,
+) -> Tuple[List[float], List[float], float]:
+    """Successive shortest paths for node supplies (``sum(supply) == 0``).
+
+    Potentials start at zero, or at Bellman-Ford distances when there are negative costs; if
+    those arcs form a negative cycle, they are saturated up front instead (their reversals then
+    cost > 0) and potentials start at zero.
+    Every round runs one multi-source Dijkstra on reduced costs from *all* excess nodes and
+    stops at the first deficit node settled, then augments along that path. Returns
+    ``(arc_flow, potentials, total_cost)``; raises ``InfeasibleFlow`` when supplies cannot be routed.
+    """
+    n = g.n
+    scale = max(1.0, max((abs(b) for b in supply), default=0.0))
+    if abs(sum(supply)) > 1e-9 * scale:
+        raise InfeasibleFlow("Supplies must sum to zero")
+    res_start, res_arc, res_head = g.residual
+    rcap = g.residual_capacities()
+    cost = g.cost
+    excess = list(supply)
+    pot = _initial_potentials(g)
+    if pot is None:
+        for a in range(g.m):
+            if cost[a] < 0 and rcap[2 * a] > EPS:
+                d = rcap[2 * a]
+                if d == float("inf"):
+                    raise InfeasibleFlow("Unbounded: negative-cost cycle with infinite capacity")
+                rcap[2 * a] = 0.0
+                rcap[2 * a + 1] += d
+                excess[g.tail[a]] -= d
+                excess[g.head[a]] += d
+        pot = [0.0] * n
+        scale = max(scale, max((abs(e) for e in excess), default=0.0))
+    inf = float("inf")
+    tol = 1e-9 * scale
+    rounds = 0
+
+    while True:
+        sources = [u for u in range(n) if excess[u] > tol]
+        if not sources:
+            break
+        rounds += 1
+        dist = [inf] * n
+        parent_arc = [-1] * n
+        pq: List[Tuple[float, int]] = []
+        for u in sources:
+            dist[u] = 0.0
+            pq.append((0.0, u))
+        heapq.heapify(pq)
+        done = [False] * n
+        t = -1
+        while pq:
+            d, u = heapq.heappop(pq)
+            if done[u]:
+                continue
+            done[u] = True
+            if excess[u] < -tol:
+                t = u
+                break
+            pu = pot[u]
+            for i in range(res_start[u], res_start[u + 1]):
+                r = res_arc[i]
+                if rcap[r] <= EPS:
+                    continue
+                v = res_head[r]
+                c = cost[r >> 1] if not r & 1 else -cost[r >> 1]
+                nd = d + c + pu - pot[v]
+                if nd < dist[v] - 1e-15:
+                    dist[v] = nd
+                    parent_arc[v] = r
+                    heapq.heappush(pq, (nd, v))
+
+        if t < 0:
+            raise InfeasibleFlow("No feasible flow: supplies/demand cannot be satisfied with given capacities")
+
+        # Potentials capped at dist[t] keep every residual reduced cost non-negative
+        dt = dist[t]
+        for v in range(n):
+            pot[v] += dist[v] if dist[v] < dt else dt
+
+        # Path back to its excess node; bottleneck includes both endpoints' imbalance
+        add = -excess[t]
+        v = t
+        while parent_arc[v] != -1:
+            r = parent_arc[v]
+            add = min(add, rcap[r])
+            v = res_head[r ^ 1]
+        s = v
+        add = min(add, excess[s])
+
+        v = t
+        while v != s:
+            r = parent_arc[v]
+            rcap[r] -= add
+            rcap[r ^ 1] += add
+            v = res_head[r ^ 1]
+        excess[s] -= add
+        excess[t] += add
+
+    if stats is not None:
+        stats["augmentations"] = rounds
+
+    arc_flow = list(rcap[1::2])
+    return arc_flow, pot, sum(f * c for f, c in zip(arc_flow, cost) if f)
+
+
+# Below this demand SSAP needs at most that many augmentations (integer data), so "auto" keeps it.
+SCALING_MIN_DEMAND = 64
+
+
+def _is_integral(values: Sequence[float]) -> bool:
+    return all(float(v).is_integer() for v in values)
+
+
+def choose_min_cost_flow_algorithm(model: Union[NetworkModel, CompiledGraph], demand: float) -> str:
+    """Pick an SSAP variant from the capacity and cost ranges.
+
+    - fractional capacities/demand, or a small demand: plain ``ssap``;
+    - integer costs whose range ``n * C`` is below the capacity range ``U``: ``cost_scaling``
+      (O(log nC) refine phases);
+    - otherwise ``capacity_scaling`` (O(log U) phases).
+    """
+    g = as_graph(model)
+    if demand < SCALING_MIN_DEMAND or not _is_integral(g.edge_capacity) or not float(demand).is_integer():
+        return "ssap"
+    max_cap = max(g.edge_capacity, default=0.0)
+    max_cost = max((abs(c) for c in g.edge_cost), default=0.0)
+    if _is_integral(g.edge_cost) and max_cost * g.n < max_cap:
+        return "cost_scaling"
+    return "capacity_scaling"
+
+
+def _source_sink_supply(g: CompiledGraph, source: str, sink: str, demand: float) -> List[float]:
+    supply = [0.0] * g.n
+    supply[g.node(source)] += demand
+    supply[g.node(sink)] -= demand
+    return supply
+
+
+def min_cost_flow_capacity_scaling(
+    model: Union[NetworkModel, CompiledGraph],
+    source: str,
+    sink: str,
+    demand: float,
+    stats: Optional[Dict[str, Any]] = None,
+) -> Tuple[float, float, Dict[Tuple[str, str], float]]:
+    """Minimum-cost flow by capacity scaling (successive shortest paths on Delta-residual arcs).
+
+    Same contract as ``min_cost_flow_ssap``; the number of phases is O(log U).
+    """
+    g = as_graph(model)
+    arc_flow, total_cost = capacity_scaling(g, _source_sink_supply(g, source, sink, demand), stats)
+    return demand, total_cost, g.pair_flows(arc_flow)
+
+
+def min_cost_flow_cost_scaling(
+    model: Union[NetworkModel, CompiledGraph],
+    source: str,
+    sink: str,
+    demand: float,
+    stats: Optional[Dict[str, Any]] = None,
+) -> Tuple[float, float, Dict[Tuple[str, str], float]]:
+    """Minimum-cost flow by Goldberg–Tarjan cost scaling (push-relabel refine). Needs integer costs.
+
+    Same contract as ``min_cost_flow_ssap``; the number of phases is O(log nC).
+    """
+    g = as_graph(model)
+    arc_flow, total_cost = cost_scaling(g, _source_sink_supply(g, source, sink, demand), stats)
+    return demand, total_cost, g.pair_flows(arc_flow)
+
+
+def capacity_scaling(
+    g: CompiledGraph,
+    supply: Sequence[float],
+    stats: Optional[Dict[str, Any]] = None,
+) -> Tuple[List[float], float]:
+    """Capacity-scaling successive shortest paths for node supplies.
+
+    Each Delta-phase first saturates the Delta-residual arcs with negative reduced cost and then
+    augments at least Delta units per path, from a node with excess >= Delta to the nearest node
+    with deficit >= Delta (Dijkstra restricted to arcs with residual >= Delta). Delta halves from
+    the largest power of two below the capacity range down to 1; non-integer data gets a last
+    plain-SSP phase. Returns ``(arc_flow, total_cost)``.
+    """
+    n = g.n
+    res_start, res_arc, res_head = g.residual
+    rcap = g.residual_capacities()
+    cost = g.cost
+    excess = list(supply)
+    pot = [0.0] * n
+    inf = float("inf")
+
+    def rcost(r: int) -> float:
+        return cost[r >> 1] if not r & 1 else -cost[r >> 1]
+
+    top = max(max(g.capacity, default=0.0), max((abs(b) for b in supply), default=0.0))
+    deltas: List[float] = []
+    delta = 1.0
+    while delta * 2 <= top:
+        delta *= 2
+    while delta >= 1:
+        deltas.append(delta)
+        delta /= 2
+    if not (_is_integral(g.capacity) and _is_integral(supply)):
+        deltas.append(EPS)
+
+    phases = augmentations = 0
+    for delta in deltas:
+        phases += 1
+        # Saturate Delta-residual arcs that violate reduced-cost optimality
+        for r in range(2 * g.m):
+            if rcap[r] >= delta:
+                u, v = res_head[r ^ 1], res_head[r]
+                if rcost(r) + pot[u] - pot[v] < 0:
+                    d = rcap[r]
+                    rcap[r] = 0.0
+                    rcap[r ^ 1] += d
+                    excess[u] -= d
+                    excess[v] += d
+
+        for s in range(n):
+            while excess[s] >= delta:
+                # Dijkstra from s on reduced costs until a deficit node is settled
+                dist = {s: 0.0}
+                parent_arc: Dict[int, int] = {}
+                settled: List[int] = []
+                done = set()
+                pq: List[Tuple[float, int]] = [(0.0, s)]
+                t = -1
+                while pq:
+                    d, u = heapq.heappop(pq)
+                    if u in done:
+                        continue
+                    done.add(u)
+                    settled.append(u)
+                    if excess[u] <= -delta:
+                        t = u
+                        break
+                    pu = pot[u]
+                    for i in range(res_start[u], res_start[u + 1]):
+                        r = res_arc[i]
+                        if rcap[r] < delta:
+                            continue
+                        v = res_head[r]
+                        nd = d + rcost(r) + pu - pot[v]
+                        if nd < dist.get(v, inf) - 1e-15:
+                            dist[v] = nd
+                            parent_arc[v] = r
+                            heapq.heappush(pq, (nd, v))
+                if t < 0:
+                    break
+
+                # Keep reduced costs of Delta-residual arcs non-negative
+                dt = dist[t]
+                for v in settled:
+                    pot[v] += dist[v] - dt
+
+                add = min(excess[s], -excess[t])
+                v = t
+                while v != s:
+                    r = parent_arc[v]
+                    add = min(add, rcap[r])
+                    v = res_head[r ^ 1]
+                v = t
+                while v != s:
+                    r = parent_arc[v]
+                    rcap[r] -= add
+                    rcap[r ^ 1] += add
+                    v = res_head[r ^ 1]
+                excess[s] -= add
+                excess[t] += add
+                augmentations += 1
+
+    if stats is not None:
+        stats["phases"] = phases
+        stats["augmentations"] = augmentations
+
+    scale = max(1.0, max((abs(b) for b in supply), default=0.0))
+    if any(abs(e) > 1e-9 * scale for e in excess):
+        raise InfeasibleFlow("No augmenting path: demand cannot be satisfied with given capacities")
+
+    arc_flow = list(rcap[1::2])
+    return arc_flow, sum(f * c for f, c in zip(arc_flow, cost) if f)
+
+
+def cost_scaling(
+    g: CompiledGraph,
+    supply: Sequence[float],
+    stats: Optional[Dict[str, Any]] = None,
+    factor: int = 8,
+) -> Tuple[List[float], float]:
+    """Goldberg–Tarjan cost-scaling push-relabel for node supplies (integer costs).
+
+    Costs are multiplied by ``n + 1`` so that a 1-optimal flow is optimal. Each refine phase
+    divides epsilon by ``factor``, saturates arcs with negative reduced cost and discharges
+    active nodes (FIFO) with push/relabel. Big-M artificial arcs through an extra root node
+    keep every phase feasible; flow left on them means the supplies cannot be routed.
+    Returns ``(arc_flow, total_cost)``.
+    """
+    if not _is_integral(g.cost):
+        raise ValueError("Cost scaling requires integer costs")
+    n, m = g.n, g.m
+    root = n
+    N = n + 1
+    max_cost = max((abs(c) for c in g.cost), default=0.0)
+    art_cost = (max_cost + 1) * N
+
+    # Local residual network: real arcs plus one artificial arc per supply/demand node.
+    tails = list(g.tail)
+    heads = list(g.head)
+    caps = list(g.capacity)
+    costs = list(g.cost)
+    for u in range(n):
+        if supply[u] > 0:
+            tails.append(u)
+            heads.append(root)
+            caps.append(supply[u])
+            costs.append(art_cost)
+        elif supply[u] < 0:
+            tails.append(root)
+            heads.append(u)
+            caps.append(-supply[u])
+            costs.append(art_cost)
+    M = len(tails)
+    alpha = N + 1
+    rcap = [0.0] * (2 * M)
+    rhead = [0] * (2 * M)
+    rc = [0] * (2 * M)
+    adj: List[List[int]] = [[] for _ in range(N)]
+    for a in range(M):
+        rcap[2 * a] = caps[a]
+        rhead[2 * a], rhead[2 * a + 1] = heads[a], tails[a]
+        rc[2 * a] = int(costs[a]) * alpha
+        rc[2 * a + 1] = -int(costs[a]) * alpha
+        adj[tails[a]].append(2 * a)
+        adj[heads[a]].append(2 * a + 1)
+
+    excess = list(supply) + [0.0]
+    pot = [0] * N
+    eps = max(1, int(max((abs(c) for c in rc), default=0)))
+    phases = pushes = relabels = 0
+
+    while True:
+        eps = max(1, eps // factor)
+        phases += 1
+        # Make the current flow 0-optimal by saturating negative reduced-cost arcs
+        for u in range(N):
+            pu = pot[u]
+            for r in adj[u]:
+                if rcap[r] > 0 and rc[r] + pu - pot[rhead[r]] < 0:
+                    d = rcap[r]
+                    v = rhead[r]
+                    rcap[r] = 0.0
+                    rcap[r ^ 1] += d
+                    excess[u] -= d
+                    excess[v] += d
+
+        it = [0] * N
+        q = deque(u for u in range(N) if excess[u] > EPS)
+        while q:
+            u = q.popleft()
+            arcs = adj[u]
+            while excess[u] > EPS:
+                i = it[u]
+                pu = pot[u]
+                while i < len(arcs):
+                    r = arcs[i]
+                    if rcap[r] > 0:
+                        v = rhead[r]
+                        if rc[r] + pu - pot[v] < 0:
+                            d = excess[u] if excess[u] < rcap[r] else rcap[r]
+                            rcap[r] -= d
+                            rcap[r ^ 1] += d
+                            if excess[v] <= EPS < excess[v] + d:
+                                q.append(v)
+                            excess[v] += d
+                            excess[u] -= d
+                            pushes += 1
+                            if excess[u] <= EPS:
+                                break
+                    i += 1
+                it[u] = i
+                if excess[u] <= EPS:
+                    break
+                # Relabel: lower pot[u] as much as eps-optimality allows
+                best = None
+                for r in arcs:
+                    if rcap[r] > 0:
+                        cand = pot[rhead[r]] - rc[r] - eps
+                        if best is None or cand > best:
+                            best = cand
+                pot[u] = best if best is not None else pot[u] - eps
+                it[u] = 0
+                relabels += 1
+
+        if eps == 1:
+            break
+
+    if stats is not None:
+        stats["phases"] = phases
+        stats["pushes"] = pushes
+        stats["relabels"] = relabels
+
+    if any(rcap[2 * a + 1] > 1e-9 for a in range(m, M)):
+        raise InfeasibleFlow("No augmenting path: demand cannot be satisfied with given capacities")
 
-    clean = {k: v for k, v in flow.items() if v > EPS}
-    return sent, total_cost, clean
+    arc_flow = [rcap[2 * a + 1] for a in range(m)]
+    return arc_flow, sum(f * c for f, c in zip(arc_flow, g.cost) if f)
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from .graph import CompiledGraph, as_graph
+from .max_flow import _run_max_flow, source_side
+from .model import NetworkModel
+
+
+@dataclass
+class GomoryHuTree:
+    """Gomory–Hu cut tree: one tree edge per node ``i`` (except the root ``0``) joining it to
+    ``parent[i]`` with weight ``weight[i]``.
+
+    The minimum ``u``–``v`` cut value of the original graph is the lightest edge on the tree
+    path between them, and removing that edge splits the nodes into a minimum cut.
+    """
+
+    names: List[str]
+    parent: List[int]
+    weight: List[float]
+    index: Dict[str, int] = field(init=False, repr=False)
+    _depths: Optional[List[int]] = field(default=None, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.index = {name: i for i, name in enumerate(self.names)}
+
+    def edges(self) -> List[Tuple[str, str, float]]:
+        return [(self.names[i], self.names[p], self.weight[i]) for i, p in enumerate(self.parent) if p >= 0]
+
+    def _lightest_on_path(self, u: int, v: int) -> int:
+        # Tree node i whose edge (i, parent[i]) is the lightest on the u-v path (-1 if u == v)
+        depth = self._depth()
+        best, best_w = -1, float("inf")
+        while u != v:
+            if depth[u] < depth[v]:
+                u, v = v, u
+            if self.weight[u] < best_w:
+                best, best_w = u, self.weight[u]
+            u = self.parent[u]
+        return best
+
+    def _depth(self) -> List[int]:
+        depth = self._depths
+        if depth is None:
+            depth = [-1] * len(self.names)
+            for i in range(len(self.names)):
+                path = []
+                v = i
+                while v >= 0 and depth[v] < 0:
+                    path.append(v)
+                    v = self.parent[v]
+                d = depth[v] if v >= 0 else -1
+                for x in reversed(path):
+                    d += 1
+                    depth[x] = d
+            self._depths = depth
+        return depth
+
+    def min_cut_value(self, u: str, v: str) -> float:
+        i = self._lightest_on_path(self.index[u], self.index[v])
+        return float("inf") if i < 0 else self.weight[i]
+
+    def min_cut(self, u: str, v: str) -> Tuple[float, List[str]]:
+        """``(value, side)``: the cut value and the nodes on ``u``'s side of a minimum cut."""
+        i = self._lightest_on_path(self.index[u], self.index[v])
+        if i < 0:
+            return float("inf"), [u]
+        # Removing tree edge (i, parent[i]) leaves i's subtree on one side
+        depth = self._depth()
+        below = [False] * len(self.names)
+        for x in sorted(range(len(self.names)), key=depth.__getitem__):
+            below[x] = x == i or (self.parent[x] >= 0 and below[self.parent[x]])
+        u_below = below[self.index[u]]
+        return self.weight[i], [name for x, name in enumerate(self.names) if below[x] == u_below]
+
+
+# Graph shared by the cuts computed in a worker process (set once by the pool initializer).
+_WORKER_GRAPH: Optional[CompiledGraph] = None
+
+
+def _init_worker(g: CompiledGraph) -> None:
+    global _WORKER_GRAPH
+    _WORKER_GRAPH = g
+
+
+def _cut(g: CompiledGraph, s: int, t: int, algorithm: str) -> Tuple[float, List[bool]]:
+    value, rcap = _run_max_flow(g, s, t, algorithm)
+    return value, source_side(g, s, rcap)
+
+
+def _worker_cut(task: Tuple[int, int, str]) -> Tuple[float, List[bool]]:
+    assert _WORKER_GRAPH is not None
+    return _cut(_WORKER_GRAPH, *task)
+
+
+def gomory_hu_tree(
+    model: Union[NetworkModel, CompiledGraph],
+    algorithm: str = "auto",
+    workers: Optional[int] = None,
+    stats: Optional[Dict[str, Any]] = None,
+) -> GomoryHuTree:
+    """Gomory–Hu tree of an undirected graph (``edge.capacity``) with Gusfield's algorithm:
+    n - 1 max-flow runs on the original graph, no contractions.
+
+    Step ``s`` cuts ``s`` from its current tree parent ``p[s]``; only earlier steps can change
+    ``p[s]``. With ``workers`` > 1 the next ``workers`` steps are solved speculatively in a
+    process pool with the current parents, and a step is re-run only if an earlier step of
+    its batch re-parented it. ``stats["max_flow_runs"]`` counts the runs.
+    """
+    g = as_graph(model)
+    if g.directed:
+        raise ValueError("Gomory–Hu trees need an undirected graph")
+    n = g.n
+    parent = [0] * n
+    weight = [0.0] * n
+    runs = 0
+    pool = None
+    if workers and workers > 1 and n > 2:
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(g,))
+    try:
+        s = 1
+        while s < n:
+            batch = list(range(s, min(n, s + (workers if pool else 1))))
+            tasks = [(x, parent[x], algorithm) for x in batch]
+            if pool is not None:
+                results: Sequence[Tuple[float, List[bool]]] = list(pool.map(_worker_cut, tasks))
+            else:
+                results = [_cut(g, *task) for task in tasks]
+            runs += len(tasks)
+            for (x, t, _), (value, side) in zip(tasks, results):
+                if parent[x] != t:
+                    break  # re-parented by an earlier step of this batch: recompute from x
+                _apply_cut(parent, weight, x, value, side)
+                s = x + 1
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    if stats is not None:
+        stats["max_flow_runs"] = runs
+    parent[0] = -1
+    weight[0] = 0.0
+    return GomoryHuTree(list(g.names), parent, weight)
+
+
+def _apply_cut(parent: List[int], weight: List[float], s: int, value: float, side: List[bool]) -> None:
+    # Gusfield's update after cutting s from t = parent[s]
+    t = parent[s]
+    weight[s] = value
+    for i in range(len(parent)):
+        if i != s and side[i] and parent[i] == t:
+            parent[i] = s
+    if side[parent[t]]:
+        parent[s] = parent[t]
+        parent[t] = s
+        weight[s] = weight[t]
+        weight[t] = value
@@ -1,7 +1,10 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Any, Dict, List, Optional, Tuple
+
+from .graph import CompiledGraph, EdgeView
 
 
 @dataclass(frozen=True)
@@ -24,6 +27,35 @@ class NetworkModel:
     sink: Optional[str] = None
     demand: float = 0.0
     directed: bool = True
+    # Per-node supply for b-flow problems (> 0 supply, < 0 demand); empty -> source/sink/demand
+    supply: Dict[str, float] = field(default_factory=dict)
+    # Optional node coordinates (x, y) or (lat, lon) for A* heuristics
+    coords: Dict[str, Tuple[float, float]] = field(default_factory=dict)
+
+    @cached_property
+    def graph(self) -> CompiledGraph:
+        """CSR-compiled graph, built once per model and shared by all algorithms."""
+        return CompiledGraph.from_model(self)
+
+    @staticmethod
+    def from_graph(graph: CompiledGraph, d: Optional[Dict[str, Any]] = None) -> "NetworkModel":
+        """Model around an already compiled graph (e.g. loaded from an edge list or a binary
+        file). Nodes, edges and ``directed`` come from ``graph`` (edges as a lazy
+        ``EdgeView``), as do the coordinates; the query fields (source, sink, demand, supply)
+        come from ``d``."""
+        meta = NetworkModel.from_dict({k: v for k, v in (d or {}).items() if k not in ("nodes", "edges")})
+        model = NetworkModel(
+            nodes=graph.names,
+            edges=EdgeView(graph),  # type: ignore[arg-type]
+            source=meta.source,
+            sink=meta.sink,
+            demand=meta.demand,
+            directed=graph.directed,
+            supply=meta.supply,
+        )
+        # Seed the cached_property so the graph is never recompiled from Edge objects
+        model.__dict__["graph"] = graph
+        return model
 
     @staticmethod
     def from_dict(d: Dict[str, Any]) -> "NetworkModel":
@@ -66,6 +98,28 @@ class NetworkModel:
 
         source = str(d.get("source")) if d.get("source") is not None else None
 
+        # Supplies: {"node": value} or a list of {"node": ..., "supply": ...}
+        supply_in = d.get("supply", d.get("supplies")) or {}
+        if isinstance(supply_in, dict):
+            items = list(supply_in.items())
+        else:
+            items = [(s.get("node"), s.get("supply", s.get("value"))) for s in supply_in]
+        supply: Dict[str, float] = {}
+        for name, value in items:
+            b = float(value or 0.0)
+            if b:
+                supply[str(name)] = supply.get(str(name), 0.0) + b
+
+        # Coordinates: {"node": [x, y]} or {"node": {"x": .., "y": ..}} / {"lat": .., "lon": ..}
+        coords: Dict[str, Tuple[float, float]] = {}
+        for name, c in (d.get("coords", d.get("positions")) or {}).items():
+            if isinstance(c, dict):
+                if "lat" in c:
+                    c = (c.get("lat"), c.get("lon", c.get("lng")))
+                else:
+                    c = (c.get("x"), c.get("y"))
+            coords[str(name)] = (float(c[0]), float(c[1]))
+
         return NetworkModel(
             nodes=nodes,
             edges=edges,
@@ -73,4 +127,6 @@ class NetworkModel:
             sink=sink,
             demand=float(d.get("demand", 0.0) or 0.0),
             directed=directed,
+            supply=supply,
+            coords=coords,
         )
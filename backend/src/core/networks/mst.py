@@ -1,27 +1,38 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Dict, List, Tuple
+import math
+from typing import List, Optional, Tuple, Union
 
+from .errors import NetworkModelError
+from .graph import CompiledGraph, as_graph
 from .model import NetworkModel, Edge
 
+try:  # NumPy is optional: it vectorizes the Prim key updates and the Borůvka scans
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
+# "auto" uses the O(V^2) Prim when the graph has at least this fraction of all possible edges.
+DENSE_FRACTION = 0.25
+# ... and Borůvka (with NumPy) on sparse graphs with at least this many edges.
+BORUVKA_MIN_EDGES = 100_000
+
 
-@dataclass
 class _DSU:
-    parent: Dict[str, str]
-    rank: Dict[str, int]
+    """Disjoint-set union over integer node ids (path halving + union by rank)."""
 
-    @staticmethod
-    def make(nodes: List[str]) -> "_DSU":
-        return _DSU(parent={n: n for n in nodes}, rank={n: 0 for n in nodes})
+    def __init__(self, n: int) -> None:
+        self.parent = list(range(n))
+        self.rank = [0] * n
 
-    def find(self, x: str) -> str:
-        while self.parent[x] != x:
-            self.parent[x] = self.parent[self.parent[x]]
-            x = self.parent[x]
+    def find(self, x: int) -> int:
+        parent = self.parent
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
         return x
 
-    def union(self, a: str, b: str) -> bool:
+    def union(self, a: int, b: int) -> bool:
         ra, rb = self.find(a), self.find(b)
         if ra == rb:
             return False
@@ -33,22 +44,275 @@ class _DSU:
         return True
 
 
-def kruskal_mst(model: NetworkModel) -> Tuple[float, List[Edge]]:
+def kruskal_mst(model: Union[NetworkModel, CompiledGraph]) -> Tuple[float, List[Edge]]:
     """Minimum Spanning Tree (Kruskal).
 
     Treats the graph as **undirected** (even if model.directed True).
-    Uses ``edge.weight``.
+    Uses ``edge.weight``; edges are sorted by index on the compiled weight column.
     """
-    dsu = _DSU.make(model.nodes)
-    edges = sorted(model.edges, key=lambda e: float(e.weight))
+    g = as_graph(model)
+    dsu = _DSU(g.n)
+    weight = g.edge_weight
+    eu, ev = g.edge_u, g.edge_v
+    order = sorted(range(g.num_edges), key=weight.__getitem__)
     mst: List[Edge] = []
     total = 0.0
-    for e in edges:
-        if dsu.union(e.u, e.v):
-            mst.append(e)
-            total += float(e.weight)
-            if len(mst) == max(0, len(model.nodes) - 1):
+    target = max(0, g.n - 1)
+    for e in order:
+        if dsu.union(eu[e], ev[e]):
+            mst.append(g.edge(e))
+            total += weight[e]
+            if len(mst) == target:
                 break
 
     # If graph disconnected, mst will be smaller.
     return total, mst
+
+
+def choose_mst_algorithm(model: Union[NetworkModel, CompiledGraph]) -> str:
+    """``prim`` for dense graphs, ``boruvka`` for large sparse graphs (with NumPy), else ``kruskal``."""
+    g = as_graph(model)
+    if g.n > 1 and g.num_edges >= DENSE_FRACTION * g.n * (g.n - 1) / 2:
+        return "prim"
+    if np is not None and g.num_edges >= BORUVKA_MIN_EDGES:
+        return "boruvka"
+    return "kruskal"
+
+
+def minimum_spanning_tree(
+    model: Union[NetworkModel, CompiledGraph], algorithm: str = "auto"
+) -> Tuple[float, List[Edge]]:
+    """MST (a spanning forest if the graph is disconnected) with the chosen engine."""
+    if algorithm == "auto":
+        algorithm = choose_mst_algorithm(model)
+    if algorithm == "kruskal":
+        return kruskal_mst(model)
+    if algorithm == "prim":
+        return prim_mst(model)
+    if algorithm == "boruvka":
+        return boruvka_mst(model)
+    raise ValueError(f"Unknown MST algorithm: {algorithm}")
+
+
+def _next_root(done: List[bool], start: int) -> int:
+    while done[start]:
+        start += 1
+    return start
+
+
+def prim_mst(model: Union[NetworkModel, CompiledGraph]) -> Tuple[float, List[Edge]]:
+    """Array-based Prim, O(V^2 + E): no heap, the next node is a linear scan of the keys.
+
+    Meant for dense graphs where ``E`` is close to ``V^2`` and a heap only adds overhead.
+    Treats the graph as undirected; a disconnected graph gives a spanning forest.
+    """
+    g = as_graph(model)
+    n = g.n
+    if n == 0:
+        return 0.0, []
+    if np is not None:
+        via = _prim_numpy(g)
+    else:
+        via = _prim_python(g)
+    mst = [g.edge(e) for e in via if e >= 0]
+    return sum(e.weight for e in mst), mst
+
+
+def _prim_python(g: CompiledGraph) -> List[int]:
+    n = g.n
+    inf = float("inf")
+    out_start, head, weight, arc_edge = g.out_start, g.head, g.weight, g.arc_edge
+    in_start, in_arc, tail = g.in_start, g.in_arc, g.tail
+    # key[v]: lightest edge from the tree to v (inf once v is in the tree, see done)
+    key = [inf] * n
+    via = [-1] * n
+    done = [False] * n
+    root = 0
+    for _ in range(n):
+        best = min(key)
+        if best < inf:
+            u = key.index(best)
+        else:
+            root = u = _next_root(done, root)  # new component
+        key[u] = inf
+        done[u] = True
+        for a in range(out_start[u], out_start[u + 1]):
+            v = head[a]
+            if not done[v] and weight[a] < key[v]:
+                key[v] = weight[a]
+                via[v] = arc_edge[a]
+        if g.directed:
+            for i in range(in_start[u], in_start[u + 1]):
+                a = in_arc[i]
+                v = tail[a]
+                if not done[v] and weight[a] < key[v]:
+                    key[v] = weight[a]
+                    via[v] = arc_edge[a]
+    return via
+
+
+def _as_int64(col) -> "np.ndarray":
+    return np.frombuffer(col, dtype=np.int64) if col.itemsize == 8 else np.array(col, dtype=np.int64)
+
+
+def _prim_numpy(g: CompiledGraph) -> List[int]:
+    n = g.n
+    inf = np.inf
+    out_start = _as_int64(g.out_start)
+    head, tail, arc_edge = _as_int64(g.head), _as_int64(g.tail), _as_int64(g.arc_edge)
+    in_start, in_arc = _as_int64(g.in_start), _as_int64(g.in_arc)
+    weight = np.frombuffer(g.weight, dtype=np.float64)
+    key = np.full(n, inf)
+    via = np.full(n, -1, dtype=np.int64)
+    done = np.zeros(n, dtype=bool)
+    root = 0
+    for _ in range(n):
+        u = int(np.argmin(key))
+        if key[u] == inf:
+            root = u = int(np.argmin(done[root:])) + root  # new component
+        key[u] = inf
+        done[u] = True
+        arcs = np.arange(out_start[u], out_start[u + 1])
+        nbr = head[arcs]
+        if g.directed:
+            back = in_arc[in_start[u]:in_start[u + 1]]
+            arcs = np.concatenate((arcs, back))
+            nbr = np.concatenate((nbr, tail[back]))
+        w = weight[arcs]
+        keep = ~done[nbr] & (w < key[nbr])
+        if not keep.any():
+            continue
+        arcs, nbr, w = arcs[keep], nbr[keep], w[keep]
+        # Parallel edges: minimum.at keeps the lightest, then the arcs matching it win
+        np.minimum.at(key, nbr, w)
+        hit = w == key[nbr]
+        via[nbr[hit]] = arc_edge[arcs[hit]]
+    return via.tolist()
+
+
+def euclidean_prim_mst(
+    names: List[str], xs: List[float], ys: List[float]
+) -> Tuple[float, List[Edge]]:
+    """Prim on the complete graph of points ``(xs[i], ys[i])`` with Euclidean weights.
+
+    Distances are computed on the fly from the tree node to every other point, so the
+    ``V^2 / 2`` edges are never materialized: O(V^2) time, O(V) memory.
+    """
+    n = len(names)
+    if n == 0:
+        return 0.0, []
+    via = [-1] * n
+    if np is not None:
+        x, y = np.asarray(xs, dtype=np.float64), np.asarray(ys, dtype=np.float64)
+        key = np.full(n, np.inf)
+        par = np.full(n, -1, dtype=np.int64)
+        done = np.zeros(n, dtype=bool)
+        u = 0
+        for _ in range(n - 1):
+            done[u] = True
+            key[u] = np.inf
+            d = np.hypot(x - x[u], y - y[u])
+            upd = ~done & (d < key)
+            key[upd] = d[upd]
+            par[upd] = u
+            u = int(np.argmin(key))
+        via = par.tolist()
+    else:
+        inf = float("inf")
+        key = [inf] * n
+        done = [False] * n
+        u = 0
+        for _ in range(n - 1):
+            done[u] = True
+            key[u] = inf
+            ux, uy = xs[u], ys[u]
+            for v in range(n):
+                if not done[v]:
+                    d = math.hypot(xs[v] - ux, ys[v] - uy)
+                    if d < key[v]:
+                        key[v] = d
+                        via[v] = u
+            u = key.index(min(key))
+    mst = [Edge(names[p], names[v], weight=math.hypot(xs[v] - xs[p], ys[v] - ys[p]))
+           for v, p in enumerate(via) if p >= 0]
+    return sum(e.weight for e in mst), mst
+
+
+def euclidean_mst(model: Union[NetworkModel, CompiledGraph]) -> Tuple[float, List[Edge]]:
+    """MST of the complete Euclidean graph on the model's node coordinates (edges ignored)."""
+    g = as_graph(model)
+    if g.coord_x is None or g.coord_y is None:
+        raise NetworkModelError("Euclidean MST requires 'coords' for every node")
+    xs, ys = list(g.coord_x), list(g.coord_y)
+    missing = [g.names[i] for i in range(g.n) if math.isnan(xs[i]) or math.isnan(ys[i])]
+    if missing:
+        raise NetworkModelError(f"Missing coordinates for: {', '.join(missing[:5])}")
+    return euclidean_prim_mst(g.names, xs, ys)
+
+
+def boruvka_mst(model: Union[NetworkModel, CompiledGraph]) -> Tuple[float, List[Edge]]:
+    """Borůvka: every round each component picks its lightest outgoing edge and all of them
+    are contracted at once, so there are at most ``log2 V`` rounds over the surviving edges.
+
+    With NumPy the per-component minimum is one ``np.minimum.at`` over edge ranks (ties broken
+    by edge index, which keeps the chosen edges acyclic) and inner edges are filtered out
+    between rounds. Treats the graph as undirected.
+    """
+    g = as_graph(model)
+    chosen = _boruvka_numpy(g) if np is not None else _boruvka_python(g)
+    mst = [g.edge(e) for e in chosen]
+    return sum(e.weight for e in mst), mst
+
+
+def _boruvka_numpy(g: CompiledGraph) -> List[int]:
+    n, E = g.n, g.num_edges
+    eu, ev = _as_int64(g.edge_u), _as_int64(g.edge_v)
+    order = np.argsort(np.frombuffer(g.edge_weight, dtype=np.float64), kind="stable")
+    rank = np.empty(E, dtype=np.int64)
+    rank[order] = np.arange(E)
+    comp = np.arange(n)
+    live = np.flatnonzero(eu != ev)
+    cu, cv = comp[eu[live]], comp[ev[live]]
+    dsu = _DSU(n)
+    chosen: List[int] = []
+    while live.size:
+        # Lightest edge (lowest rank) leaving each component, from both endpoints
+        best = np.full(n, E, dtype=np.int64)
+        r = rank[live]
+        np.minimum.at(best, cu, r)
+        np.minimum.at(best, cv, r)
+        for e in np.unique(order[best[best < E]]).tolist():
+            if dsu.union(int(eu[e]), int(ev[e])):
+                chosen.append(e)
+        # Pointer jumping on the DSU parents gives every node its root
+        comp = np.array(dsu.parent, dtype=np.int64)
+        while True:
+            up = comp[comp]
+            if np.array_equal(up, comp):
+                break
+            comp = up
+        cu, cv = comp[eu[live]], comp[ev[live]]
+        outer = cu != cv
+        live, cu, cv = live[outer], cu[outer], cv[outer]
+    return chosen
+
+
+def _boruvka_python(g: CompiledGraph) -> List[int]:
+    n = g.n
+    eu, ev, weight = g.edge_u, g.edge_v, g.edge_weight
+    dsu = _DSU(n)
+    live = [e for e in range(g.num_edges) if eu[e] != ev[e]]
+    chosen: List[int] = []
+    while live:
+        best: List[Optional[int]] = [None] * n
+        for e in live:
+            key = (weight[e], e)
+            for c in (dsu.find(eu[e]), dsu.find(ev[e])):
+                b = best[c]
+                if b is None or key < (weight[b], b):
+                    best[c] = e
+        for e in {e for e in best if e is not None}:
+            if dsu.union(eu[e], ev[e]):
+                chosen.append(e)
+        live = [e for e in live if dsu.find(eu[e]) != dsu.find(ev[e])]
+    return chosen
@@ -0,0 +1,288 @@
+from __future__ import annotations
+
+import heapq
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from ..lp.dual import dual_values
+from ..lp.model import Constraint, LPModel
+from ..lp.two_phase import solve_two_phase
+from .graph import CompiledGraph, as_graph
+from .model import NetworkModel
+
+EPS = 1e-9
+
+
+@dataclass
+class Commodity:
+    """``demand`` units of one product to route from ``source`` to ``sink``."""
+
+    source: str
+    sink: str
+    demand: float
+    name: str = ""
+
+
+@dataclass
+class MultiCommodityFlow:
+    """Result of :func:`multicommodity_flow`.
+
+    ``flows[k]`` and ``paths[k]`` are commodity ``k``'s pair flows and ``(nodes, flow)`` paths;
+    ``unmet[k]`` is the part of its demand that could not be routed (``status`` is
+    ``"infeasible"`` when any is positive, ``"iteration_limit"`` when column generation stopped
+    at ``max_iter`` before converging). ``prices`` lists the congested arcs as
+    ``(u, v, price, flow, capacity)``: ``price`` is the dual of the arc's shared capacity, i.e.
+    how much the total cost would drop per extra unit of capacity.
+    """
+
+    status: str
+    total_cost: float
+    commodities: List[Commodity]
+    flows: List[Dict[Tuple[str, str], float]]
+    paths: List[List[Tuple[List[str], float]]]
+    unmet: List[float]
+    prices: List[Tuple[str, str, float, float, float]]
+    iterations: int
+    columns: int
+    history: List[Dict[str, float]] = field(default_factory=list)
+
+
+def _cheapest_paths(
+    g: CompiledGraph, s: int, cost: Sequence[float], targets: Sequence[int]
+) -> Dict[int, Tuple[float, List[int]]]:
+    # Dijkstra from s on the priced arc costs (inf = unusable arc); stops once every target is
+    # settled and returns target -> (cost, arcs of the path)
+    inf = float("inf")
+    dist = [inf] * g.n
+    pred = [-1] * g.n
+    dist[s] = 0.0
+    left = set(targets)
+    pq: List[Tuple[float, int]] = [(0.0, s)]
+    out_start, head = g.out_start, g.head
+    while pq and left:
+        d, u = heapq.heappop(pq)
+        if d != dist[u]:
+            continue
+        left.discard(u)
+        for a in range(out_start[u], out_start[u + 1]):
+            nd = d + cost[a]
+            v = head[a]
+            if nd < dist[v]:
+                dist[v] = nd
+                pred[v] = a
+                heapq.heappush(pq, (nd, v))
+    found = {}
+    for t in targets:
+        if dist[t] == inf:
+            continue
+        arcs = []
+        v = t
+        while v != s:
+            arcs.append(pred[v])
+            v = g.tail[pred[v]]
+        found[t] = (dist[t], arcs[::-1])
+    return found
+
+
+# Graph shared by the pricing searches of a worker process (set once by the pool initializer).
+_WORKER_GRAPH: Optional[CompiledGraph] = None
+
+
+def _init_worker(g: CompiledGraph) -> None:
+    global _WORKER_GRAPH
+    _WORKER_GRAPH = g
+
+
+def _worker_paths(task: Tuple[int, List[float], List[int]]) -> Dict[int, Tuple[float, List[int]]]:
+    assert _WORKER_GRAPH is not None
+    return _cheapest_paths(_WORKER_GRAPH, *task)
+
+
+def multicommodity_flow(
+    model: Union[NetworkModel, CompiledGraph],
+    commodities: Sequence[Commodity],
+    workers: Optional[int] = None,
+    max_iter: int = 200,
+    stats: Optional[Dict[str, Any]] = None,
+) -> MultiCommodityFlow:
+    """Minimum-cost multi-commodity flow: every commodity pays ``edge.cost`` per unit and arc,
+    and all commodities share each arc's ``edge.capacity`` (undirected edges are mirrored, one
+    capacity per direction, as in the single-commodity solvers).
+
+    Path-based column generation. The restricted master (one column per known path, plus a
+    penalized "unmet" column per commodity so it is always feasible) is solved with the LP
+    module's two-phase simplex and its duals give a congestion price ``p_a >= 0`` per shared
+    arc and a price ``sigma_k`` per commodity. Pricing is a Dijkstra per source on
+    ``cost + p``; every commodity whose shortest path costs less than ``sigma_k`` adds it as a
+    column. Commodities are grouped by source (one search serves all their sinks) and, with
+    ``workers`` > 1, the searches of an iteration run in a process pool.
+
+    Each iteration records the master cost and the Lagrangian lower bound
+    ``sum_k d_k * dist_k - sum_a p_a * u_a`` in ``history``. Costs must be non-negative;
+    ``stats`` receives ``iterations``, ``columns`` and ``searches``.
+    """
+    g = as_graph(model)
+    if any(c < 0 for c in g.cost):
+        raise ValueError("Multi-commodity flow requires non-negative costs")
+    K = len(commodities)
+    if K == 0:
+        raise ValueError("Multi-commodity flow requires at least one commodity")
+    ends = [(g.node(c.source), g.node(c.sink)) for c in commodities]
+    demand = [float(c.demand) for c in commodities]
+    if any(d < 0 for d in demand):
+        raise ValueError("Commodity demands must be non-negative")
+    # source == sink: nothing to route
+    demand = [0.0 if s == t else d for (s, t), d in zip(ends, demand)]
+    # An unmet unit costs more than any simple path
+    penalty = 1.0 + sum(g.cost)
+    usable = [g.capacity[a] > EPS for a in range(g.m)]
+
+    by_source: Dict[int, List[int]] = {}
+    for k, (s, _) in enumerate(ends):
+        by_source.setdefault(s, []).append(k)
+
+    # Columns: (commodity, arcs of the path, cost); rows: arcs used by some column
+    columns: List[Tuple[int, Tuple[int, ...], float]] = []
+    known = set()
+    rows: Dict[int, int] = {}
+    history: List[Dict[str, float]] = []
+    searches = 0
+
+    pool = None
+    if workers and workers > 1 and len(by_source) > 1:
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(g,))
+    try:
+        def price(p: Dict[int, float]) -> List[Optional[Tuple[float, List[int]]]]:
+            # Cheapest path per commodity on cost + p (None if its sink is unreachable)
+            nonlocal searches
+            cost = [g.cost[a] + p.get(a, 0.0) if usable[a] else float("inf") for a in range(g.m)]
+            tasks = [(s, cost, sorted({ends[k][1] for k in ks})) for s, ks in by_source.items()]
+            searches += len(tasks)
+            if pool is not None:
+                results = list(pool.map(_worker_paths, tasks))
+            else:
+                results = [_cheapest_paths(g, *task) for task in tasks]
+            best: List[Optional[Tuple[float, List[int]]]] = [None] * K
+            for (s, _, _), found in zip(tasks, results):
+                for k in by_source[s]:
+                    best[k] = found.get(ends[k][1])
+            return best
+
+        def add_column(k: int, arcs: List[int]) -> bool:
+            key = (k, tuple(arcs))
+            if key in known:
+                return False
+            known.add(key)
+            columns.append((k, key[1], sum(g.cost[a] for a in arcs)))
+            for a in arcs:
+                rows.setdefault(a, len(rows))
+            return True
+
+        for k, found in enumerate(price({})):
+            if found is not None and demand[k] > 0:
+                add_column(k, found[1])
+
+        iterations = 0
+        while True:
+            iterations += 1
+            master = _build_master(g, columns, rows, demand, penalty)
+            res = solve_two_phase(master)
+            if res.status != "OPTIMAL":
+                raise RuntimeError(f"Multi-commodity master: {res.message}")
+            y = dual_values(master)
+            # Capacity duals are <= 0 in a MIN problem; the congestion price is their negation
+            p = {a: max(0.0, -y[r]) for a, r in rows.items()}
+            sigma = y[len(rows):]
+            # The solution below is this master's: columns priced after it have no flow yet
+            n_paths = len(columns)
+
+            best = price(p)
+            bound = -sum(p[a] * g.capacity[a] for a in rows)
+            added = 0
+            for k, found in enumerate(best):
+                dist = found[0] if found is not None else float("inf")
+                bound += demand[k] * min(dist, penalty)
+                if found is not None and demand[k] > 0 and dist < sigma[k] - EPS * (1.0 + abs(sigma[k])):
+                    added += add_column(k, found[1])
+            history.append({
+                "iteration": iterations,
+                "master_cost": res.objective_value,
+                "lower_bound": bound,
+                "gap": res.objective_value - bound,
+                "columns_added": added,
+            })
+            if added == 0 or iterations >= max_iter:
+                converged = added == 0
+                break
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    x = res.x
+    arc_flows = [[0.0] * g.m for _ in range(K)]
+    paths: List[List[Tuple[List[str], float]]] = [[] for _ in range(K)]
+    total = 0.0
+    for (k, arcs, c), f in zip(columns[:n_paths], x[:n_paths]):
+        if f <= EPS:
+            continue
+        total += c * f
+        for a in arcs:
+            arc_flows[k][a] += f
+        nodes = [g.tail[arcs[0]]] + [g.head[a] for a in arcs]
+        paths[k].append(([g.names[v] for v in nodes], f))
+    unmet = [v if v > EPS else 0.0 for v in x[n_paths:n_paths + K]]
+
+    prices = []
+    for a in sorted(p, key=rows.__getitem__):
+        if p[a] > EPS:
+            flow = sum(arc_flows[k][a] for k in range(K))
+            prices.append((g.names[g.tail[a]], g.names[g.head[a]], p[a], flow, g.capacity[a]))
+
+    if not converged:
+        status = "iteration_limit"
+    elif any(u > EPS for u in unmet):
+        status = "infeasible"
+    else:
+        status = "optimal"
+    if stats is not None:
+        stats.update({"iterations": iterations, "columns": n_paths, "searches": searches})
+    return MultiCommodityFlow(
+        status=status,
+        total_cost=total,
+        commodities=list(commodities),
+        flows=[g.pair_flows(f, EPS) for f in arc_flows],
+        paths=paths,
+        unmet=unmet,
+        prices=prices,
+        iterations=iterations,
+        columns=n_paths,
+        history=history,
+    )
+
+
+def _build_master(
+    g: CompiledGraph,
+    columns: List[Tuple[int, Tuple[int, ...], float]],
+    rows: Dict[int, int],
+    demand: List[float],
+    penalty: float,
+) -> LPModel:
+    # Variables: [path flows..., unmet_k...]; rows: shared capacities (<=), then demands (=)
+    K = len(demand)
+    n = len(columns) + K
+    cap = [[0.0] * n for _ in rows]
+    dem = [[0.0] * n for _ in range(K)]
+    for j, (k, arcs, _) in enumerate(columns):
+        for a in arcs:
+            cap[rows[a]][j] += 1.0
+        dem[k][j] = 1.0
+    for k in range(K):
+        dem[k][len(columns) + k] = 1.0
+    capacity = [0.0] * len(rows)
+    for a, r in rows.items():
+        capacity[r] = g.capacity[a]
+    constraints = [Constraint(a=row, op="<=", b=b) for row, b in zip(cap, capacity)]
+    constraints += [Constraint(a=row, op="=", b=d) for row, d in zip(dem, demand)]
+    c = [col[2] for col in columns] + [penalty] * K
+    return LPModel(name="multicommodity-master", sense="min", c=c, constraints=constraints)
@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+import math
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from .graph import CompiledGraph, as_graph
+from .min_cost_flow import InfeasibleFlow
+from .model import NetworkModel
+
+# Arc states: at lower bound, in the spanning tree, at upper bound.
+STATE_LOWER = 1
+STATE_TREE = 0
+STATE_UPPER = -1
+
+# Orientation of the tree arc joining a node to its parent.
+DIR_UP = 1  # node -> parent
+DIR_DOWN = -1  # parent -> node
+
+EPS = 1e-12
+COST_EPS = 1e-9
+
+
+def network_simplex(
+    model: Union[NetworkModel, CompiledGraph],
+    source: str,
+    sink: str,
+    demand: float,
+    stats: Optional[Dict[str, Any]] = None,
+) -> Tuple[float, float, Dict[Tuple[str, str], float], Dict[str, float]]:
+    """Minimum-cost flow for a single source->sink demand (primal network simplex).
+
+    - Uses ``edge.capacity`` and ``edge.cost``; undirected edges are mirrored arcs.
+    - Returns: (sent_flow, total_cost, flow_dict, potentials)
+
+    ``potentials`` are the node duals ``pi`` of the optimal spanning tree: every arc has
+    reduced cost ``cost(u, v) + pi[u] - pi[v]`` >= 0 when it carries no flow, <= 0 when it
+    is saturated and 0 in between. They are shifted so that ``pi[source] == 0``.
+    """
+    g = as_graph(model)
+    s, t = g.node(source), g.node(sink)
+    supply = [0.0] * g.n
+    supply[s] += demand
+    supply[t] -= demand
+    arc_flow, pi, total_cost = solve_network_simplex(g, supply, stats)
+    shift = pi[s]
+    potentials = {name: pi[i] - shift for i, name in enumerate(g.names)}
+    return demand, total_cost, g.pair_flows(arc_flow, EPS), potentials
+
+
+def solve_network_simplex(
+    g: CompiledGraph,
+    supply: Sequence[float],
+    stats: Optional[Dict[str, Any]] = None,
+) -> Tuple[List[float], List[float], float]:
+    """Network simplex on a compiled graph with node supplies (``sum(supply) == 0``).
+
+    Uses an artificial root with big-M artificial arcs as the initial strongly feasible
+    spanning tree, block-search pivoting (block size ~ sqrt(arcs)) and the leaving-arc rule
+    that keeps the tree strongly feasible (no cycling on degenerate pivots). Node potentials
+    are updated only on the subtree that moves in each pivot.
+
+    Returns ``(arc_flow, potentials, total_cost)``; raises ``InfeasibleFlow`` when the
+    supplies cannot be routed.
+    """
+    n, m = g.n, g.m
+    if abs(sum(supply)) > 1e-9 * max(1.0, sum(abs(b) for b in supply)):
+        raise InfeasibleFlow("Supplies must sum to zero")
+    root = n
+    total = m + n
+
+    src = list(g.tail) + [0] * n
+    tgt = list(g.head) + [0] * n
+    cap = list(g.capacity) + [math.inf] * n
+    cost = list(g.cost) + [0.0] * n
+    flow = [0.0] * total
+    state = [STATE_LOWER] * m + [STATE_TREE] * n
+
+    art_cost = (max((abs(c) for c in g.cost), default=0.0) + 1.0) * (n + 1)
+    parent = [root] * n + [-1]
+    pred = list(range(m, m + n)) + [-1]
+    pred_dir = [DIR_UP] * (n + 1)
+    depth = [1] * n + [0]
+    pi = [0.0] * (n + 1)
+    children: List[List[int]] = [[] for _ in range(n)] + [list(range(n))]
+
+    for u in range(n):
+        e = m + u
+        if supply[u] >= 0:
+            src[e], tgt[e] = u, root
+            flow[e] = supply[u]
+            pred_dir[u] = DIR_UP
+        else:
+            src[e], tgt[e] = root, u
+            flow[e] = -supply[u]
+            cost[e] = art_cost
+            pred_dir[u] = DIR_DOWN
+            pi[u] = art_cost
+
+    block = max(10, int(math.sqrt(m))) if m else 1
+    next_arc = 0
+    pivots = 0
+
+    def find_entering() -> int:
+        # Block search: scan ``block`` arcs, take the most negative reduced cost seen so far
+        nonlocal next_arc
+        best, best_c, cnt = -1, -COST_EPS, block
+        e = next_arc
+        for _ in range(m):
+            c = state[e] * (cost[e] + pi[src[e]] - pi[tgt[e]])
+            if c < best_c:
+                best, best_c = e, c
+            e += 1
+            if e == m:
+                e = 0
+            cnt -= 1
+            if cnt == 0:
+                if best >= 0:
+                    next_arc = e
+                    return best
+                cnt = block
+        return best
+
+    while True:
+        e_in = find_entering() if m else -1
+        if e_in < 0:
+            break
+        pivots += 1
+
+        if state[e_in] == STATE_LOWER:
+            first, second = src[e_in], tgt[e_in]
+        else:
+            first, second = tgt[e_in], src[e_in]
+
+        # Apex of the cycle
+        u, v = first, second
+        while u != v:
+            if depth[u] > depth[v]:
+                u = parent[u]
+            elif depth[v] > depth[u]:
+                v = parent[v]
+            else:
+                u, v = parent[u], parent[v]
+        join = u
+
+        # Leaving arc: last blocking arc in cycle orientation (strongly feasible rule)
+        delta = cap[e_in]
+        result, u_out = 0, -1
+        u = first
+        while u != join:
+            a = pred[u]
+            d = flow[a] if pred_dir[u] == DIR_UP else cap[a] - flow[a]
+            if d < delta:
+                delta, u_out, result = d, u, 1
+            u = parent[u]
+        u = second
+        while u != join:
+            a = pred[u]
+            d = cap[a] - flow[a] if pred_dir[u] == DIR_UP else flow[a]
+            if d <= delta:
+                delta, u_out, result = d, u, 2
+            u = parent[u]
+        if delta == math.inf:
+            raise InfeasibleFlow("Unbounded: negative-cost cycle with infinite capacity")
+
+        # Push delta around the cycle
+        if delta > 0:
+            val = state[e_in] * delta
+            flow[e_in] += val
+            u = src[e_in]
+            while u != join:
+                flow[pred[u]] -= pred_dir[u] * val
+                u = parent[u]
+            u = tgt[e_in]
+            while u != join:
+                flow[pred[u]] += pred_dir[u] * val
+                u = parent[u]
+
+        if result == 0:
+            # The entering arc itself blocks: it just switches bound
+            state[e_in] = -state[e_in]
+            continue
+
+        if result == 1:
+            u_in, v_in = first, second
+        else:
+            u_in, v_in = second, first
+
+        e_out = pred[u_out]
+        if flow[e_out] <= EPS:
+            flow[e_out] = 0.0
+            state[e_out] = STATE_LOWER
+        else:
+            flow[e_out] = cap[e_out]
+            state[e_out] = STATE_UPPER
+        state[e_in] = STATE_TREE
+
+        # Re-hang the subtree of u_out below v_in, reversing the path u_in -> u_out
+        path = [u_in]
+        while path[-1] != u_out:
+            path.append(parent[path[-1]])
+        children[parent[u_out]].remove(u_out)
+        old_pred = [pred[x] for x in path]
+        old_dir = [pred_dir[x] for x in path]
+        for i in range(len(path) - 1, 0, -1):
+            x, y = path[i], path[i - 1]
+            children[x].remove(y)
+            parent[x] = y
+            pred[x] = old_pred[i - 1]
+            pred_dir[x] = -old_dir[i - 1]
+            children[y].append(x)
+        parent[u_in] = v_in
+        pred[u_in] = e_in
+        pred_dir[u_in] = DIR_UP if src[e_in] == u_in else DIR_DOWN
+        children[v_in].append(u_in)
+
+        # Update depth and potentials on the moved subtree only
+        stack = [u_in]
+        while stack:
+            x = stack.pop()
+            p, a = parent[x], pred[x]
+            depth[x] = depth[p] + 1
+            pi[x] = pi[p] + cost[a] if pred_dir[x] == DIR_DOWN else pi[p] - cost[a]
+            stack.extend(children[x])
+
+    if stats is not None:
+        stats["pivots"] = pivots
+
+    scale = max(1.0, max((abs(b) for b in supply), default=0.0))
+    if any(flow[e] > 1e-9 * scale for e in range(m, total)):
+        raise InfeasibleFlow("No feasible flow: supplies/demand cannot be satisfied with given capacities")
+
+    arc_flow = flow[:m]
+    total_cost = sum(f * c for f, c in zip(arc_flow, g.cost) if f)
+    return arc_flow, pi[:n], total_cost
@@ -15,9 +15,21 @@ def model_from_dict(d: Dict[str, Any]) -> NetworkModel:
     node_set = set(m.nodes)
     if len(node_set) != len(m.nodes):
         raise NetworkModelError("'nodes' contains duplicates")
-    if not m.edges:
+    # Without edges, coordinates for every node describe a complete Euclidean graph (MST)
+    if not m.edges and not (m.coords and len(m.coords) == len(node_set)):
         raise NetworkModelError("'edges' is required and must be non-empty")
     for i, e in enumerate(m.edges):
         if e.u not in node_set or e.v not in node_set:
             raise NetworkModelError(f"Edge {i} references unknown node: {e.u}->{e.v}")
+    for name in m.supply:
+        if name not in node_set:
+            raise NetworkModelError(f"'supply' references unknown node: {name}")
+    for name in m.coords:
+        if name not in node_set:
+            raise NetworkModelError(f"'coords' references unknown node: {name}")
+    if m.supply:
+        total = sum(m.supply.values())
+        scale = max(1.0, sum(abs(b) for b in m.supply.values()))
+        if abs(total) > 1e-9 * scale:
+            raise NetworkModelError(f"'supply' must sum to zero (got {total})")
     return m
@@ -0,0 +1,291 @@
+from __future__ import annotations
+
+import math
+from array import array
+from collections import deque
+from typing import Any, Dict, List, Sequence, Set, Tuple, Union
+
+from .graph import CompiledGraph, as_graph
+from .model import NetworkModel
+
+# Expansion trees of the reduced edges, oriented from the reduced edge's u to its v:
+#   ("e", e)                  original edge e, traversed edge_u[e] -> edge_v[e]
+#   ("r", tree)               tree traversed backwards (undirected graphs only)
+#   ("s", (t1, t2))           t1 then t2 (series)
+#   ("p", (t1, t2), (c1, c2)) t1 or t2, with their capacities (parallel, flow mode only)
+Tree = Tuple[Any, ...]
+
+
+class _Item:
+    __slots__ = ("u", "v", "weight", "capacity", "tree", "alive")
+
+    def __init__(self, u: int, v: int, weight: float, capacity: float, tree: Tree) -> None:
+        self.u, self.v, self.weight, self.capacity, self.tree = u, v, weight, capacity, tree
+        self.alive = True
+
+
+class ReducedGraph:
+    """A network reduced for one ``source``/``sink`` query, and the way back.
+
+    ``graph`` is the reduced ``CompiledGraph`` (same node names, a subset of the nodes);
+    ``trees[e]`` tells which original edges reduced edge ``e`` stands for. ``stats`` holds
+    the sizes before/after and the number of ``pruned`` nodes, ``series`` contractions and
+    ``parallel`` merges.
+    """
+
+    def __init__(self, original: CompiledGraph, graph: CompiledGraph, trees: List[Tree], stats: Dict[str, int]):
+        self.original = original
+        self.graph = graph
+        self.trees = trees
+        self.stats = stats
+
+    def expand_path(self, path_nodes: Sequence[str]) -> List[str]:
+        """Original node sequence of a path given as reduced node names."""
+        if not path_nodes:
+            return []
+        g, og = self.graph, self.original
+        out = [path_nodes[0]]
+        for a, b in zip(path_nodes, path_nodes[1:]):
+            u = g.node(a)
+            # Parallel edges are merged, so the reduced edge of a node pair is unique
+            e = g.find_edge(a, b)
+            for oe, rev in _leaves(self.trees[e], g.edge_u[e] != u):
+                out.append(og.names[og.edge_u[oe] if rev else og.edge_v[oe]])
+        return out
+
+    def expand_residual(self, rcap: Sequence[float]) -> array:
+        """Original residual capacities (indexed like ``original.residual``) for the flow
+        given by the reduced residual capacities ``rcap``."""
+        g, og = self.graph, self.original
+        net = [0.0] * og.num_edges
+        for a in range(g.m):
+            f = rcap[2 * a + 1]
+            if f <= 0.0:
+                continue
+            e = g.arc_edge[a]
+            _push_flow(self.trees[e], f, g.tail[a] != g.edge_u[e], net)
+        out = og.residual_capacities()
+        for e, f in enumerate(net):
+            if f == 0.0:
+                continue
+            for a in og.edge_arcs[e]:
+                # Undirected edges carry the flow on the arc that matches its sign
+                forward = og.tail[a] == og.edge_u[e]
+                amount = f if forward else -f
+                if amount > 0:
+                    out[2 * a] -= amount
+                    out[2 * a + 1] += amount
+        return out
+
+
+def _leaves(tree: Tree, backwards: bool) -> List[Tuple[int, bool]]:
+    # Original edges of a path tree in traversal order, as (edge, traversed backwards)
+    out = []
+    stack = [(tree, backwards)]
+    while stack:
+        t, rev = stack.pop()
+        kind = t[0]
+        if kind == "e":
+            out.append((t[1], rev))
+        elif kind == "r":
+            stack.append((t[1], not rev))
+        else:
+            first, second = t[1]
+            # The stack pops the last push first
+            stack += [(first, rev), (second, rev)] if rev else [(second, rev), (first, rev)]
+    return out
+
+
+def _push_flow(tree: Tree, flow: float, backwards: bool, net: List[float]) -> None:
+    # Add ``flow`` along the tree to the signed net flow of the original edges
+    stack = [(tree, flow, backwards)]
+    while stack:
+        t, f, rev = stack.pop()
+        kind = t[0]
+        if kind == "e":
+            net[t[1]] += -f if rev else f
+        elif kind == "r":
+            stack.append((t[1], f, not rev))
+        elif kind == "s":
+            stack += [(c, f, rev) for c in t[1]]
+        else:
+            # Any split within the capacities is feasible: fill the first branch
+            first = min(f, t[2][0])
+            stack += [(t[1][0], first, rev), (t[1][1], f - first, rev)]
+
+
+def reduce_graph(
+    model: Union[NetworkModel, CompiledGraph],
+    source: str,
+    sink: str,
+    mode: str = "path",
+) -> ReducedGraph:
+    """Shrink the graph for a single ``source -> sink`` shortest path (``mode="path"``) or
+    max flow (``mode="flow"``) without changing its answer.
+
+    Repeated until nothing changes:
+
+    - prune nodes that are not reachable from ``source`` or cannot reach ``sink`` (zero
+      capacity edges are dropped first in flow mode);
+    - remove dead ends: non-terminal nodes with a single neighbour (dangling trees);
+    - contract series nodes: a non-terminal node whose only neighbours are ``u`` and ``v``
+      becomes the edge(s) ``u -> v`` / ``v -> u`` (weights add, capacity is the minimum);
+    - merge parallel edges (path mode keeps the lightest, flow mode adds the capacities).
+
+    Path mode requires non-negative weights (with negative cycles around, pruning could hide
+    them).
+    """
+    og = as_graph(model)
+    if mode not in ("path", "flow"):
+        raise ValueError(f"Unknown reduction mode: {mode}")
+    flow = mode == "flow"
+    if not flow and og.num_edges and min(og.edge_weight) < 0:
+        raise ValueError("Path reduction requires non-negative weights")
+    s, t = og.node(source), og.node(sink)
+    directed = og.directed
+
+    items: List[_Item] = []
+    for e in range(og.num_edges):
+        u, v = og.edge_u[e], og.edge_v[e]
+        if u == v or (flow and og.edge_capacity[e] <= 0.0):
+            continue
+        items.append(_Item(u, v, og.edge_weight[e], og.edge_capacity[e], ("e", e)))
+
+    keep = _relevant_nodes(og.n, items, s, t, directed)
+    adj: Dict[int, Set[int]] = {x: set() for x in keep}
+    by_pair: Dict[Tuple[int, int], int] = {}
+    counters = {"pruned": og.n - len(keep), "series": 0, "parallel": 0}
+
+    def key(it: _Item) -> Tuple[int, int]:
+        return (it.u, it.v) if directed or it.u < it.v else (it.v, it.u)
+
+    def kill(i: int) -> None:
+        it = items[i]
+        it.alive = False
+        adj[it.u].discard(i)
+        adj[it.v].discard(i)
+        if by_pair.get(key(it)) == i:
+            del by_pair[key(it)]
+
+    def add(it: _Item) -> None:
+        k = key(it)
+        j = by_pair.get(k)
+        if j is None:
+            i = len(items)
+            items.append(it)
+            by_pair[k] = i
+            adj[it.u].add(i)
+            adj[it.v].add(i)
+            return
+        old = items[j]
+        tree = it.tree
+        if it.u != old.u:  # undirected, opposite orientation
+            tree = ("r", tree)
+        counters["parallel"] += 1
+        if flow:
+            old.tree = ("p", (old.tree, tree), (old.capacity, it.capacity))
+            old.capacity += it.capacity
+        elif it.weight < old.weight:
+            old.tree, old.weight = tree, it.weight
+
+    originals, items = items, []
+    for it in originals:
+        if it.u in adj and it.v in adj:
+            add(it)
+
+    # After merging, two neighbours mean at most 4 directed / 2 undirected edges
+    most = 4 if directed else 2
+    queue = deque(x for x in keep if x != s and x != t)
+    while queue:
+        x = queue.popleft()
+        if x not in adj or x == s or x == t or len(adj[x]) > most:
+            continue
+        incident = [items[i] for i in adj[x]]
+        neighbours = {it.v if it.u == x else it.u for it in incident}
+        if len(neighbours) > 2:
+            continue
+        for i in list(adj[x]):
+            kill(i)
+        del adj[x]
+        queue.extend(neighbours)
+        if len(neighbours) < 2:
+            counters["pruned"] += 1
+            continue
+        u, v = sorted(neighbours)
+        contracted = False
+        for a, b in ((u, v), (v, u)) if directed else ((u, v),):
+            into = [it for it in incident if it.v == x and it.u == a] if directed else [
+                it for it in incident if a in (it.u, it.v)]
+            out = [it for it in incident if it.u == x and it.v == b] if directed else [
+                it for it in incident if b in (it.u, it.v)]
+            if not into or not out:
+                continue
+            first, second = into[0], out[0]
+            t1 = first.tree if first.v == x else ("r", first.tree)
+            t2 = second.tree if second.u == x else ("r", second.tree)
+            add(_Item(
+                a,
+                b,
+                first.weight + second.weight,
+                min(first.capacity, second.capacity),
+                ("s", (t1, t2)),
+            ))
+            contracted = True
+        # A node that only leads back where it came from is a dead end
+        counters["series" if contracted else "pruned"] += 1
+
+    nodes = [x for x in range(og.n) if x in adj]
+    alive = [it for it in items if it.alive]
+    index = {x: i for i, x in enumerate(nodes)}
+    coords = None
+    if og.coord_x is not None and og.coord_y is not None:
+        coords = {
+            og.names[x]: (og.coord_x[x], og.coord_y[x])
+            for x in nodes
+            if not (math.isnan(og.coord_x[x]) or math.isnan(og.coord_y[x]))
+        }
+    graph = CompiledGraph(
+        [og.names[x] for x in nodes],
+        [index[it.u] for it in alive],
+        [index[it.v] for it in alive],
+        [it.capacity for it in alive],
+        [0.0] * len(alive),
+        [it.weight for it in alive],
+        directed=directed,
+        coords=coords,
+    )
+    stats = {
+        "nodes": og.n,
+        "edges": og.num_edges,
+        "reduced_nodes": graph.n,
+        "reduced_edges": graph.num_edges,
+        **counters,
+    }
+    return ReducedGraph(og, graph, [it.tree for it in alive], stats)
+
+
+def _relevant_nodes(n: int, items: List[_Item], s: int, t: int, directed: bool) -> Set[int]:
+    # Nodes on some s -> t walk: reachable from s and reaching t (s and t always kept)
+    fwd: List[List[int]] = [[] for _ in range(n)]
+    bwd: List[List[int]] = [[] for _ in range(n)]
+    for it in items:
+        fwd[it.u].append(it.v)
+        bwd[it.v].append(it.u)
+        if not directed:
+            fwd[it.v].append(it.u)
+            bwd[it.u].append(it.v)
+
+    def reach(start: int, adj: List[List[int]]) -> Set[int]:
+        seen = {start}
+        stack = [start]
+        while stack:
+            for y in adj[stack.pop()]:
+                if y not in seen:
+                    seen.add(y)
+                    stack.append(y)
+        return seen
+
+    from_s = reach(s, fwd)
+    if t not in from_s:
+        return {s, t}
+    return (from_s & reach(t, bwd)) | {s, t}
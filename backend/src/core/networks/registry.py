@@ -0,0 +1,281 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import sys
+from array import array
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .graph import CompiledGraph
+from .solve import solve_network
+
+# Model keys that describe a query rather than the graph; kept as per-handle defaults
+QUERY_KEYS = ("source", "sink", "target", "demand", "supply")
+
+
+def graph_digest(graph: CompiledGraph) -> str:
+    """Content hash of a compiled graph: node names, direction, edge columns and coordinates.
+    The same network gets the same digest whatever JSON formatting or file it came from."""
+    h = hashlib.sha1()
+    h.update(b"D" if graph.directed else b"U")
+    h.update("\0".join(graph.names).encode("utf-8"))
+    for column in (graph.edge_u, graph.edge_v, graph.edge_capacity, graph.edge_cost, graph.edge_weight):
+        h.update(b"|")
+        h.update(column.tobytes())
+    if graph.coord_x is not None and graph.coord_y is not None:
+        h.update(b"|xy")
+        h.update(array("d", graph.coord_x).tobytes())
+        h.update(array("d", graph.coord_y).tobytes())
+    return h.hexdigest()
+
+
+def graph_nbytes(graph: CompiledGraph) -> int:
+    """Approximate memory held by a compiled graph: its typed arrays, name strings and the
+    lists / lookups it has cached so far (residual network, topological order, ...)."""
+    total = sys.getsizeof(graph)
+    for value in vars(graph).values():
+        if isinstance(value, array):
+            total += value.buffer_info()[1] * value.itemsize
+        elif isinstance(value, (list, tuple, dict)):
+            total += sys.getsizeof(value)
+    total += sum(map(sys.getsizeof, graph.names))
+    return total
+
+
+@dataclass
+class GraphEntry:
+    """A registered graph. ``version`` starts at 1 and grows with every change to the graph;
+    ``results`` caches solver outputs of the current version (LRU, newest last)."""
+
+    handle: str
+    graph: CompiledGraph
+    defaults: Dict[str, Any] = field(default_factory=dict)
+    version: int = 1
+    results: "OrderedDict[str, Tuple[Dict[str, Any], int]]" = field(default_factory=OrderedDict)
+    graph_bytes: int = 0
+    hits: int = 0
+
+    @property
+    def nbytes(self) -> int:
+        return self.graph_bytes + sum(size for _, size in self.results.values())
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "handle": self.handle,
+            "version": self.version,
+            "nodes": self.graph.n,
+            "edges": self.graph.num_edges,
+            "directed": self.graph.directed,
+            "bytes": self.nbytes,
+            "cached_results": len(self.results),
+        }
+
+
+class GraphRegistry:
+    """Parsed and compiled graphs kept between requests, addressed by content-hash handles.
+
+    - ``register`` compiles nothing itself: it takes a ``CompiledGraph`` (from a JSON model or
+      ``loaders.load_graph``) and returns the entry of its digest, so uploading the same
+      network twice reuses the first copy (and its cached lookups and results).
+    - ``solve`` runs ``solve_network`` on the stored graph and caches the output per
+      method/parameters; ``update`` changes edges, bumps ``version`` and drops the cache.
+    - Least recently used graphs are evicted beyond ``max_graphs`` entries or ``max_bytes``
+      (approximate, see ``graph_nbytes``; cached results count by their JSON size). Each graph
+      keeps at most ``max_results`` results.
+    """
+
+    def __init__(self, max_graphs: int = 32, max_bytes: int = 512 * 2**20, max_results: int = 64) -> None:
+        if max_graphs < 1 or max_bytes < 1 or max_results < 0:
+            raise ValueError("Registry limits must be positive")
+        self.max_graphs = max_graphs
+        self.max_bytes = max_bytes
+        self.max_results = max_results
+        self.entries: "OrderedDict[str, GraphEntry]" = OrderedDict()
+        self.evicted = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, handle: object) -> bool:
+        return handle in self.entries
+
+    @property
+    def nbytes(self) -> int:
+        return sum(entry.nbytes for entry in self.entries.values())
+
+    # ------------------------------------------------------------------
+    # Graphs
+    # ------------------------------------------------------------------
+    def register(self, graph: CompiledGraph, defaults: Optional[Dict[str, Any]] = None) -> GraphEntry:
+        """Entry for ``graph`` (``defaults``: query fields such as source/sink used when a solve
+        request omits them).
+
+        If the handle exists but its graph was updated since, the entry goes back to the
+        uploaded content as a new version."""
+        handle = graph_digest(graph)
+        # Only the columns are kept: Edge objects are rebuilt on demand by ``graph.edge``
+        graph.edges = None
+        entry = self.entries.get(handle)
+        if entry is None:
+            entry = GraphEntry(handle, graph, graph_bytes=graph_nbytes(graph))
+            self.entries[handle] = entry
+        elif graph_digest(entry.graph) != handle:
+            self._replace(entry, graph)
+        if defaults is not None:
+            entry.defaults = {k: defaults[k] for k in QUERY_KEYS if k in defaults}
+        self.entries.move_to_end(handle)
+        self._evict()
+        return entry
+
+    def get(self, handle: str, version: Optional[int] = None) -> GraphEntry:
+        """Entry of ``handle``; with ``version``, it must still be the current one."""
+        entry = self.entries.get(handle)
+        if entry is None:
+            raise KeyError(handle)
+        if version is not None and int(version) != entry.version:
+            raise ValueError(f"Stale graph version {version} (current: {entry.version})")
+        self.entries.move_to_end(handle)
+        return entry
+
+    def remove(self, handle: str) -> bool:
+        return self.entries.pop(handle, None) is not None
+
+    def update(
+        self,
+        handle: str,
+        changes: Iterable[Dict[str, Any]] = (),
+        add: Iterable[Dict[str, Any]] = (),
+        remove: Iterable[Dict[str, Any]] = (),
+        version: Optional[int] = None,
+    ) -> GraphEntry:
+        """Change the graph of ``handle`` and start a new version (cached results are dropped).
+
+        - ``changes``: ``{"u", "v", "capacity"?, "cost"?, "weight"?}``, applied to every
+          ``u -> v`` edge (either orientation in undirected graphs);
+        - ``add``: new edges ``{"u", "v", "capacity", "cost", "weight"}`` between known nodes
+          (a missing weight falls back to the cost, as in the JSON models);
+        - ``remove``: ``{"u", "v"}``, removes every such edge.
+        """
+        entry = self.get(handle, version)
+        g = entry.graph
+        eu, ev = list(g.edge_u), list(g.edge_v)
+        cap, cost, weight = list(g.edge_capacity), list(g.edge_cost), list(g.edge_weight)
+        columns = {"capacity": cap, "cost": cost, "weight": weight}
+        pairs: Dict[Tuple[int, int], List[int]] = {}
+        for e in range(g.num_edges):
+            pairs.setdefault(self._pair(g, eu[e], ev[e]), []).append(e)
+
+        def endpoints(item: Dict[str, Any]) -> Tuple[int, int]:
+            u, v = g.index.get(str(item.get("u"))), g.index.get(str(item.get("v")))
+            if u is None or v is None:
+                raise ValueError(f"Unknown edge endpoint: {item.get('u')}->{item.get('v')}")
+            return u, v
+
+        def matching(item: Dict[str, Any]) -> List[int]:
+            found = pairs.get(self._pair(g, *endpoints(item)))
+            if not found:
+                raise ValueError(f"Unknown edge: {item['u']}->{item['v']}")
+            return found
+
+        for item in changes:
+            found = matching(item)
+            for key, column in columns.items():
+                if key in item:
+                    value = float(item[key])
+                    for e in found:
+                        column[e] = value
+        dropped = set()
+        for item in remove:
+            dropped.update(matching(item))
+        for item in add:
+            u, v = endpoints(item)
+            eu.append(u)
+            ev.append(v)
+            cap.append(float(item.get("capacity", 0.0) or 0.0))
+            cost.append(float(item.get("cost", 0.0) or 0.0))
+            # As in the JSON models, a missing weight falls back to the cost
+            weight.append(float(item.get("weight", item.get("w", cost[-1])) or 0.0))
+        keep = [e for e in range(len(eu)) if e not in dropped]
+
+        coords = None
+        if g.coord_x is not None and g.coord_y is not None:
+            coords = {
+                name: (x, y)
+                for name, x, y in zip(g.names, g.coord_x, g.coord_y)
+                if not (math.isnan(x) or math.isnan(y))
+            }
+        graph = CompiledGraph(
+            g.names,
+            [eu[e] for e in keep],
+            [ev[e] for e in keep],
+            [cap[e] for e in keep],
+            [cost[e] for e in keep],
+            [weight[e] for e in keep],
+            directed=g.directed,
+            coords=coords,
+        )
+        self._replace(entry, graph)
+        self._evict()
+        return entry
+
+    # ------------------------------------------------------------------
+    # Solving
+    # ------------------------------------------------------------------
+    def solve(
+        self, handle: str, problem: Dict[str, Any], version: Optional[int] = None
+    ) -> Tuple[Dict[str, Any], bool]:
+        """``(result, cached)`` of ``solve_network(problem)`` on the graph of ``handle``.
+
+        ``problem["model"]`` only needs the query fields (missing ones come from the defaults
+        given at registration). Cached results are shared: do not mutate them."""
+        entry = self.get(handle, version)
+        query = dict(entry.defaults)
+        model = problem.get("model")
+        if isinstance(model, dict):
+            query.update(model)
+        request = {k: v for k, v in problem.items() if k not in ("graph", "handle", "version")}
+        request["model"] = query
+        key = json.dumps(request, sort_keys=True, default=str)
+
+        hit = entry.results.get(key)
+        if hit is not None:
+            entry.results.move_to_end(key)
+            entry.hits += 1
+            return hit[0], True
+
+        result = solve_network(request, graph=entry.graph)
+        # Lazily built lookups (residual network, topological order, ...) now live on the graph
+        entry.graph_bytes = graph_nbytes(entry.graph)
+        if self.max_results:
+            entry.results[key] = (result, len(json.dumps(result, default=str)))
+            while len(entry.results) > self.max_results:
+                entry.results.popitem(last=False)
+        self._evict()
+        return result, False
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _pair(g: CompiledGraph, u: int, v: int) -> Tuple[int, int]:
+        return (u, v) if g.directed or u <= v else (v, u)
+
+    @staticmethod
+    def _replace(entry: GraphEntry, graph: CompiledGraph) -> None:
+        entry.graph = graph
+        entry.graph_bytes = graph_nbytes(graph)
+        entry.version += 1
+        entry.results.clear()
+
+    def _evict(self) -> None:
+        # The most recently used entry is never evicted, even if it alone exceeds max_bytes
+        while len(self.entries) > 1 and (len(self.entries) > self.max_graphs or self.nbytes > self.max_bytes):
+            self.entries.popitem(last=False)
+            self.evicted += 1
+        # Still over budget: shed the cached results of the remaining entry
+        for entry in self.entries.values():
+            while entry.results and self.nbytes > self.max_bytes:
+                entry.results.popitem(last=False)
@@ -0,0 +1,396 @@
+from __future__ import annotations
+
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from .distance_matrix import DistanceMatrix
+
+# Routes are lists of matrix indices that start at the depot (index 0) and implicitly
+# return to it: [0, a, b, c] means depot -> a -> b -> c -> depot.
+Route = List[int]
+EPS = 1e-9
+
+
+@dataclass
+class RoutingSolution:
+    """Best routes found. ``routes[k]`` lists stop names from the depot back to the depot.
+
+    ``feasible`` is False when more routes than ``vehicles`` were needed. ``history`` holds
+    ``(seconds, best distance so far, restart)`` every time a restart improved the best
+    solution; ``restart_costs`` the final distance of every restart (in restart order).
+    """
+
+    routes: List[List[str]]
+    distances: List[float]
+    loads: List[float]
+    total_distance: float
+    feasible: bool
+    construction: str
+    construction_distance: float
+    restarts: int
+    elapsed: float
+    history: List[Tuple[float, float, int]] = field(default_factory=list)
+    restart_costs: List[float] = field(default_factory=list)
+    moves: Dict[str, int] = field(default_factory=dict)
+
+
+# ----------------------------------------------------------------------
+# Construction
+# ----------------------------------------------------------------------
+def _nearest_neighbor(
+    d: List[List[float]], demand: List[float], capacity: float, rng: Optional[random.Random]
+) -> List[Route]:
+    # Greedy: go to the closest unvisited stop that still fits, else back to the depot. With
+    # ``rng`` the next stop is drawn among the three closest (randomized restarts).
+    unvisited = set(range(1, len(d)))
+    routes: List[Route] = []
+    while unvisited:
+        route, load, cur = [0], 0.0, 0
+        while True:
+            row = d[cur]
+            fits = [j for j in unvisited if load + demand[j] <= capacity + EPS]
+            if not fits:
+                break
+            if rng is None:
+                nxt = min(fits, key=row.__getitem__)
+            else:
+                nxt = rng.choice(sorted(fits, key=row.__getitem__)[:3])
+            route.append(nxt)
+            unvisited.discard(nxt)
+            load += demand[nxt]
+            cur = nxt
+        if len(route) == 1:
+            raise ValueError("A stop demands more than the vehicle capacity")
+        routes.append(route)
+    return routes
+
+
+def _savings(
+    d: List[List[float]], demand: List[float], capacity: float, rng: Optional[random.Random]
+) -> List[Route]:
+    # Clarke-Wright (parallel): start from depot -> i -> depot routes and merge the route
+    # ending at i with the one starting at j in decreasing order of d[i][0] + d[0][j] - d[i][j].
+    # With ``rng`` each saving is perturbed by up to 10% (randomized restarts).
+    n = len(d)
+    pairs = []
+    for i in range(1, n):
+        di0, row = d[i][0], d[i]
+        for j in range(1, n):
+            if i != j:
+                s = di0 + d[0][j] - row[j]
+                if rng is not None:
+                    s *= rng.uniform(0.9, 1.1)
+                pairs.append((s, i, j))
+    pairs.sort(reverse=True)
+    routes: Dict[int, List[int]] = {i: [i] for i in range(1, n)}
+    load = {i: demand[i] for i in range(1, n)}
+    owner = list(range(n))  # route id (its first stop at creation) of every stop
+    for _, i, j in pairs:
+        ri, rj = owner[i], owner[j]
+        if ri == rj or routes[ri][-1] != i or routes[rj][0] != j:
+            continue
+        if load[ri] + load[rj] > capacity + EPS:
+            continue
+        for k in routes[rj]:
+            owner[k] = ri
+        routes[ri].extend(routes.pop(rj))
+        load[ri] += load.pop(rj)
+    return [[0] + r for r in routes.values()]
+
+
+# ----------------------------------------------------------------------
+# Local search
+# ----------------------------------------------------------------------
+def _route_cost(d: List[List[float]], route: Route) -> float:
+    return sum(d[a][b] for a, b in zip(route, route[1:])) + d[route[-1]][route[0]]
+
+
+def _improve_route(
+    d: List[List[float]], route: Route, neighbors: List[List[int]], deadline: float, moves: Dict[str, int]
+) -> Route:
+    """2-opt and Or-opt on one closed route (depot fixed at position 0), driven by the
+    candidate ``neighbors`` of each node and don't-look bits: a node is only re-examined after
+    one of its tour edges changed. Deltas are exact for asymmetric matrices too (reversed
+    segments are costed with prefix sums in both directions)."""
+    t = list(route)
+    size = len(t)
+    if size < 4:
+        return t
+    members = set(t)
+    pos = {}
+    fwd = [0.0] * (size + 1)
+    bwd = [0.0] * (size + 1)
+
+    def rebuild() -> None:
+        for p, x in enumerate(t):
+            pos[x] = p
+        for p in range(size):
+            y = t[(p + 1) % size]
+            fwd[p + 1] = fwd[p] + d[t[p]][y]
+            bwd[p + 1] = bwd[p] + d[y][t[p]]
+
+    def reversal_delta(i: int, j: int) -> float:
+        # Reverse t[i + 1 .. j] (0 <= i < j < size; t[j + 1] wraps to the depot)
+        a, b, c, e = t[i], t[i + 1], t[j], t[(j + 1) % size]
+        return d[a][c] + d[b][e] - d[a][b] - d[c][e] + (bwd[j] - bwd[i + 1]) - (fwd[j] - fwd[i + 1])
+
+    rebuild()
+    active = list(reversed(t))
+    queued = set(t)
+    steps = 0
+    while active:
+        steps += 1
+        if steps & 255 == 0 and time.time() > deadline:
+            break
+        x = active.pop()
+        queued.discard(x)
+        improved = False
+        for c in neighbors[x]:
+            if c not in members:
+                continue
+            px, pc = pos[x], pos[c]
+            # 2-opt: new edge x-c, either after both (succ side) or before both (pred side)
+            for i, j in ((px, pc), (px - 1, pc - 1)):
+                i, j = min(i, j), max(i, j)
+                if i < 0 or j - i < 2 or j >= size:
+                    continue
+                if reversal_delta(i, j) < -EPS:
+                    t[i + 1:j + 1] = reversed(t[i + 1:j + 1])
+                    touched = (t[i], t[i + 1], t[j], t[(j + 1) % size])
+                    moves["two_opt"] += 1
+                    improved = True
+                    break
+            if improved:
+                break
+            # Or-opt: move a segment of 1-3 stops starting at x to right after c
+            if px == 0:
+                continue
+            for length in (1, 2, 3):
+                end = px + length - 1
+                if end >= size or px <= pc <= end or pc == px - 1:
+                    continue
+                first, last = t[px], t[end]
+                p, nx = t[px - 1], t[(end + 1) % size]
+                cn = t[(pc + 1) % size]
+                internal = fwd[end] - fwd[px]
+                gain = d[p][first] + d[last][nx] + d[c][cn] - d[p][nx]
+                forward = d[c][first] + d[last][cn]
+                backward = d[c][last] + d[first][cn] + (bwd[end] - bwd[px]) - internal
+                best = min(forward, backward)
+                if best - gain < -EPS:
+                    segment = t[px:end + 1]
+                    if backward < forward:
+                        segment.reverse()
+                    rest = t[:px] + t[end + 1:]
+                    at = rest.index(c) + 1
+                    t[:] = rest[:at] + segment + rest[at:]
+                    touched = (p, nx, c, cn, first, last)
+                    moves["or_opt"] += 1
+                    improved = True
+                    break
+            if improved:
+                break
+        if improved:
+            rebuild()
+            for y in touched:
+                if y not in queued:
+                    queued.add(y)
+                    active.append(y)
+    return t
+
+
+def _relocate(
+    d: List[List[float]],
+    routes: List[Route],
+    demand: List[float],
+    capacity: float,
+    neighbors: List[List[int]],
+    moves: Dict[str, int],
+) -> bool:
+    # Inter-route Or-opt of single stops: move a stop next to a candidate neighbour in another
+    # route when it fits and shortens the total. Returns True if anything moved.
+    where = {x: k for k, r in enumerate(routes) for x in r[1:]}
+    loads = [sum(demand[x] for x in r) for r in routes]
+    changed = False
+    for x in list(where):
+        k = where[x]
+        r = routes[k]
+        i = r.index(x)
+        p, nx = r[i - 1], r[(i + 1) % len(r)]
+        gain = d[p][x] + d[x][nx] - d[p][nx]
+        best = None
+        for c in neighbors[x]:
+            kc = where.get(c, -1) if c else -1
+            if kc < 0 or kc == k or loads[kc] + demand[x] > capacity + EPS:
+                continue
+            rc = routes[kc]
+            j = rc.index(c)
+            for at, a, b in ((j + 1, c, rc[(j + 1) % len(rc)]), (j, rc[j - 1], c)):
+                delta = d[a][x] + d[x][b] - d[a][b] - gain
+                if delta < -EPS and (best is None or delta < best[0]):
+                    best = (delta, kc, at)
+        if best is None:
+            continue
+        _, kc, at = best
+        r.pop(i)
+        routes[kc].insert(at, x)
+        loads[k] -= demand[x]
+        loads[kc] += demand[x]
+        where[x] = kc
+        moves["relocate"] += 1
+        changed = True
+    routes[:] = [r for r in routes if len(r) > 1]
+    return changed
+
+
+def _local_search(
+    d: List[List[float]],
+    routes: List[Route],
+    demand: List[float],
+    capacity: float,
+    neighbors: List[List[int]],
+    deadline: float,
+    moves: Dict[str, int],
+) -> List[Route]:
+    routes = [_improve_route(d, r, neighbors, deadline, moves) for r in routes]
+    while len(routes) > 1 and time.time() <= deadline:
+        if not _relocate(d, routes, demand, capacity, neighbors, moves):
+            break
+        routes = [_improve_route(d, r, neighbors, deadline, moves) for r in routes]
+    return routes
+
+
+# ----------------------------------------------------------------------
+# Restarts (sequential or in a process pool)
+# ----------------------------------------------------------------------
+# Instance shared by the restarts run in a worker process (set once by the pool initializer).
+_WORKER_INSTANCE: Optional[Tuple[Any, ...]] = None
+
+
+def _init_worker(instance: Tuple[Any, ...]) -> None:
+    global _WORKER_INSTANCE
+    _WORKER_INSTANCE = instance
+
+
+def _run_restarts(
+    instance: Tuple[Any, ...], task: Tuple[int, int, int, float, float, int]
+) -> List[Tuple[int, float, float, List[Route], float, Dict[str, int]]]:
+    # Restarts first, first + step, ... until ``restarts`` or the deadline (restart 0 always
+    # runs); each as (restart, finished at, distance, routes, construction distance, moves)
+    d, demand, capacity, neighbors, construction = instance
+    first, step, restarts, start, deadline, seed = task
+    build = _savings if construction == "savings" else _nearest_neighbor
+    out = []
+    for r in range(first, restarts, step):
+        if r and time.time() >= deadline:
+            break
+        rng = random.Random(seed + r) if r else None
+        moves = {"two_opt": 0, "or_opt": 0, "relocate": 0}
+        routes = build(d, demand, capacity, rng)
+        built = sum(_route_cost(d, x) for x in routes)
+        routes = _local_search(d, routes, demand, capacity, neighbors, deadline, moves)
+        cost = sum(_route_cost(d, x) for x in routes)
+        out.append((r, time.time() - start, cost, routes, built, moves))
+    return out
+
+
+def _worker_restarts(task: Tuple[int, int, int, float, float, int]):
+    assert _WORKER_INSTANCE is not None
+    return _run_restarts(_WORKER_INSTANCE, task)
+
+
+def solve_routing(
+    matrix: DistanceMatrix,
+    depot: str,
+    demands: Optional[Dict[str, float]] = None,
+    capacity: Optional[float] = None,
+    vehicles: Optional[int] = None,
+    construction: str = "auto",
+    neighbors: int = 8,
+    restarts: int = 16,
+    time_budget: float = 2.0,
+    workers: Optional[int] = None,
+    seed: int = 0,
+) -> RoutingSolution:
+    """TSP (no ``capacity``) or capacitated VRP over the stops of a square ``matrix`` (same
+    ``origins`` and ``destinations``, e.g. from ``distance_matrix``) starting at ``depot``.
+
+    Routes are built with Clarke-Wright savings (``construction="savings"``, the ``auto``
+    choice) or nearest neighbour, then improved by 2-opt and Or-opt within each route and
+    single-stop relocation between routes. Moves are only tried towards the ``neighbors``
+    closest stops of each node, and don't-look bits skip nodes whose tour edges did not
+    change. Restart 0 is deterministic; the others randomize the construction. Restarts run
+    until ``restarts`` or ``time_budget`` seconds (checked between restarts and inside the
+    local search), in a process pool when ``workers`` > 1.
+    """
+    names = list(matrix.origins)
+    if names != list(matrix.destinations):
+        raise ValueError("Routing needs a square matrix (same origins and destinations)")
+    if depot not in names:
+        raise ValueError(f"Depot {depot} is not in the matrix")
+    # Depot first
+    order = [names.index(depot)] + [i for i, name in enumerate(names) if name != depot]
+    names = [names[i] for i in order]
+    n = len(names)
+    d = [[matrix.get(i, j) for j in order] for i in order]
+    for i in range(n):
+        for j in range(n):
+            if i != j and d[i][j] == math.inf:
+                raise ValueError(f"No path from {names[i]} to {names[j]}")
+    demand = [float((demands or {}).get(name, 0.0)) for name in names]
+    demand[0] = 0.0
+    cap = math.inf if capacity is None else float(capacity)
+    if any(q > cap + EPS for q in demand):
+        raise ValueError("A stop demands more than the vehicle capacity")
+    if construction == "auto":
+        construction = "savings"
+    if construction not in ("savings", "nearest_neighbor"):
+        raise ValueError(f"Unknown construction: {construction}")
+
+    k = max(1, min(int(neighbors), n - 1))
+    near = [sorted((j for j in range(n) if j != i), key=d[i].__getitem__)[:k] for i in range(n)]
+    instance = (d, demand, cap, near, construction)
+    restarts = max(1, int(restarts))
+    start = time.time()
+    deadline = start + max(0.0, float(time_budget))
+
+    if workers and workers > 1 and restarts > 1 and n > 3:
+        w = min(workers, restarts)
+        tasks = [(i, w, restarts, start, deadline, seed) for i in range(w)]
+        with ProcessPoolExecutor(max_workers=w, initializer=_init_worker, initargs=(instance,)) as pool:
+            results = [r for part in pool.map(_worker_restarts, tasks) for r in part]
+    else:
+        results = _run_restarts(instance, (0, 1, restarts, start, deadline, seed))
+    elapsed = time.time() - start
+    results.sort(key=lambda x: x[0])
+
+    def rank(res) -> Tuple[int, float]:
+        excess = max(0, len(res[3]) - vehicles) if vehicles else 0
+        return excess, res[2]
+
+    best = min(results, key=rank)
+    history: List[Tuple[float, float, int]] = []
+    for r, at, cost, routes, _, _ in sorted(results, key=lambda x: x[1]):
+        if not history or cost < history[-1][1] - EPS:
+            history.append((at, cost, r))
+    moves = {key: sum(res[5][key] for res in results) for key in best[5]}
+
+    routes = best[3]
+    return RoutingSolution(
+        routes=[[names[x] for x in r] + [names[0]] for r in routes],
+        distances=[_route_cost(d, r) for r in routes],
+        loads=[sum(demand[x] for x in r) for r in routes],
+        total_distance=best[2],
+        feasible=rank(best)[0] == 0,
+        construction=construction,
+        construction_distance=results[0][4],
+        restarts=len(results),
+        elapsed=elapsed,
+        history=history,
+        restart_costs=[res[2] for res in results],
+        moves=moves,
+    )
@@ -1,44 +1,70 @@
 from __future__ import annotations
 
 import heapq
-from typing import Dict, List, Optional, Tuple
+import math
+import weakref
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
+from .errors import NegativeCycleError
+from .graph import CompiledGraph, as_graph
 from .model import NetworkModel
 
 
-def dijkstra(model: NetworkModel, source: str, target: str) -> Tuple[Dict[str, float], Dict[str, Optional[str]]]:
+def dijkstra(
+    model: Union[NetworkModel, CompiledGraph],
+    source: str,
+    target: str,
+    stats: Optional[Dict[str, Any]] = None,
+) -> Tuple[Dict[str, float], Dict[str, Optional[str]]]:
     """Dijkstra for non-negative weights.
 
     Uses ``edge.weight`` (falls back to cost if caller stored it there).
+    Runs on the model's compiled CSR graph (undirected edges are mirrored arcs).
+    ``stats["settled"]`` receives the number of nodes popped before reaching ``target``.
     """
-    adj: Dict[str, List[Tuple[str, float]]] = {n: [] for n in model.nodes}
-    for e in model.edges:
-        w = float(e.weight)
-        adj[e.u].append((e.v, w))
-        if not model.directed:
-            adj[e.v].append((e.u, w))
-
-    dist = {n: float("inf") for n in model.nodes}
-    prev: Dict[str, Optional[str]] = {n: None for n in model.nodes}
-    dist[source] = 0.0
-    pq: List[Tuple[float, str]] = [(0.0, source)]
+    g = as_graph(model)
+    s, t = g.node(source), g.node(target)
+    out_start, head, weight = g.out_start, g.head, g.weight
+
+    inf = float("inf")
+    dist = [inf] * g.n
+    prev = [-1] * g.n
+    dist[s] = 0.0
+    pq: List[Tuple[float, int]] = [(0.0, s)]
+    settled = 0
 
     while pq:
         d, u = heapq.heappop(pq)
         if d != dist[u]:
             continue
-        if u == target:
+        settled += 1
+        if u == t:
             break
-        for v, w in adj[u]:
+        for a in range(out_start[u], out_start[u + 1]):
+            w = weight[a]
             if w < 0:
                 raise ValueError("Dijkstra requires non-negative weights")
+            v = head[a]
             nd = d + w
             if nd < dist[v]:
                 dist[v] = nd
                 prev[v] = u
                 heapq.heappush(pq, (nd, v))
 
-    return dist, prev
+    if stats is not None:
+        stats["settled"] = settled
+    return _label_dicts(g, dist, prev)
+
+
+def _label_dicts(
+    g: CompiledGraph, dist: List[float], prev: List[int]
+) -> Tuple[Dict[str, float], Dict[str, Optional[str]]]:
+    names = g.names
+    return (
+        dict(zip(names, dist)),
+        {names[v]: (names[p] if p >= 0 else None) for v, p in enumerate(prev)},
+    )
 
 
 def reconstruct_path(prev: Dict[str, Optional[str]], source: str, target: str) -> List[str]:
@@ -55,3 +81,538 @@ def reconstruct_path(prev: Dict[str, Optional[str]], source: str, target: str) -
     if not path or path[0] != source:
         return []
     return path
+
+
+# ----------------------------------------------------------------------
+# Integer weights: monotone integer priority queues instead of a binary heap.
+# ----------------------------------------------------------------------
+# Dial keeps max_weight + 1 buckets, so it is only chosen for small weights.
+DIAL_MAX_WEIGHT = 255
+# Above this bound "auto" goes back to the binary heap.
+INTEGER_WEIGHT_LIMIT = 1 << 31
+
+_INT_WEIGHTS: "weakref.WeakKeyDictionary[CompiledGraph, Tuple[Optional[int], Optional[List[int]]]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _integer_weights(g: CompiledGraph) -> Tuple[Optional[int], Optional[List[int]]]:
+    # (max weight, weights as ints) if every weight is a non-negative integer, else (None, None)
+    cached = _INT_WEIGHTS.get(g)
+    if cached is None:
+        if all(w >= 0 and w.is_integer() for w in g.weight):
+            ints = [int(w) for w in g.weight]
+            cached = (max(ints, default=0), ints)
+        else:
+            cached = (None, None)
+        _INT_WEIGHTS[g] = cached
+    return cached
+
+
+def choose_shortest_path_algorithm(model: Union[NetworkModel, CompiledGraph]) -> str:
+    """``dag`` for acyclic directed graphs (one pass in topological order, any weights), ``spfa``
+    when some weight is negative, ``dial`` for small non-negative integer weights,
+    ``radix_heap`` for larger integer weights (below ``INTEGER_WEIGHT_LIMIT``) and ``dijkstra``
+    otherwise."""
+    g = as_graph(model)
+    if g.directed and g.topological_order is not None:
+        return "dag"
+    if g.m and min(g.weight) < 0:
+        return "spfa"
+    c, _ = _integer_weights(g)
+    if c is None or c >= INTEGER_WEIGHT_LIMIT:
+        return "dijkstra"
+    return "dial" if c <= DIAL_MAX_WEIGHT else "radix_heap"
+
+
+def dial(
+    model: Union[NetworkModel, CompiledGraph],
+    source: str,
+    target: str,
+    stats: Optional[Dict[str, Any]] = None,
+) -> Tuple[Dict[str, float], Dict[str, Optional[str]]]:
+    """Dijkstra with Dial's bucket queue (non-negative integer weights). O(m + n * C).
+
+    ``C + 1`` circular buckets indexed by ``distance % (C + 1)``: every label in the queue lies
+    in ``[current, current + C]``, so the bucket at ``current`` only holds that label.
+    Same contract as ``dijkstra``.
+    """
+    g = as_graph(model)
+    c, w_int = _integer_weights(g)
+    if c is None or w_int is None:
+        raise ValueError("Dial's algorithm requires non-negative integer weights")
+    s, t = g.node(source), g.node(target)
+    out_start, head = g.out_start, g.head
+    inf = float("inf")
+    dist: List[Any] = [inf] * g.n
+    prev = [-1] * g.n
+    nb = c + 1
+    buckets: List[List[int]] = [[] for _ in range(nb)]
+    dist[s] = 0
+    buckets[0].append(s)
+    cur = 0
+    queued = 1
+    settled = 0
+    done = False
+    while queued and not done:
+        bucket = buckets[cur % nb]
+        if not bucket:
+            cur += 1
+            continue
+        # Zero-weight arcs append to this same bucket; the loop picks them up
+        for u in bucket:
+            queued -= 1
+            if dist[u] != cur:
+                continue  # stale: u was settled with a smaller label
+            settled += 1
+            if u == t:
+                done = True
+                break
+            for a in range(out_start[u], out_start[u + 1]):
+                v = head[a]
+                nd = cur + w_int[a]
+                if nd < dist[v]:
+                    dist[v] = nd
+                    prev[v] = u
+                    buckets[nd % nb].append(v)
+                    queued += 1
+        bucket.clear()
+        cur += 1
+
+    if stats is not None:
+        stats["settled"] = settled
+    return _label_dicts(g, [float(d) for d in dist], prev)
+
+
+def radix_heap_dijkstra(
+    model: Union[NetworkModel, CompiledGraph],
+    source: str,
+    target: str,
+    stats: Optional[Dict[str, Any]] = None,
+) -> Tuple[Dict[str, float], Dict[str, Optional[str]]]:
+    """Dijkstra with a radix heap (non-negative integer weights). O(m + n log C).
+
+    An item with key ``k`` lives in bucket ``bit_length(k ^ last)`` where ``last`` is the last
+    extracted key; when bucket 0 is empty, the first non-empty bucket is redistributed around
+    its minimum. Same contract as ``dijkstra``.
+    """
+    g = as_graph(model)
+    c, w_int = _integer_weights(g)
+    if c is None or w_int is None:
+        raise ValueError("Radix heap requires non-negative integer weights")
+    s, t = g.node(source), g.node(target)
+    out_start, head = g.out_start, g.head
+    inf = float("inf")
+    dist: List[Any] = [inf] * g.n
+    prev = [-1] * g.n
+    buckets: List[List[Tuple[int, int]]] = [[] for _ in range((max(1, c) * max(1, g.n)).bit_length() + 2)]
+    dist[s] = 0
+    buckets[0].append((0, s))
+    last = 0
+    settled = 0
+    nb = len(buckets)
+    done = False
+    while not done:
+        b0 = buckets[0]
+        if not b0:
+            i = 1
+            while i < nb and not buckets[i]:
+                i += 1
+            if i == nb:
+                break
+            items = buckets[i]
+            buckets[i] = []
+            last = min(items)[0]
+            for item in items:
+                buckets[(item[0] ^ last).bit_length()].append(item)
+            b0 = buckets[0]
+        # Bucket 0 holds only keys equal to ``last``; zero-weight arcs append to it
+        for d, u in b0:
+            if d != dist[u]:
+                continue  # stale entry
+            settled += 1
+            if u == t:
+                done = True
+                break
+            for a in range(out_start[u], out_start[u + 1]):
+                v = head[a]
+                nd = d + w_int[a]
+                if nd < dist[v]:
+                    dist[v] = nd
+                    prev[v] = u
+                    buckets[(nd ^ last).bit_length()].append((nd, v))
+        b0.clear()
+
+    if stats is not None:
+        stats["settled"] = settled
+    return _label_dicts(g, [float(d) for d in dist], prev)
+
+
+# ----------------------------------------------------------------------
+# Negative weights: queue-based Bellman-Ford.
+# ----------------------------------------------------------------------
+def spfa(
+    model: Union[NetworkModel, CompiledGraph],
+    source: str,
+    target: str,
+    stats: Optional[Dict[str, Any]] = None,
+) -> Tuple[Dict[str, float], Dict[str, Optional[str]]]:
+    """Bellman–Ford with a FIFO queue (SPFA) for graphs with negative weights.
+
+    Only nodes whose label improved are rescanned, so the search ends as soon as a pass
+    changes nothing. Heuristics on the deque: SLF pushes a node to the front when its label
+    is below the front's; LLL moves the front to the back while its label is above the queue
+    average. Negative labels cannot stop at ``target``: the whole reachable graph is labelled.
+    Raises ``NegativeCycleError`` (with ``cycle``) on a negative cycle reachable from
+    ``source``. Same contract as ``dijkstra``; ``stats["settled"]`` counts node scans.
+    """
+    g = as_graph(model)
+    s = g.node(source)
+    g.node(target)
+    n = g.n
+    out_start, head, weight = g.out_start, g.head, g.weight
+    inf = float("inf")
+    dist = [inf] * n
+    prev = [-1] * n
+    # Arcs on the current tree path to each node; n or more means prev has a cycle
+    length = [0] * n
+    queued = [False] * n
+    dist[s] = 0.0
+    q = deque([s])
+    queued[s] = True
+    total = 0.0
+    scans = 0
+
+    while q:
+        # LLL: do not scan a node whose label is above the queue average
+        for _ in range(len(q)):
+            if dist[q[0]] * len(q) <= total:
+                break
+            q.rotate(-1)
+        u = q.popleft()
+        queued[u] = False
+        du = dist[u]
+        total -= du
+        scans += 1
+        for a in range(out_start[u], out_start[u + 1]):
+            v = head[a]
+            nd = du + weight[a]
+            if nd >= dist[v]:
+                continue
+            if queued[v]:
+                total -= dist[v] - nd
+            dist[v] = nd
+            prev[v] = u
+            length[v] = length[u] + 1
+            if length[v] >= n:
+                cycle = _prev_cycle(prev, v)
+                if cycle:
+                    names = [g.names[x] for x in cycle]
+                    raise NegativeCycleError(
+                        "Negative cycle detected: " + " -> ".join(names), cycle=names
+                    )
+            if not queued[v]:
+                queued[v] = True
+                total += nd
+                # SLF: a label below the front's goes first
+                if q and nd < dist[q[0]]:
+                    q.appendleft(v)
+                else:
+                    q.append(v)
+
+    if stats is not None:
+        stats["settled"] = scans
+    return _label_dicts(g, dist, prev)
+
+
+def _prev_cycle(prev: List[int], v: int) -> List[int]:
+    # Follow predecessors from v; the first node seen twice closes the cycle
+    seen: Dict[int, int] = {}
+    walk: List[int] = []
+    while v >= 0 and v not in seen:
+        seen[v] = len(walk)
+        walk.append(v)
+        v = prev[v]
+    if v < 0:
+        return []
+    cycle = walk[seen[v]:][::-1]
+    return cycle + [cycle[0]]
+
+
+# ----------------------------------------------------------------------
+# Point-to-point queries. They keep labels in dicts, so the work and memory
+# are proportional to the explored part of the graph, not to its size.
+# ----------------------------------------------------------------------
+Heuristic = Callable[[int], float]
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def _path_names(g: CompiledGraph, prev: Dict[int, int], node: int) -> List[str]:
+    # Follow ``prev`` from ``node`` back to the search root (prev == -1)
+    path: List[str] = []
+    while node != -1:
+        path.append(g.names[node])
+        node = prev[node]
+    path.reverse()
+    return path
+
+
+def bidirectional_dijkstra(
+    model: Union[NetworkModel, CompiledGraph],
+    source: str,
+    target: str,
+    stats: Optional[Dict[str, Any]] = None,
+) -> Tuple[float, List[str]]:
+    """Bidirectional Dijkstra: forward search from ``source`` (out-arcs) and backward search from
+    ``target`` (reverse CSR), alternating on the smaller tentative distance.
+
+    Stops when ``top_forward + top_backward >= mu`` (``mu`` = best ``s -> v -> t`` seen on a
+    relaxed arc). Returns ``(distance, path_nodes)``; ``(inf, [])`` when unreachable.
+    ``stats["settled"]`` counts the nodes settled by both searches.
+    """
+    g = as_graph(model)
+    s, t = g.node(source), g.node(target)
+    inf = float("inf")
+    if s == t:
+        if stats is not None:
+            stats["settled"] = 1
+        return 0.0, [source]
+
+    out_start, head, in_start, in_arc, tail, weight = g.out_start, g.head, g.in_start, g.in_arc, g.tail, g.weight
+    dist = ({s: 0.0}, {t: 0.0})
+    prev = ({s: -1}, {t: -1})
+    done: Tuple[set, set] = (set(), set())
+    heaps: Tuple[List[Tuple[float, int]], List[Tuple[float, int]]] = ([(0.0, s)], [(0.0, t)])
+    mu, meet = inf, -1
+    settled = 0
+
+    while heaps[0] and heaps[1]:
+        if heaps[0][0][0] + heaps[1][0][0] >= mu:
+            break
+        side = 0 if heaps[0][0][0] <= heaps[1][0][0] else 1
+        d, u = heapq.heappop(heaps[side])
+        if u in done[side]:
+            continue
+        done[side].add(u)
+        settled += 1
+        my_dist, my_prev, other = dist[side], prev[side], dist[1 - side]
+        if side == 0:
+            arcs = range(out_start[u], out_start[u + 1])
+        else:
+            arcs = (in_arc[i] for i in range(in_start[u], in_start[u + 1]))
+        for a in arcs:
+            w = weight[a]
+            if w < 0:
+                raise ValueError("Dijkstra requires non-negative weights")
+            v = head[a] if side == 0 else tail[a]
+            nd = d + w
+            if nd < my_dist.get(v, inf):
+                my_dist[v] = nd
+                my_prev[v] = u
+                heapq.heappush(heaps[side], (nd, v))
+            if v in other and my_dist[v] + other[v] < mu:
+                mu, meet = my_dist[v] + other[v], v
+
+    if stats is not None:
+        stats["settled"] = settled
+    if meet < 0:
+        return inf, []
+    back = _path_names(g, prev[1], meet)
+    return mu, _path_names(g, prev[0], meet) + back[-2::-1]
+
+
+def astar(
+    model: Union[NetworkModel, CompiledGraph],
+    source: str,
+    target: str,
+    heuristic: Union[str, Heuristic, None] = None,
+    stats: Optional[Dict[str, Any]] = None,
+    landmarks: int = 8,
+) -> Tuple[float, List[str]]:
+    """A* search guided by a lower bound on the remaining distance to ``target``.
+
+    ``heuristic`` is ``"euclidean"`` / ``"haversine"`` (node coordinates; every edge weight must
+    be at least the straight-line / great-circle distance in km), ``"alt"`` (landmark lower
+    bounds, always admissible), ``"zero"`` (plain Dijkstra) or a callable ``node_index -> bound``.
+    ``None`` picks ``alt``: coordinates alone do not make the geometric bounds admissible.
+    Returns ``(distance, path_nodes)``; ``stats["settled"]`` counts the expanded nodes.
+    """
+    g = as_graph(model)
+    s, t = g.node(source), g.node(target)
+    h = make_heuristic(g, t, heuristic, landmarks)
+    out_start, head, weight = g.out_start, g.head, g.weight
+    inf = float("inf")
+
+    dist = {s: 0.0}
+    prev = {s: -1}
+    bound = {s: h(s)}
+    done = set()
+    pq: List[Tuple[float, float, int]] = [(bound[s], 0.0, s)]
+    settled = 0
+    found = False
+
+    while pq:
+        _, d, u = heapq.heappop(pq)
+        if u in done or d > dist[u]:
+            continue
+        done.add(u)
+        settled += 1
+        if u == t:
+            found = True
+            break
+        for a in range(out_start[u], out_start[u + 1]):
+            w = weight[a]
+            if w < 0:
+                raise ValueError("A* requires non-negative weights")
+            v = head[a]
+            nd = d + w
+            if nd < dist.get(v, inf):
+                dist[v] = nd
+                prev[v] = u
+                hv = bound.get(v)
+                if hv is None:
+                    hv = bound[v] = h(v)
+                if hv < inf:
+                    heapq.heappush(pq, (nd + hv, nd, v))
+
+    if stats is not None:
+        stats["settled"] = settled
+    if not found:
+        return inf, []
+    return dist[t], _path_names(g, prev, t)
+
+
+def make_heuristic(
+    g: CompiledGraph,
+    target: int,
+    kind: Union[str, Heuristic, None] = None,
+    landmarks: int = 8,
+) -> Heuristic:
+    """Build an A* lower bound ``node_index -> distance to target`` (see ``astar``)."""
+    if callable(kind):
+        return kind
+    if kind is None:
+        # Geometric bounds are only admissible for suitable weights, so they stay opt-in
+        kind = "alt"
+    kind = str(kind).strip().lower()
+    if kind == "zero":
+        return lambda v: 0.0
+    if kind in ("euclidean", "haversine"):
+        if g.coord_x is None or g.coord_y is None:
+            raise ValueError(f"The '{kind}' heuristic requires node coordinates ('coords')")
+        xs, ys = g.coord_x, g.coord_y
+        tx, ty = xs[target], ys[target]
+        if math.isnan(tx):
+            raise ValueError(f"Missing coordinates for node: {g.names[target]}")
+        if kind == "euclidean":
+            def euclidean(v: int) -> float:
+                d = math.hypot(xs[v] - tx, ys[v] - ty)
+                return 0.0 if d != d else d
+
+            return euclidean
+
+        lat_t, cos_t = math.radians(tx), math.cos(math.radians(tx))
+
+        def haversine(v: int) -> float:
+            # Coordinates are (lat, lon) in degrees; great-circle distance in km
+            lat = math.radians(xs[v])
+            if lat != lat:
+                return 0.0
+            a = math.sin((lat - lat_t) / 2) ** 2 + cos_t * math.cos(lat) * math.sin(math.radians(ys[v] - ty) / 2) ** 2
+            return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+        return haversine
+    if kind in ("alt", "landmarks"):
+        return _alt_heuristic(g, target, landmarks)
+    raise ValueError(f"Unknown A* heuristic: {kind}")
+
+
+# Landmark tables per compiled graph (and landmark count); dropped with the graph.
+_LANDMARKS: "weakref.WeakKeyDictionary[CompiledGraph, Dict[int, Tuple[List[List[float]], List[List[float]]]]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _sssp(g: CompiledGraph, s: int, reverse: bool = False) -> List[float]:
+    # Full Dijkstra from s (on reversed arcs when ``reverse``), distances as a list
+    inf = float("inf")
+    dist = [inf] * g.n
+    dist[s] = 0.0
+    pq: List[Tuple[float, int]] = [(0.0, s)]
+    if reverse:
+        start, arcs, ends = g.in_start, g.in_arc, g.tail
+    else:
+        start, arcs, ends = g.out_start, None, g.head
+    weight = g.weight
+    while pq:
+        d, u = heapq.heappop(pq)
+        if d != dist[u]:
+            continue
+        for i in range(start[u], start[u + 1]):
+            a = arcs[i] if arcs is not None else i
+            w = weight[a]
+            if w < 0:
+                raise ValueError("Landmarks require non-negative weights")
+            v = ends[a]
+            if d + w < dist[v]:
+                dist[v] = d + w
+                heapq.heappush(pq, (d + w, v))
+    return dist
+
+
+def landmark_tables(g: CompiledGraph, k: int = 8) -> Tuple[List[List[float]], List[List[float]]]:
+    """Distances from and to ``k`` landmarks chosen by farthest-point selection.
+
+    Returns ``(from_landmark, to_landmark)`` with one distance list per landmark. Computed once
+    per graph and ``k`` (two Dijkstra runs per landmark, one on undirected graphs).
+    """
+    cache = _LANDMARKS.setdefault(g, {})
+    if k in cache:
+        return cache[k]
+    inf = float("inf")
+    from_l: List[List[float]] = []
+    to_l: List[List[float]] = []
+    closest = [inf] * g.n
+    start = 0
+    if g.n:
+        # Start from the node farthest from node 0 (first landmark on the periphery)
+        d0 = _sssp(g, 0)
+        start = max(range(g.n), key=lambda v: d0[v] if d0[v] < inf else -1.0)
+    for _ in range(min(k, g.n)):
+        f = _sssp(g, start)
+        b = f if not g.directed else _sssp(g, start, reverse=True)
+        from_l.append(f)
+        to_l.append(b)
+        for v in range(g.n):
+            dv = min(f[v], b[v])
+            if dv < closest[v]:
+                closest[v] = dv
+        # Next landmark: reachable node farthest from the chosen ones
+        nxt = max(range(g.n), key=lambda v: closest[v] if closest[v] < inf else -1.0)
+        if closest[nxt] <= 0.0 or closest[nxt] == inf:
+            break
+        start = nxt
+    cache[k] = (from_l, to_l)
+    return cache[k]
+
+
+def _alt_heuristic(g: CompiledGraph, target: int, k: int) -> Heuristic:
+    from_l, to_l = landmark_tables(g, k)
+    inf = float("inf")
+    # Triangle inequality: d(v,t) >= d(L,t) - d(L,v) and d(v,t) >= d(v,L) - d(t,L)
+    pairs = [(f, f[target], b, b[target]) for f, b in zip(from_l, to_l)]
+
+    def alt(v: int) -> float:
+        best = 0.0
+        for f, ft, b, bt in pairs:
+            if ft < inf and f[v] < inf and ft - f[v] > best:
+                best = ft - f[v]
+            if bt < inf:
+                if b[v] == inf:
+                    return inf  # v cannot reach L but t can: t is unreachable from v
+                if b[v] - bt > best:
+                    best = b[v] - bt
+        return best
+
+    return alt
@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import heapq
+import sys
+import weakref
+from array import array
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from .graph import CompiledGraph, as_graph
+from .model import NetworkModel
+
+
+class ShortestPathTree:
+    """Dijkstra from one source that can be paused and resumed.
+
+    ``settle(t)`` pops nodes until ``t`` is settled and keeps the heap, so a later target
+    continues the same search instead of starting over; once a node is settled its distance
+    and path are lookups. The tree keeps the graph's arrays, not the graph itself (the cache
+    below is keyed by the graph's lifetime).
+    """
+
+    def __init__(self, g: CompiledGraph, source: int) -> None:
+        if g.m and min(g.weight) < 0:
+            raise ValueError("Dijkstra requires non-negative weights")
+        self.source = source
+        self.names = g.names
+        self.out_start, self.head, self.weight = g.out_start, g.head, g.weight
+        self.dist = array("d", [float("inf")]) * g.n
+        self.prev = array("l", [-1]) * g.n
+        self.done = bytearray(g.n)
+        self.dist[source] = 0.0
+        self.heap: List[Tuple[float, int]] = [(0.0, source)]
+        self.settled = 0
+
+    @property
+    def complete(self) -> bool:
+        """True once every reachable node is settled (the heap is exhausted)."""
+        return not self.heap
+
+    @property
+    def nbytes(self) -> int:
+        # Typed arrays plus the heap list and its (float, int) tuples
+        n = len(self.done)
+        return 17 * n + sys.getsizeof(self.heap) + 72 * len(self.heap)
+
+    def settle(self, target: int) -> int:
+        """Continue the search until ``target`` is settled (or the heap is empty); returns the
+        number of nodes settled by this call (0 when ``target`` already was)."""
+        done = self.done
+        if done[target]:
+            return 0
+        out_start, head, weight = self.out_start, self.head, self.weight
+        dist, prev, pq = self.dist, self.prev, self.heap
+        heappop, heappush = heapq.heappop, heapq.heappush
+        count = 0
+        while pq:
+            d, u = heappop(pq)
+            if done[u]:
+                continue
+            done[u] = 1
+            count += 1
+            # Relax before stopping so the saved heap is complete for the next target
+            for a in range(out_start[u], out_start[u + 1]):
+                v = head[a]
+                nd = d + weight[a]
+                if nd < dist[v]:
+                    dist[v] = nd
+                    prev[v] = u
+                    heappush(pq, (nd, v))
+            if u == target:
+                break
+        self.settled += count
+        return count
+
+    def distance(self, target: int) -> float:
+        self.settle(target)
+        return self.dist[target]
+
+    def path(self, target: int) -> List[str]:
+        """Node names from the source to ``target`` ([] if unreachable)."""
+        self.settle(target)
+        if self.dist[target] == float("inf"):
+            return []
+        out = []
+        v = target
+        while v >= 0:
+            out.append(self.names[v])
+            v = self.prev[v]
+        out.reverse()
+        return out
+
+
+class ShortestPathTreeCache:
+    """Resumable shortest-path trees keyed by compiled graph and source node.
+
+    Trees live as long as their graph (a weak reference drops them when the graph is
+    collected) and are evicted least recently used first once their estimated size exceeds
+    ``max_bytes``. Compiled graphs are never modified in place, so a cached tree cannot go
+    stale. ``hits`` counts queries answered without settling any node.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 2**20) -> None:
+        self.max_bytes = max_bytes
+        self.trees: "OrderedDict[Tuple[int, int], ShortestPathTree]" = OrderedDict()
+        self.sizes: Dict[Tuple[int, int], int] = {}
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+        self._graphs: Dict[int, "weakref.ref[CompiledGraph]"] = {}
+
+    def __len__(self) -> int:
+        return len(self.trees)
+
+    def clear(self) -> None:
+        self.trees.clear()
+        self.sizes.clear()
+        self._graphs.clear()
+        self.nbytes = 0
+
+    def tree(self, model: Union[NetworkModel, CompiledGraph], source: str) -> ShortestPathTree:
+        """The (possibly partial) tree of ``source``, created if needed."""
+        g = as_graph(model)
+        key = (id(g), g.node(source))
+        tree = self.trees.get(key)
+        if tree is not None:
+            self.trees.move_to_end(key)
+            return tree
+        tree = ShortestPathTree(g, key[1])
+        if key[0] not in self._graphs:
+            # Ids are only reused after the graph is gone, and by then its trees are dropped
+            self._graphs[key[0]] = weakref.ref(g, self._forget(key[0]))
+        self.trees[key] = tree
+        self.sizes[key] = 0
+        return tree
+
+    def query(
+        self,
+        model: Union[NetworkModel, CompiledGraph],
+        source: str,
+        target: str,
+        stats: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[float, List[str]]:
+        """``(distance, path_nodes)`` from ``source`` to ``target`` through the cached tree.
+        ``stats["settled"]`` receives the nodes settled by this query (0 on a hit)."""
+        g = as_graph(model)
+        t = g.node(target)
+        tree = self.tree(g, source)
+        settled = tree.settle(t)
+        if settled:
+            self.misses += 1
+        else:
+            self.hits += 1
+        key = (id(g), tree.source)
+        size = tree.nbytes
+        self.nbytes += size - self.sizes[key]
+        self.sizes[key] = size
+        self._evict()
+        if stats is not None:
+            stats["settled"] = settled
+            stats["tree_settled"] = tree.settled
+        return tree.dist[t], tree.path(t)
+
+    def _evict(self) -> None:
+        # The most recently used tree stays even if it alone exceeds the budget
+        while len(self.trees) > 1 and self.nbytes > self.max_bytes:
+            key, _ = self.trees.popitem(last=False)
+            self.nbytes -= self.sizes.pop(key)
+            self.evicted += 1
+
+    def _forget(self, graph_id: int):
+        def drop(_ref: "weakref.ref[CompiledGraph]") -> None:
+            self._graphs.pop(graph_id, None)
+            for key in [k for k in self.trees if k[0] == graph_id]:
+                del self.trees[key]
+                self.nbytes -= self.sizes.pop(key)
+
+        return drop
+
+
+# Shared by the solver: repeated queries on a long-lived graph (loaded file, registry) reuse it
+SHORTEST_PATH_TREES = ShortestPathTreeCache()
@@ -1,58 +1,284 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, Tuple
+import base64
+from typing import Any, Dict, List, Optional, Tuple
 
-from .errors import NetworkModelError
+from .errors import NegativeCycleError, NetworkModelError
+from .graph import CompiledGraph
 from .model import NetworkModel
 from .parsers import model_from_dict
-from .shortest_path import dijkstra, reconstruct_path
-from .mst import kruskal_mst
-from .max_flow import edmonds_karp
-from .min_cost_flow import InfeasibleFlow, min_cost_flow_ssap
+from .shortest_path import (
+    astar,
+    bidirectional_dijkstra,
+    choose_shortest_path_algorithm,
+    dial,
+    dijkstra,
+    radix_heap_dijkstra,
+    reconstruct_path,
+    spfa,
+)
+from .shortest_path_cache import SHORTEST_PATH_TREES, ShortestPathTreeCache
+from .dag import Activity, critical_path_method, dag_shortest_path
+from .k_shortest_paths import k_shortest_paths
+from .mst import choose_mst_algorithm, euclidean_mst, minimum_spanning_tree
+from .max_flow import choose_max_flow_algorithm, max_flow
+from .min_cut import gomory_hu_tree
+from .distance_matrix import distance_matrix
+from .apsp import all_pairs_shortest_paths
+from .min_cost_flow import (
+    InfeasibleFlow,
+    capacity_scaling,
+    choose_min_cost_flow_algorithm,
+    cost_scaling,
+    min_cost_flow_capacity_scaling,
+    min_cost_flow_cost_scaling,
+    min_cost_flow_ssap,
+    successive_shortest_paths,
+)
+from .multicommodity import Commodity, multicommodity_flow
+from .network_simplex import network_simplex, solve_network_simplex
+from .reduction import reduce_graph
+from .routing import solve_routing
 
 
 def _edge_key(u: str, v: str) -> str:
     return f"{u}->{v}"
 
 
-def solve_network(problem: Dict[str, Any]) -> Dict[str, Any]:
+def _option(problem: Dict[str, Any], key: str, default: Any = None) -> Any:
+    """Read a solver option from ``problem["options"]`` (or the top level as a fallback)."""
+    opts = problem.get("options") if isinstance(problem.get("options"), dict) else {}
+    return opts.get(key, problem.get(key, default))
+
+
+def _algorithm(problem: Dict[str, Any]) -> str:
+    return str(_option(problem, "algorithm", "auto") or "auto").strip().lower()
+
+
+def solve_network(problem: Dict[str, Any], graph: Optional[CompiledGraph] = None) -> Dict[str, Any]:
     """Solve a network problem.
 
+    ``graph`` (optional): an already compiled graph (see ``loaders.load_graph``) that replaces
+    the model's ``nodes``/``edges``; ``model`` then only carries source/sink/demand/supply.
+
     Expected top-level keys:
-    - method: one of {"shortest_path", "mst", "max_flow", "min_cost_flow"}
-    - model: graph JSON with nodes/edges and optional source/sink/demand/directed
+    - method: one of {"shortest_path", "mst", "max_flow", "min_cost_flow", "distance_matrix",
+      "all_pairs", "gomory_hu", "k_shortest_paths", "multicommodity_flow"} (distance_matrix: ``origins`` and
+      ``destinations`` lists; options ``workers``, ``routes``. k_shortest_paths: option ``k``
+      (default 3). all_pairs: options ``predecessors`` and ``format`` = ``npy`` |
+      ``json``. gomory_hu: undirected ``capacity`` graph, optional ``pairs`` ``[[u, v], ...]`` to
+      query and option ``workers``. multicommodity_flow: ``commodities``
+      ``[{"name", "source", "sink", "demand"}, ...]`` sharing ``capacity``; option ``workers``.
+      longest_path: acyclic directed graph. cpm: ``activities``
+      ``[{"name", "duration" | "optimistic"/"most_likely"/"pessimistic", "predecessors"}, ...]``
+      instead of ``model``; option ``deadline``. tsp / vrp: ``depot`` (or ``source``), optional
+      ``stops`` (default: every other node) and ``demands`` ``{"node": q}``; options
+      ``vehicle_capacity`` (VRP), ``vehicles``, ``construction`` = ``savings`` |
+      ``nearest_neighbor`` | ``auto``, ``neighbors``, ``restarts``, ``time_budget`` (s),
+      ``workers``, ``seed``; quality vs. time is reported in ``extra``)
+    - model: graph JSON with nodes/edges and optional source/sink/demand/directed/supply
+      (``supply``: ``{"node": b}``; when present, min_cost_flow solves the b-flow problem)
+    - options (optional): solver options, e.g. ``{"algorithm": "dinic"}``:
+      shortest_path: ``dijkstra`` | ``dial`` | ``radix_heap`` | ``spfa`` | ``dag`` | ``bidirectional`` |
+      ``astar`` | ``auto`` (``auto`` picks the topological pass for DAGs, SPFA for negative
+      weights, Dial / radix heap for non-negative integer weights; a negative cycle is returned
+      in ``negative_cycle``);
+      (A*: ``heuristic`` = ``euclidean`` | ``haversine`` | ``alt`` | ``zero``, ``landmarks`` = k;
+      without ``heuristic`` it uses ``alt`` on a ``graph`` given by the caller and runs
+      Dijkstra otherwise);
+      mst: ``kruskal`` | ``prim`` | ``boruvka`` | ``euclidean`` | ``auto`` (``euclidean`` uses
+      ``coords`` as a complete graph; ``auto`` picks it when there are no edges);
+      all_pairs: ``floyd_warshall`` | ``johnson`` | ``auto``;
+      max_flow: ``edmonds_karp`` | ``dinic`` | ``push_relabel`` | ``auto``;
+      ``cache`` (shortest_path with non-negative weights; default on when ``graph`` is given)
+      answers from a resumable per-source tree kept for the graph's lifetime;
+      ``reduce: true`` (max_flow, shortest_path with non-negative weights) prunes / contracts
+      the graph for the query first and reports the sizes in ``reduction``;
+      min_cost_flow: ``ssap`` | ``capacity_scaling`` | ``cost_scaling`` | ``network_simplex`` | ``auto``;
+      ``cost_curve: true`` (min_cost_flow, SSAP) adds the optimal cost-vs-flow breakpoints up to max flow
     """
     if not isinstance(problem, dict):
         raise NetworkModelError("Request must be a JSON object")
     method = str(problem.get("method", "")).strip().lower()
+    if method in ("cpm", "pert", "project_schedule", "ruta_critica"):
+        # Activity-on-node projects carry their own precedences instead of a graph model
+        return _solve_schedule(problem)
     model_dict = problem.get("model") if "model" in problem else problem
-    m: NetworkModel = model_from_dict(model_dict)
+    # A caller-supplied graph outlives this request, so per-graph caches pay off
+    long_lived = graph is not None
+    if graph is not None:
+        if not isinstance(model_dict, dict):
+            raise NetworkModelError("Model must be a JSON object")
+        m: NetworkModel = NetworkModel.from_graph(graph, model_dict)
+    else:
+        m = model_from_dict(model_dict)
 
     if method in ("", "shortest", "shortest_path", "ruta_mas_corta"):
         src = m.source or problem.get("source")
         dst = m.sink or problem.get("target") or problem.get("sink")
         if not src or not dst:
             raise NetworkModelError("Shortest path requires 'source' and 'sink/target'")
-        dist, prev = dijkstra(m, str(src), str(dst))
-        path_nodes = reconstruct_path(prev, str(src), str(dst))
+        algorithm = _algorithm(problem)
+        target_graph: Any = m
+        reduced = None
+        g = m.graph
+        if _option(problem, "reduce", False) and (not g.m or min(g.weight) >= 0):
+            try:
+                reduced = reduce_graph(m, str(src), str(dst), mode="path")
+            except ValueError as exc:
+                raise NetworkModelError(str(exc)) from None
+            target_graph = reduced.graph
+        # An explicitly requested queue is honoured; the tree cache runs a binary heap
+        cacheable = algorithm in ("auto", "dijkstra")
+        if algorithm == "auto":
+            algorithm = choose_shortest_path_algorithm(target_graph)
+        if algorithm == "bellman_ford":
+            algorithm = "spfa"
+        if algorithm in ("astar", "a*") and _option(problem, "heuristic") is None and not long_lived:
+            # The default ALT landmarks would be built for this single query: plain Dijkstra is cheaper
+            algorithm = "dijkstra"
+        stats: Dict[str, Any] = {}
+        cached = (
+            bool(_option(problem, "cache", long_lived))
+            and cacheable
+            and reduced is None
+            and algorithm in ("dijkstra", "dial", "radix_heap")
+        )
+        try:
+            if cached:
+                # Resume the saved tree of this source; settled targets are lookups
+                algorithm = "dijkstra"
+                distance, path_nodes = SHORTEST_PATH_TREES.query(target_graph, str(src), str(dst), stats)
+            elif algorithm in ("dijkstra", "dial", "radix_heap", "spfa", "dag"):
+                search = {
+                    "dijkstra": dijkstra,
+                    "dial": dial,
+                    "radix_heap": radix_heap_dijkstra,
+                    "spfa": spfa,
+                    "dag": dag_shortest_path,
+                }[algorithm]
+                dist, prev = search(target_graph, str(src), str(dst), stats)
+                distance = dist[str(dst)]
+                path_nodes = reconstruct_path(prev, str(src), str(dst))
+            elif algorithm == "bidirectional":
+                distance, path_nodes = bidirectional_dijkstra(target_graph, str(src), str(dst), stats)
+            elif algorithm in ("astar", "a*"):
+                algorithm = "astar"
+                distance, path_nodes = astar(
+                    target_graph,
+                    str(src),
+                    str(dst),
+                    heuristic=_option(problem, "heuristic"),
+                    stats=stats,
+                    landmarks=int(_option(problem, "landmarks", 8)),
+                )
+            else:
+                raise NetworkModelError(f"Unknown shortest path algorithm: {algorithm}")
+        except NegativeCycleError as exc:
+            # No shortest path exists; report the cycle instead
+            cycle_edges = [_edge_key(a, b) for a, b in zip(exc.cycle, exc.cycle[1:])]
+            return {
+                "method": "shortest_path",
+                "algorithm": algorithm,
+                "source": str(src),
+                "target": str(dst),
+                "distance": None,
+                "path_nodes": [],
+                "negative_cycle": exc.cycle,
+                "highlight": {"nodes": exc.cycle[:-1], "edges": cycle_edges},
+            }
+        except ValueError as exc:
+            raise NetworkModelError(str(exc)) from None
+        if reduced is not None:
+            path_nodes = reduced.expand_path(path_nodes)
         # Build path edges
         path_edges: List[str] = []
         for i in range(len(path_nodes) - 1):
             path_edges.append(_edge_key(path_nodes[i], path_nodes[i + 1]))
-        return {
+        out = {
             "method": "shortest_path",
+            "algorithm": algorithm,
             "source": str(src),
             "target": str(dst),
-            "distance": None if dist[str(dst)] == float("inf") else dist[str(dst)],
+            "distance": None if distance == float("inf") else distance,
             "path_nodes": path_nodes,
+            "settled": stats.get("settled"),
             "highlight": {"nodes": path_nodes, "edges": path_edges},
         }
+        if reduced is not None:
+            out["reduction"] = reduced.stats
+        if cached:
+            out["cached_tree"] = {"tree_settled": stats["tree_settled"], "hit": stats["settled"] == 0}
+        return out
+
+    if method in ("k_shortest_paths", "ksp", "k_shortest", "rutas_alternativas"):
+        src = m.source or problem.get("source")
+        dst = m.sink or problem.get("target") or problem.get("sink")
+        if not src or not dst:
+            raise NetworkModelError("K shortest paths require 'source' and 'sink/target'")
+        stats = {}
+        try:
+            k = int(_option(problem, "k", 3))
+            found = k_shortest_paths(m, str(src), str(dst), k, stats)
+        except ValueError as exc:
+            raise NetworkModelError(str(exc)) from None
+        paths = []
+        for rank, (cost, path_nodes) in enumerate(found, start=1):
+            edges = [_edge_key(a, b) for a, b in zip(path_nodes, path_nodes[1:])]
+            paths.append({"rank": rank, "distance": cost, "path_nodes": path_nodes, "edges": edges})
+        return {
+            "method": "k_shortest_paths",
+            "source": str(src),
+            "target": str(dst),
+            "k": k,
+            "paths": paths,
+            "stats": stats,
+            "highlight": {
+                "nodes": list(dict.fromkeys(v for p in paths for v in p["path_nodes"])),
+                "edges": list(dict.fromkeys(e for p in paths for e in p["edges"])),
+            },
+        }
+
+    if method in ("longest_path", "ruta_mas_larga"):
+        src = m.source or problem.get("source")
+        dst = m.sink or problem.get("target") or problem.get("sink")
+        if not src or not dst:
+            raise NetworkModelError("Longest path requires 'source' and 'sink/target'")
+        stats = {}
+        try:
+            dist, prev = dag_shortest_path(m, str(src), str(dst), stats, longest=True)
+        except ValueError as exc:
+            raise NetworkModelError(str(exc)) from None
+        path_nodes = reconstruct_path(prev, str(src), str(dst))
+        distance = dist[str(dst)]
+        return {
+            "method": "longest_path",
+            "source": str(src),
+            "target": str(dst),
+            "distance": None if distance == float("-inf") else distance,
+            "path_nodes": path_nodes,
+            "highlight": {
+                "nodes": path_nodes,
+                "edges": [_edge_key(a, b) for a, b in zip(path_nodes, path_nodes[1:])],
+            },
+        }
 
     if method in ("mst", "arbol_expansion_minima", "minimum_spanning_tree"):
-        total, edges = kruskal_mst(m)
+        algorithm = _algorithm(problem)
+        if algorithm == "auto":
+            # No edges: complete Euclidean graph on the node coordinates
+            algorithm = choose_mst_algorithm(m) if m.edges else "euclidean"
+        try:
+            if algorithm == "euclidean":
+                total, edges = euclidean_mst(m)
+            else:
+                total, edges = minimum_spanning_tree(m, algorithm)
+        except ValueError as exc:
+            raise NetworkModelError(str(exc)) from None
         mst_edges = [_edge_key(e.u, e.v) for e in edges] + [_edge_key(e.v, e.u) for e in edges]
         return {
             "method": "mst",
+            "algorithm": algorithm,
             "total_weight": total,
             "edges": [{"u": e.u, "v": e.v, "weight": e.weight} for e in edges],
             "highlight": {"nodes": list({n for e in edges for n in (e.u, e.v)}), "edges": mst_edges},
@@ -63,30 +289,111 @@ def solve_network(problem: Dict[str, Any]) -> Dict[str, Any]:
         dst = m.sink
         if not src or not dst:
             raise NetworkModelError("Max flow requires 'source' and 'sink'")
-        value, flows = edmonds_karp(m, src, dst)
+        algorithm = _algorithm(problem)
+        if algorithm == "auto":
+            algorithm = choose_max_flow_algorithm(m.graph)
+        cut: Dict[str, Any] = {}
+        stats = {}
+        try:
+            value, flows = max_flow(
+                m,
+                src,
+                dst,
+                algorithm=algorithm,
+                cut=cut,
+                reduce=bool(_option(problem, "reduce", False)),
+                stats=stats,
+            )
+        except ValueError as exc:
+            raise NetworkModelError(str(exc)) from None
         flows_out = [{"u": u, "v": v, "flow": f} for (u, v), f in flows.items()]
         highlight_edges = [_edge_key(u, v) for (u, v), f in flows.items() if f > 1e-12]
-        return {
+        out = {
             "method": "max_flow",
+            "algorithm": algorithm,
             "source": src,
             "sink": dst,
             "max_flow": value,
             "flows": flows_out,
+            "min_cut": {
+                "source_side": cut["source_side"],
+                "edges": [{"u": u, "v": v, "capacity": c} for u, v, c in cut["edges"]],
+                "capacity": cut["capacity"],
+            },
             "highlight": {"nodes": m.nodes, "edges": highlight_edges},
         }
+        if "reduction" in stats:
+            out["reduction"] = stats["reduction"]
+        return out
+
+    if method in ("gomory_hu", "min_cut_tree", "all_pairs_min_cut"):
+        pairs = problem.get("pairs") or []
+        stats = {}
+        try:
+            tree = gomory_hu_tree(
+                m,
+                algorithm=_algorithm(problem),
+                workers=int(_option(problem, "workers", 0) or 0) or None,
+                stats=stats,
+            )
+            cuts = []
+            for u, v in pairs:
+                value, side = tree.min_cut(str(u), str(v))
+                cuts.append({"u": str(u), "v": str(v), "min_cut": value, "side": side})
+        except (KeyError, TypeError) as exc:
+            raise NetworkModelError(f"Invalid pair in 'pairs': {exc}") from None
+        except ValueError as exc:
+            raise NetworkModelError(str(exc)) from None
+        tree_edges = tree.edges()
+        return {
+            "method": "gomory_hu",
+            "tree": [{"u": u, "v": v, "min_cut": w} for u, v, w in tree_edges],
+            "cuts": cuts,
+            "max_flow_runs": stats["max_flow_runs"],
+            "highlight": {"nodes": m.nodes, "edges": [_edge_key(u, v) for u, v, _ in tree_edges]},
+        }
 
     if method in ("min_cost_flow", "flujo_costo_minimo", "min_cost"):
+        if m.supply:
+            return _solve_b_flow(m, _algorithm(problem))
         src = m.source
         dst = m.sink
         if not src or not dst:
             raise NetworkModelError("Min-cost flow requires 'source' and 'sink'")
-        if m.demand <= 0:
-            raise NetworkModelError("Min-cost flow requires 'demand' > 0")
+        curve = [] if _option(problem, "cost_curve", False) else None
+        demand = m.demand
+        if demand <= 0:
+            if curve is None:
+                raise NetworkModelError("Min-cost flow requires 'demand' > 0")
+            # Curve only: route the maximum flow
+            demand = float("inf")
+        algorithm = _algorithm(problem)
+        if curve is not None:
+            # The curve is a by-product of successive shortest paths
+            if algorithm not in ("auto", "ssap"):
+                raise NetworkModelError("'cost_curve' requires the 'ssap' algorithm")
+            algorithm = "ssap"
+        if algorithm == "auto":
+            algorithm = choose_min_cost_flow_algorithm(m, m.demand)
+        potentials = None
+        stats = {}
         try:
-            sent, tot_cost, flows = min_cost_flow_ssap(m, src, dst, m.demand)
+            if algorithm == "ssap":
+                sent, tot_cost, flows = min_cost_flow_ssap(m, src, dst, demand, curve)
+            elif algorithm == "capacity_scaling":
+                sent, tot_cost, flows = min_cost_flow_capacity_scaling(m, src, dst, m.demand, stats)
+            elif algorithm == "cost_scaling":
+                sent, tot_cost, flows = min_cost_flow_cost_scaling(m, src, dst, m.demand, stats)
+            elif algorithm == "network_simplex":
+                sent, tot_cost, flows, potentials = network_simplex(m, src, dst, m.demand, stats)
+            else:
+                raise NetworkModelError(f"Unknown min-cost flow algorithm: {algorithm}")
+        except ValueError as exc:
+            raise NetworkModelError(str(exc)) from None
         except InfeasibleFlow as exc:
-            return {
+            err = {
                 "method": "min_cost_flow",
+                "algorithm": algorithm,
                 "source": src,
                 "sink": dst,
                 "demand": m.demand,
@@ -94,10 +401,14 @@ def solve_network(problem: Dict[str, Any]) -> Dict[str, Any]:
                 "total_cost": None,
                 "error": str(exc),
             }
+            if curve is not None:
+                err["cost_curve"] = curve
+            return err
         flows_out = [{"u": u, "v": v, "flow": f} for (u, v), f in flows.items()]
         highlight_edges = [_edge_key(u, v) for (u, v), f in flows.items() if f > 1e-12]
-        return {
+        out = {
             "method": "min_cost_flow",
+            "algorithm": algorithm,
             "source": src,
             "sink": dst,
             "demand": m.demand,
@@ -106,5 +417,291 @@ def solve_network(problem: Dict[str, Any]) -> Dict[str, Any]:
             "flows": flows_out,
             "highlight": {"nodes": m.nodes, "edges": highlight_edges},
         }
+        if potentials is not None:
+            out["potentials"] = potentials
+        if curve is not None:
+            out["cost_curve"] = curve
+            out["max_flow"] = curve[-1]["flow"]
+        if stats:
+            out["stats"] = stats
+        return out
+
+    if method in ("multicommodity_flow", "multicommodity", "flujo_multiproducto"):
+        raw = problem.get("commodities") or model_dict.get("commodities")
+        if not raw:
+            raise NetworkModelError("Multi-commodity flow requires 'commodities'")
+        try:
+            commodities = [
+                Commodity(
+                    source=str(c["source"]),
+                    sink=str(c.get("sink", c.get("target"))),
+                    demand=float(c["demand"]),
+                    name=str(c.get("name") or f"K{i + 1}"),
+                )
+                for i, c in enumerate(raw)
+            ]
+        except (KeyError, TypeError) as exc:
+            raise NetworkModelError(f"Invalid commodity: {exc}") from None
+        stats = {}
+        try:
+            result = multicommodity_flow(
+                m,
+                commodities,
+                workers=int(_option(problem, "workers", 0) or 0) or None,
+                stats=stats,
+            )
+        except ValueError as exc:
+            raise NetworkModelError(str(exc)) from None
+        per_commodity = []
+        for c, flows, paths, unmet in zip(commodities, result.flows, result.paths, result.unmet):
+            per_commodity.append({
+                "name": c.name,
+                "source": c.source,
+                "sink": c.sink,
+                "demand": c.demand,
+                "sent": c.demand - unmet,
+                "unmet": unmet,
+                "flows": [{"u": u, "v": v, "flow": f} for (u, v), f in flows.items()],
+                "paths": [{"path_nodes": nodes, "flow": f} for nodes, f in paths],
+            })
+        arc_flow: Dict[Tuple[str, str], float] = {}
+        for flows in result.flows:
+            for pair, f in flows.items():
+                arc_flow[pair] = arc_flow.get(pair, 0.0) + f
+        return {
+            "method": "multicommodity_flow",
+            "status": result.status,
+            "total_cost": result.total_cost,
+            "commodities": per_commodity,
+            "arc_flows": [{"u": u, "v": v, "flow": f} for (u, v), f in arc_flow.items()],
+            "congestion_prices": [
+                {"u": u, "v": v, "price": p, "flow": f, "capacity": cap} for u, v, p, f, cap in result.prices
+            ],
+            "history": result.history,
+            "stats": stats,
+            "highlight": {"nodes": m.nodes, "edges": [_edge_key(u, v) for u, v in arc_flow]},
+        }
+
+    if method in ("distance_matrix", "matriz_distancias"):
+        origins = problem.get("origins") or model_dict.get("origins")
+        destinations = problem.get("destinations") or model_dict.get("destinations")
+        if not origins or not destinations:
+            raise NetworkModelError("Distance matrix requires 'origins' and 'destinations'")
+        with_routes = bool(_option(problem, "routes", False))
+        try:
+            workers = int(_option(problem, "workers", 0) or 0) or None
+            dm = distance_matrix(m, origins, destinations, workers=workers, routes=with_routes)
+        except ValueError as exc:
+            raise NetworkModelError(str(exc)) from None
+        out = {
+            "method": "distance_matrix",
+            "origins": dm.origins,
+            "destinations": dm.destinations,
+            "matrix": dm.rows(),
+        }
+        if with_routes:
+            out["routes"] = dm.routes
+        return out
+
+    if method in ("tsp", "vrp", "routing", "ruteo", "ruteo_vehiculos"):
+        return _solve_routing(problem, model_dict, m, method)
+
+    if method in ("all_pairs", "apsp", "all_pairs_shortest_paths"):
+        with_pred = bool(_option(problem, "predecessors", False))
+        fmt = str(_option(problem, "format", "npy")).strip().lower()
+        try:
+            res = all_pairs_shortest_paths(m, _algorithm(problem), predecessors=with_pred)
+        except ValueError as exc:
+            raise NetworkModelError(str(exc)) from None
+        out = {
+            "method": "all_pairs",
+            "algorithm": res.algorithm,
+            "nodes": res.names,
+            "shape": [res.n, res.n],
+        }
+        if fmt == "json":
+            out["distances"] = res.rows()
+            if with_pred:
+                out["predecessors"] = res.rows("pred")
+            return out
+        # Binary: base64 of .npy files (float64 distances, int64 predecessors, -1 = none)
+        out["encoding"] = "npy+base64"
+        out["distances"] = base64.b64encode(res.to_npy_bytes()).decode("ascii")
+        if with_pred:
+            out["predecessors"] = base64.b64encode(res.to_npy_bytes("pred")).decode("ascii")
+        return out
 
     raise NetworkModelError(f"Unknown method: {method}")
+
+
+def _solve_routing(problem: Dict[str, Any], model_dict: Dict[str, Any], m: NetworkModel, method: str) -> Dict[str, Any]:
+    depot = problem.get("depot") or model_dict.get("depot") or m.source
+    if not depot:
+        raise NetworkModelError("Routing requires a 'depot' (or 'source')")
+    depot = str(depot)
+    stops = problem.get("stops") or model_dict.get("stops") or [x for x in m.nodes if x != depot]
+    points = [depot] + [str(x) for x in dict.fromkeys(stops) if str(x) != depot]
+    demands = problem.get("demands") or model_dict.get("demands") or {}
+    capacity = _option(problem, "vehicle_capacity")
+    vehicles = _option(problem, "vehicles")
+    if method == "vrp" and capacity is None:
+        raise NetworkModelError("VRP requires options.vehicle_capacity")
+    try:
+        workers = int(_option(problem, "workers", 0) or 0) or None
+        # One bounded Dijkstra per stop (the shortest-path code), then heuristics on the matrix
+        dm = distance_matrix(m, points, points, workers=workers)
+        sol = solve_routing(
+            dm,
+            depot,
+            demands={str(k): float(v) for k, v in demands.items()},
+            capacity=None if capacity is None else float(capacity),
+            vehicles=None if vehicles is None else int(vehicles),
+            construction=str(_option(problem, "construction", "auto")).strip().lower(),
+            neighbors=int(_option(problem, "neighbors", 8)),
+            restarts=int(_option(problem, "restarts", 16)),
+            time_budget=float(_option(problem, "time_budget", 2.0)),
+            workers=workers,
+            seed=int(_option(problem, "seed", 0)),
+        )
+    except ValueError as exc:
+        raise NetworkModelError(str(exc)) from None
+
+    # Street-level paths of the legs (trees are reused for legs leaving the same stop)
+    trees = ShortestPathTreeCache()
+    routes = []
+    nodes: List[str] = []
+    edges: List[str] = []
+    for stops_k, dist_k, load_k in zip(sol.routes, sol.distances, sol.loads):
+        path_nodes = [stops_k[0]]
+        for a, b in zip(stops_k, stops_k[1:]):
+            path_nodes += trees.query(m, a, b)[1][1:]
+        routes.append({"stops": stops_k, "distance": dist_k, "load": load_k, "path_nodes": path_nodes})
+        nodes += stops_k
+        edges += [_edge_key(a, b) for a, b in zip(path_nodes, path_nodes[1:])]
+    return {
+        "method": "vrp" if capacity is not None else "tsp",
+        "depot": depot,
+        "status": "ok" if sol.feasible else "vehicles_exceeded",
+        "total_distance": sol.total_distance,
+        "routes": routes,
+        "highlight": {"nodes": list(dict.fromkeys(nodes)), "edges": list(dict.fromkeys(edges))},
+        "extra": {
+            "construction": sol.construction,
+            "construction_distance": sol.construction_distance,
+            "improvement": sol.construction_distance - sol.total_distance,
+            "restarts": sol.restarts,
+            "elapsed": sol.elapsed,
+            "quality_vs_time": [
+                {"time": at, "best_distance": cost, "restart": r} for at, cost, r in sol.history
+            ],
+            "restart_distances": sol.restart_costs,
+            "moves": sol.moves,
+        },
+    }
+
+
+def _solve_schedule(problem: Dict[str, Any]) -> Dict[str, Any]:
+    raw = problem.get("activities")
+    if not isinstance(raw, list) and isinstance(problem.get("model"), dict):
+        raw = problem["model"].get("activities")
+    if not raw:
+        raise NetworkModelError("CPM requires 'activities'")
+
+    def number(x: Any) -> Any:
+        return None if x is None else float(x)
+
+    try:
+        activities = [
+            Activity(
+                name=str(a["name"]),
+                duration=float(a.get("duration", 0.0) or 0.0),
+                predecessors=[str(p) for p in a.get("predecessors") or []],
+                optimistic=number(a.get("optimistic")),
+                most_likely=number(a.get("most_likely")),
+                pessimistic=number(a.get("pessimistic")),
+            )
+            for a in raw
+        ]
+    except (KeyError, TypeError, ValueError) as exc:
+        raise NetworkModelError(f"Invalid activity: {exc}") from None
+    try:
+        sched = critical_path_method(activities)
+    except ValueError as exc:
+        raise NetworkModelError(str(exc)) from None
+
+    rows = []
+    for i, name in enumerate(sched.names):
+        rows.append({
+            "name": name,
+            "duration": sched.duration[i],
+            "variance": sched.variance[i],
+            "es": sched.es[i],
+            "ef": sched.ef[i],
+            "ls": sched.ls[i],
+            "lf": sched.lf[i],
+            "slack": sched.slack[i],
+            "critical": sched.critical[i],
+        })
+    path = sched.critical_path
+    out: Dict[str, Any] = {
+        "method": "cpm",
+        "project_duration": sched.project_duration,
+        "project_variance": sched.project_variance,
+        "project_std": sched.project_variance ** 0.5,
+        "critical_path": path,
+        "activities": rows,
+        "highlight": {"nodes": path, "edges": [_edge_key(a, b) for a, b in zip(path, path[1:])]},
+    }
+    deadline = _option(problem, "deadline")
+    if deadline is not None:
+        out["deadline"] = float(deadline)
+        out["completion_probability"] = sched.completion_probability(float(deadline))
+    return out
+
+
+def _solve_b_flow(m: NetworkModel, algorithm: str) -> Dict[str, Any]:
+    """Min-cost flow with per-node supplies (no super-source/super-sink)."""
+    g = m.graph
+    supply = [0.0] * g.n
+    for name, b in m.supply.items():
+        supply[g.node(name)] += b
+    if algorithm == "auto":
+        algorithm = choose_min_cost_flow_algorithm(g, sum(b for b in supply if b > 0))
+    potentials = None
+    stats: Dict[str, Any] = {}
+    try:
+        if algorithm == "ssap":
+            arc_flow, potentials, tot_cost = successive_shortest_paths(g, supply, stats)
+        elif algorithm == "capacity_scaling":
+            arc_flow, tot_cost = capacity_scaling(g, supply, stats)
+        elif algorithm == "cost_scaling":
+            arc_flow, tot_cost = cost_scaling(g, supply, stats)
+        elif algorithm == "network_simplex":
+            arc_flow, potentials, tot_cost = solve_network_simplex(g, supply, stats)
+        else:
+            raise NetworkModelError(f"Unknown min-cost flow algorithm: {algorithm}")
+    except ValueError as exc:
+        raise NetworkModelError(str(exc)) from None
+    except InfeasibleFlow as exc:
+        return {
+            "method": "min_cost_flow",
+            "algorithm": algorithm,
+            "supply": dict(m.supply),
+            "total_cost": None,
+            "error": str(exc),
+        }
+    flows = g.pair_flows(arc_flow)
+    out = {
+        "method": "min_cost_flow",
+        "algorithm": algorithm,
+        "supply": dict(m.supply),
+        "sent": sum(b for b in supply if b > 0),
+        "total_cost": tot_cost,
+        "flows": [{"u": u, "v": v, "flow": f} for (u, v), f in flows.items()],
+        "highlight": {"nodes": m.nodes, "edges": [_edge_key(u, v) for (u, v), f in flows.items() if f > 1e-12]},
+    }
+    if potentials is not None:
+        out["potentials"] = {name: potentials[i] for i, name in enumerate(g.names)}
+    if stats:
+        out["stats"] = stats
+    return out
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Optional, Sequence, Tuple, Union
+
+from ..networks.distance_matrix import DistanceMatrix, distance_matrix
+from ..networks.errors import NetworkModelError
+from ..networks.graph import CompiledGraph
+from ..networks.model import NetworkModel
+from ..networks.parsers import model_from_dict as network_from_dict
+from .errors import TransportModelError
+from .model import TransportModel
+from .parsers import BIG_M, parse_val
+from .solve import solve_transport
+
+
+def transport_model_from_network(
+    graph: Union[NetworkModel, CompiledGraph],
+    origins: Sequence[str],
+    destinations: Sequence[str],
+    supply: Sequence[float],
+    demand: Sequence[float],
+    workers: Optional[int] = None,
+    routes: bool = False,
+    name: str = "transport",
+) -> Tuple[TransportModel, DistanceMatrix]:
+    """Build a ``TransportModel`` whose costs are shortest-path distances on ``graph``.
+
+    Unreachable origin/destination pairs cost ``BIG_M`` (same penalty as ``"M"`` in JSON).
+    Returns the model and the ``DistanceMatrix`` it was built from.
+    """
+    if len(supply) != len(origins):
+        raise TransportModelError("len(supply) must match the number of origins")
+    if len(demand) != len(destinations):
+        raise TransportModelError("len(demand) must match the number of destinations")
+    try:
+        dm = distance_matrix(graph, origins, destinations, workers=workers, routes=routes)
+    except (NetworkModelError, ValueError) as exc:
+        raise TransportModelError(str(exc)) from None
+    inf = float("inf")
+    costs = [[c if c < inf else BIG_M for c in row] for row in dm.rows()]
+    model = TransportModel(
+        supply=[parse_val(x) for x in supply],
+        demand=[parse_val(x) for x in demand],
+        costs=costs,
+        name=name,
+        origins=list(dm.origins),
+        destinations=list(dm.destinations),
+    )
+    return model, dm
+
+
+def solve_transport_on_network(problem: Dict[str, Any]) -> Dict[str, Any]:
+    """Solve a transport problem whose costs come from a road graph.
+
+    Expected keys: ``graph`` (``NetworkModel``, ``CompiledGraph`` or network JSON), ``origins``,
+    ``destinations``, ``supply``, ``demand``; optional ``method``/``options`` as in
+    ``solve_transport`` plus ``options.workers`` and ``options.routes``. The cost matrix goes
+    straight into ``solve_transport`` as a ``TransportModel``. The result gains
+    ``extra["distance_matrix"]`` (and ``extra["routes"]`` when requested).
+    """
+    if not isinstance(problem, dict):
+        raise TransportModelError("Request must be a JSON object")
+    graph = problem.get("graph")
+    if isinstance(graph, dict):
+        try:
+            graph = network_from_dict(graph)
+        except NetworkModelError as exc:
+            raise TransportModelError(str(exc)) from None
+    if not isinstance(graph, (NetworkModel, CompiledGraph)):
+        raise TransportModelError("'graph' is required")
+    for key in ("origins", "destinations", "supply", "demand"):
+        if not isinstance(problem.get(key), list):
+            raise TransportModelError(f"'{key}' must be an array")
+
+    opts = problem.get("options") if isinstance(problem.get("options"), dict) else {}
+    with_routes = bool(opts.get("routes", False))
+    model, dm = transport_model_from_network(
+        graph,
+        problem["origins"],
+        problem["destinations"],
+        problem["supply"],
+        problem["demand"],
+        workers=int(opts.get("workers", 0) or 0) or None,
+        routes=with_routes,
+        name=str(problem.get("name", "transport")),
+    )
+    out = solve_transport({"method": problem.get("method", "auto"), "model": model, "options": opts})
+    extra: Dict[str, Any] = out.setdefault("extra", {})
+    extra["distance_matrix"] = dm.rows()
+    if with_routes:
+        extra["routes"] = dm.routes
+    return out
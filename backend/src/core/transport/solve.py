@@ -3,6 +3,7 @@ from __future__ import annotations
 from typing import Any, Dict, Literal
 
 from .errors import TransportModelError
+from .model import TransportModel
 from .parsers import model_from_dict
 from .algorithms import (
     balance_problem,
@@ -40,7 +41,8 @@ def solve_transport(problem: Dict[str, Any]) -> Dict[str, Any]:
     method: str = str(problem.get("method", "auto")).strip().lower()
     model_dict = problem.get("model") if "model" in problem else problem
 
-    m = model_from_dict(model_dict)
+    # A TransportModel (e.g. built by network_pipeline) is used as is, without re-parsing
+    m = model_dict if isinstance(model_dict, TransportModel) else model_from_dict(model_dict)
     bal = balance_problem(m.supply, m.demand, m.costs)
 
     opts = problem.get("options") if isinstance(problem.get("options"), dict) else {}
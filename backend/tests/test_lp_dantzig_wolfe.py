@@ -0,0 +1,63 @@
+from src.core.lp import solve_lp
+from src.core.lp.dantzig_wolfe import detect_block_structure, solve_dantzig_wolfe
+from src.core.lp.parsers import model_from_dict
+
+PLANTS = {
+    "name": "plants",
+    "sense": "max",
+    "c": [3, 2, 4, 1],
+    "constraints": [
+        {"a": [1, 1, 1, 1], "op": "<=", "b": 7},
+        {"a": [1, 2, 0, 0], "op": "<=", "b": 6},
+        {"a": [2, 1, 0, 0], "op": "<=", "b": 8},
+        {"a": [0, 0, 1, 3], "op": "<=", "b": 5},
+        {"a": [0, 0, 1, 0], "op": "<=", "b": 4},
+    ],
+}
+
+def test_detects_linking_row_and_blocks():
+    linking, blocks = detect_block_structure(model_from_dict(PLANTS))
+    assert linking == [0]
+    assert blocks == [[0, 1], [2, 3]]
+
+def test_dantzig_wolfe_matches_two_phase():
+    ref = solve_lp(PLANTS, method="two_phase")
+    res = solve_lp(dict(PLANTS, workers=2), method="dantzig_wolfe")
+    assert res.status == "OPTIMAL"
+    assert res.method_used == "dantzig_wolfe"
+    assert abs(res.objective_value - ref.objective_value) < 1e-6
+    gaps = [h["gap"] for h in res.extra["gap_history"]]
+    assert gaps[-1] < 1e-6
+
+def test_dantzig_wolfe_infeasible_linking():
+    model = dict(PLANTS, constraints=PLANTS["constraints"] + [{"a": [1, 1, 1, 1], "op": ">=", "b": 100}])
+    res = solve_lp(model, method="dantzig_wolfe")
+    assert res.status == "INFEASIBLE"
+
+def test_dantzig_wolfe_block_without_rows_falls_back():
+    # La variable 5 solo aparece en la fila de enlace: su bloque no es acotado
+    model = dict(PLANTS, c=PLANTS["c"] + [2],
+                 constraints=[dict(r, a=r["a"] + [1 if i == 0 else 0]) for i, r in enumerate(PLANTS["constraints"])])
+    ref = solve_lp(model, method="two_phase")
+    res = solve_lp(model, method="dantzig_wolfe")
+    assert res.status == "OPTIMAL"
+    assert abs(res.objective_value - ref.objective_value) < 1e-6
+    assert "fallback" in res.extra
+
+def test_dantzig_wolfe_iteration_limit():
+    res = solve_dantzig_wolfe(model_from_dict(PLANTS), max_iter=1)
+    assert res.status == "ITERATION_LIMIT"
+    assert len(res.x) == 4
+
+def test_dantzig_wolfe_checks_rows_without_coefficients():
+    # 0 = 8 no cae en ningun bloque: antes se descartaba y DW reportaba OPTIMAL
+    model = dict(PLANTS, constraints=PLANTS["constraints"] + [{"a": [0, 0, 0, 0], "op": "=", "b": 8}])
+    assert solve_lp(model, method="two_phase").status == "INFEASIBLE"
+    assert solve_lp(model, method="dantzig_wolfe").status == "INFEASIBLE"
+    # 0 <= 8 se cumple siempre y no cambia el optimo ni los indices reportados
+    model = dict(PLANTS, constraints=[{"a": [0, 0, 0, 0], "op": "<=", "b": 8}] + PLANTS["constraints"])
+    ref = solve_lp(PLANTS, method="two_phase")
+    res = solve_lp(model, method="dantzig_wolfe")
+    assert res.status == "OPTIMAL"
+    assert abs(res.objective_value - ref.objective_value) < 1e-6
+    assert res.extra["linking_rows"] == [1]
@@ -1,4 +1,5 @@
 from src.core.networks.solve import solve_network
+from src.core.networks.errors import NetworkModelError
 
 
 def test_shortest_path():
@@ -63,3 +64,838 @@ def test_min_cost_flow():
     out = solve_network({"method": "min_cost_flow", "model": model})
     assert out["sent"] == 4
     assert out["total_cost"] == 12
+
+
+def test_compiled_graph_interns_nodes_and_mirrors_undirected_edges():
+    from src.core.networks.parsers import model_from_dict
+
+    m = model_from_dict(
+        {
+            "nodes": ["A", "B", "C"],
+            "edges": [{"u": "A", "v": "B", "weight": 1}, {"u": "B", "v": "C", "weight": 2}],
+            "directed": False,
+        }
+    )
+    g = m.graph
+    assert g is m.graph  # compiled once per model
+    assert g.num_edges == 2 and g.m == 4
+    b = g.index["B"]
+    out_b = sorted(g.names[g.head[a]] for a in range(g.out_start[b], g.out_start[b + 1]))
+    assert out_b == ["A", "C"]
+    assert {g.edge(g.arc_edge[a]) is m.edges[g.arc_edge[a]] for a in range(g.m)} == {True}
+
+
+def test_min_cost_flow_with_antiparallel_arcs():
+    model = {
+        "nodes": ["s", "a", "t"],
+        "edges": [
+            {"u": "s", "v": "a", "capacity": 2, "cost": 1},
+            {"u": "a", "v": "s", "capacity": 2, "cost": 1},
+            {"u": "a", "v": "t", "capacity": 2, "cost": 1},
+            {"u": "s", "v": "t", "capacity": 2, "cost": 5},
+        ],
+        "source": "s",
+        "sink": "t",
+        "demand": 3,
+    }
+    out = solve_network({"method": "min_cost_flow", "model": model})
+    assert out["sent"] == 3
+    assert out["total_cost"] == 2 * 2 + 1 * 5
+
+
+def test_min_cost_flow_ssap_with_negative_cycle():
+    # a->b->a costs -1 per unit: Dijkstra on reduced costs alone would never finish
+    model = {
+        "nodes": ["s", "a", "b", "t"],
+        "edges": [
+            {"u": "s", "v": "a", "capacity": 5, "cost": 1},
+            {"u": "a", "v": "b", "capacity": 5, "cost": -2},
+            {"u": "b", "v": "a", "capacity": 5, "cost": 1},
+            {"u": "a", "v": "t", "capacity": 5, "cost": 1},
+        ],
+        "source": "s",
+        "sink": "t",
+        "demand": 2,
+        "directed": True,
+    }
+    out = solve_network({"method": "min_cost_flow", "model": model, "options": {"algorithm": "ssap"}})
+    assert out["sent"] == 2
+    assert out["total_cost"] == 2 * 2 - 5
+    out = solve_network({"method": "min_cost_flow", "model": model, "options": {"cost_curve": True}})
+    assert out["total_cost"] is None and "cycle" in out["error"]
+    # Negative costs without a cycle: the curve runs on Bellman-Ford potentials
+    model["edges"][2]["cost"] = 3
+    out = solve_network({"method": "min_cost_flow", "model": model, "options": {"cost_curve": True}})
+    assert out["total_cost"] == 4 and out["max_flow"] == 5
+
+
+def test_max_flow_engines_agree():
+    model = {
+        "nodes": ["s", "a", "b", "c", "d", "t"],
+        "edges": [
+            {"u": "s", "v": "a", "capacity": 10},
+            {"u": "s", "v": "c", "capacity": 10},
+            {"u": "a", "v": "b", "capacity": 4},
+            {"u": "a", "v": "c", "capacity": 2},
+            {"u": "a", "v": "d", "capacity": 8},
+            {"u": "c", "v": "d", "capacity": 9},
+            {"u": "d", "v": "b", "capacity": 6},
+            {"u": "b", "v": "t", "capacity": 10},
+            {"u": "d", "v": "t", "capacity": 10},
+        ],
+        "source": "s",
+        "sink": "t",
+    }
+    for algorithm in ("edmonds_karp", "dinic", "push_relabel"):
+        out = solve_network({"method": "max_flow", "model": model, "options": {"algorithm": algorithm}})
+        assert out["algorithm"] == algorithm
+        assert out["max_flow"] == 19
+        into_t = sum(f["flow"] for f in out["flows"] if f["v"] == "t")
+        assert into_t == 19
+
+
+def test_network_simplex_matches_ssap_and_reports_potentials():
+    model = {
+        "nodes": ["s", "a", "b", "t"],
+        "edges": [
+            {"u": "s", "v": "a", "capacity": 4, "cost": 2},
+            {"u": "s", "v": "b", "capacity": 2, "cost": 2},
+            {"u": "a", "v": "b", "capacity": 2, "cost": 1},
+            {"u": "a", "v": "t", "capacity": 3, "cost": 3},
+            {"u": "b", "v": "t", "capacity": 5, "cost": 1},
+        ],
+        "source": "s",
+        "sink": "t",
+        "demand": 6,
+    }
+    ssap = solve_network({"method": "min_cost_flow", "model": model})
+    ns = solve_network({"method": "min_cost_flow", "model": model, "options": {"algorithm": "network_simplex"}})
+    assert ns["algorithm"] == "network_simplex"
+    assert ns["sent"] == 6
+    assert ns["total_cost"] == ssap["total_cost"] == 24
+    pi = ns["potentials"]
+    flows = {(f["u"], f["v"]): f["flow"] for f in ns["flows"]}
+    for e in model["edges"]:
+        rc = e["cost"] + pi[e["u"]] - pi[e["v"]]
+        f = flows.get((e["u"], e["v"]), 0)
+        if f == 0:
+            assert rc >= -1e-9
+        if f == e["capacity"]:
+            assert rc <= 1e-9
+        if 0 < f < e["capacity"]:
+            assert abs(rc) <= 1e-9
+
+
+def test_min_cost_flow_scaling_variants_and_auto_choice():
+    model = {
+        "nodes": ["s", "a", "b", "t"],
+        "edges": [
+            {"u": "s", "v": "a", "capacity": 1_000_000_000, "cost": 1},
+            {"u": "s", "v": "b", "capacity": 700_000_000, "cost": 1},
+            {"u": "b", "v": "a", "capacity": 300_000_000, "cost": 0},
+            {"u": "a", "v": "t", "capacity": 1_000_000_000, "cost": 2},
+            {"u": "b", "v": "t", "capacity": 3, "cost": 1},
+            {"u": "s", "v": "t", "capacity": 500_000_000, "cost": 4},
+        ],
+        "source": "s",
+        "sink": "t",
+        "demand": 1_200_000_000,
+    }
+    auto = solve_network({"method": "min_cost_flow", "model": model})
+    assert auto["algorithm"] == "cost_scaling"
+    for algorithm in ("capacity_scaling", "cost_scaling", "ssap"):
+        out = solve_network({"method": "min_cost_flow", "model": model, "options": {"algorithm": algorithm}})
+        assert out["total_cost"] == auto["total_cost"] == 3_799_999_994
+    cap = solve_network({"method": "min_cost_flow", "model": model, "options": {"algorithm": "capacity_scaling"}})
+    assert cap["stats"]["phases"] <= 31
+
+
+def test_min_cost_flow_with_node_supplies():
+    model = {
+        "nodes": ["d1", "d2", "x", "c1", "c2"],
+        "edges": [
+            {"u": "d1", "v": "x", "capacity": 10, "cost": 1},
+            {"u": "d2", "v": "x", "capacity": 10, "cost": 3},
+            {"u": "d2", "v": "c2", "capacity": 2, "cost": 1},
+            {"u": "x", "v": "c1", "capacity": 10, "cost": 1},
+            {"u": "x", "v": "c2", "capacity": 10, "cost": 2},
+        ],
+        "supply": {"d1": 4, "d2": 3, "c1": -3, "c2": -4},
+    }
+    costs = set()
+    for algorithm in ("auto", "ssap", "network_simplex", "capacity_scaling", "cost_scaling"):
+        out = solve_network({"method": "min_cost_flow", "model": model, "options": {"algorithm": algorithm}})
+        costs.add(out["total_cost"])
+        assert out["sent"] == 7
+    # d1 -> x -> {c1: 3, c2: 1}, d2 -> c2 (2), d2 -> x -> c2 (1)
+    assert costs == {6 + 3 + 2 + 5}
+    out = solve_network({"method": "min_cost_flow", "model": model})
+    assert out["algorithm"] == "ssap"
+    pi = out["potentials"]
+    assert all(pi[e["u"]] + e["cost"] - pi[e["v"]] >= -1e-9 for e in model["edges"] if e["u"] != "d2" or e["v"] != "c2")
+
+    model["supply"] = {"d1": 4, "c1": -3}
+    try:
+        solve_network({"method": "min_cost_flow", "model": model})
+    except NetworkModelError as exc:
+        assert "sum to zero" in str(exc)
+    else:
+        raise AssertionError("unbalanced supplies must be rejected")
+
+
+def test_min_cost_flow_cost_curve():
+    model = {
+        "nodes": ["s", "a", "b", "t"],
+        "edges": [
+            {"u": "s", "v": "a", "capacity": 2, "cost": 1},
+            {"u": "a", "v": "t", "capacity": 2, "cost": 1},
+            {"u": "s", "v": "b", "capacity": 3, "cost": 2},
+            {"u": "b", "v": "t", "capacity": 3, "cost": 3},
+        ],
+        "source": "s",
+        "sink": "t",
+        "demand": 3,
+    }
+    out = solve_network({"method": "min_cost_flow", "model": model, "options": {"cost_curve": True}})
+    assert out["total_cost"] == 4 + 5
+    assert out["max_flow"] == 5
+    assert out["cost_curve"] == [
+        {"flow": 0.0, "cost": 0.0},
+        {"flow": 2.0, "cost": 4.0, "marginal_cost": 2.0},
+        {"flow": 5.0, "cost": 19.0, "marginal_cost": 5.0},
+    ]
+
+
+def test_point_to_point_shortest_path_algorithms():
+    nodes = [f"{i},{j}" for i in range(6) for j in range(6)]
+    coords = {f"{i},{j}": [i, j] for i in range(6) for j in range(6)}
+    edges = []
+    for i in range(6):
+        for j in range(6):
+            if i + 1 < 6:
+                edges.append({"u": f"{i},{j}", "v": f"{i + 1},{j}", "weight": 1 + (i * j) % 3})
+            if j + 1 < 6:
+                edges.append({"u": f"{i},{j}", "v": f"{i},{j + 1}", "weight": 1 + (i + j) % 2})
+    model = {"nodes": nodes, "edges": edges, "coords": coords, "source": "0,0", "sink": "5,4", "directed": False}
+    base = solve_network({"method": "shortest_path", "model": model, "options": {"algorithm": "dijkstra"}})
+    for options in (
+        {"algorithm": "bidirectional"},
+        {"algorithm": "astar", "heuristic": "euclidean"},
+        {"algorithm": "astar", "heuristic": "alt"},
+    ):
+        out = solve_network({"method": "shortest_path", "model": model, "options": options})
+        assert out["distance"] == base["distance"]
+        assert out["path_nodes"][0] == "0,0" and out["path_nodes"][-1] == "5,4"
+        assert 0 < out["settled"] <= base["settled"]
+
+
+def test_astar_ignores_coordinates_unless_asked():
+    from src.core.networks.parsers import model_from_dict
+    from src.core.networks.shortest_path import astar
+
+    # Weights shorter than the straight-line distances: the euclidean bound is not admissible
+    model = {
+        "nodes": ["s", "a", "b", "t"],
+        "edges": [
+            {"u": "s", "v": "a", "weight": 1},
+            {"u": "a", "v": "t", "weight": 1},
+            {"u": "s", "v": "b", "weight": 1.5},
+            {"u": "b", "v": "t", "weight": 0.1},
+        ],
+        "coords": {"s": [0, 0], "a": [0, 10], "b": [10, 0], "t": [10, 10]},
+        "source": "s",
+        "sink": "t",
+        "directed": False,
+    }
+    out = solve_network({"method": "shortest_path", "model": model, "options": {"algorithm": "astar"}})
+    assert out["algorithm"] == "dijkstra"
+    assert abs(out["distance"] - 1.6) < 1e-9 and out["path_nodes"] == ["s", "b", "t"]
+    assert abs(astar(model_from_dict(model), "s", "t")[0] - 1.6) < 1e-9
+
+
+def test_integer_weight_queues_match_dijkstra():
+    from src.core.networks.parsers import model_from_dict
+    from src.core.networks.shortest_path import dial, dijkstra, radix_heap_dijkstra
+
+    nodes = [str(i) for i in range(15)]
+    edges = [{"u": str(i), "v": str((i * 4 + 1) % 15), "weight": (i * 37) % 9} for i in range(15)]
+    edges += [{"u": str(i), "v": str((i + 1) % 14), "weight": 1000 + (i * 13) % 500} for i in range(14)]
+    m = model_from_dict({"nodes": nodes, "edges": edges, "directed": True})
+    for s in nodes:
+        ref = dijkstra(m, s, "14")[0]
+        assert dial(m, s, "14")[0] == ref
+        assert radix_heap_dijkstra(m, s, "14")[0] == ref
+
+    model = {"nodes": nodes, "edges": edges, "source": "0", "sink": "13", "directed": True}
+    assert solve_network({"method": "shortest_path", "model": model})["algorithm"] == "radix_heap"
+    edges[0]["weight"] = 2.5
+    out = solve_network({"method": "shortest_path", "model": model})
+    assert out["algorithm"] == "dijkstra"
+    try:
+        solve_network({"method": "shortest_path", "model": model, "options": {"algorithm": "dial"}})
+    except NetworkModelError as exc:
+        assert "integer" in str(exc)
+    else:
+        raise AssertionError("Dial must reject fractional weights")
+
+
+def test_negative_weights_fall_back_to_spfa_and_report_cycles():
+    model = {
+        "nodes": ["A", "B", "C", "D"],
+        "edges": [
+            {"u": "A", "v": "B", "weight": 4},
+            {"u": "A", "v": "C", "weight": 2},
+            {"u": "B", "v": "D", "weight": 1},
+            {"u": "C", "v": "B", "weight": -3},
+            {"u": "C", "v": "D", "weight": 1},
+            # Positive cycle A-C-B-D-A: not a DAG, so auto cannot pick the topological pass
+            {"u": "D", "v": "A", "weight": 5},
+        ],
+        "source": "A",
+        "sink": "D",
+        "directed": True,
+    }
+    out = solve_network({"method": "shortest_path", "model": model})
+    assert out["algorithm"] == "spfa"
+    assert out["distance"] == 0 and out["path_nodes"] == ["A", "C", "B", "D"]
+
+    model["edges"].append({"u": "D", "v": "C", "weight": 1})
+    out = solve_network({"method": "shortest_path", "model": model})
+    assert out["distance"] is None
+    cycle = out["negative_cycle"]
+    assert cycle[0] == cycle[-1] and set(cycle) == {"B", "C", "D"}
+
+
+def test_contraction_hierarchy_matches_dijkstra_and_round_trips(tmp_path):
+    from src.core.networks.contraction import ContractionHierarchy, build_contraction_hierarchy
+    from src.core.networks.parsers import model_from_dict
+    from src.core.networks.shortest_path import dijkstra
+
+    nodes = [str(i) for i in range(12)]
+    edges = [{"u": str(i), "v": str((i * 5 + 3) % 12), "weight": 1 + i % 4} for i in range(12)]
+    edges += [{"u": str(i), "v": str((i + 1) % 12), "weight": 2 + (i * 7) % 3} for i in range(12)]
+    m = model_from_dict({"nodes": nodes, "edges": edges, "directed": True})
+    ch = build_contraction_hierarchy(m)
+    path = tmp_path / "graph.ch.json"
+    ch.save(path)
+    loaded = ContractionHierarchy.load(path)
+    weight = {(e["u"], e["v"]): e["weight"] for e in edges}
+    for s in nodes:
+        for t in nodes:
+            ref = dijkstra(m, s, t)[0][t]
+            d, p = loaded.query(s, t)
+            assert d == ref
+            assert p[0] == s and p[-1] == t
+            assert sum(weight[(a, b)] for a, b in zip(p, p[1:])) == d
+
+
+def test_contraction_hierarchy_rejects_inconsistent_data():
+    from src.core.networks.contraction import ContractionHierarchy
+
+    good = {
+        "format": "contraction_hierarchy",
+        "version": 1,
+        "names": ["A", "B"],
+        "rank": [0, 1],
+        "up": [[0, 1, 1], [1], [1.0], [-1]],
+        "down": [[0, 0, 0], [], [], []],
+    }
+    assert ContractionHierarchy.from_dict(good).query("A", "B") == (1.0, ["A", "B"])
+    for bad in (
+        # Shortcut A->B "via A": unpacking would expand it forever
+        dict(good, up=[[0, 1, 1], [1], [1.0], [0]]),
+        dict(good, up=[[0, 2, 1], [1], [1.0], [-1]]),
+        dict(good, up=[[0, 1, 1], [5], [1.0], [-1]]),
+        dict(good, up=[[0, 1, 1], [1], [1.0]]),
+        dict(good, rank=[1, 1]),
+    ):
+        try:
+            ContractionHierarchy.from_dict(bad)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("Inconsistent hierarchy accepted")
+
+
+def test_distance_matrix_matches_pairwise_dijkstra():
+    model = {
+        "nodes": ["A", "B", "C", "D", "E"],
+        "edges": [
+            {"u": "A", "v": "B", "weight": 4},
+            {"u": "A", "v": "C", "weight": 1},
+            {"u": "C", "v": "B", "weight": 2},
+            {"u": "B", "v": "D", "weight": 5},
+            {"u": "C", "v": "D", "weight": 8},
+        ],
+        "directed": True,
+    }
+    out = solve_network({
+        "method": "distance_matrix",
+        "model": model,
+        "origins": ["A", "C"],
+        "destinations": ["B", "D", "E"],
+        "options": {"routes": True},
+    })
+    assert out["matrix"] == [[3.0, 8.0, float("inf")], [2.0, 7.0, float("inf")]]
+    assert out["routes"][0][1] == ["A", "C", "B", "D"]
+    assert out["routes"][1][2] == []
+
+
+def test_all_pairs_floyd_warshall_and_johnson_agree():
+    import base64
+    import struct
+
+    model = {
+        "nodes": ["A", "B", "C", "D"],
+        "edges": [
+            {"u": "A", "v": "B", "weight": 4},
+            {"u": "A", "v": "C", "weight": 1},
+            {"u": "C", "v": "B", "weight": -2},
+            {"u": "B", "v": "D", "weight": 3},
+        ],
+    }
+    fw = solve_network({"method": "all_pairs", "model": model,
+                        "options": {"algorithm": "floyd_warshall", "format": "json", "predecessors": True}})
+    jo = solve_network({"method": "all_pairs", "model": model,
+                        "options": {"algorithm": "johnson", "format": "json", "predecessors": True}})
+    inf = float("inf")
+    assert fw["distances"] == jo["distances"] == [
+        [0.0, -1.0, 1.0, 2.0],
+        [inf, 0.0, inf, 3.0],
+        [inf, -2.0, 0.0, 1.0],
+        [inf, inf, inf, 0.0],
+    ]
+    assert fw["predecessors"][0][3] == jo["predecessors"][0][3] == 1
+
+    out = solve_network({"method": "all_pairs", "model": model, "options": {"algorithm": "johnson"}})
+    raw = base64.b64decode(out["distances"])
+    assert raw[:6] == b"\x93NUMPY"
+    header_len = struct.unpack("<H", raw[8:10])[0]
+    assert b"(4, 4)" in raw[10:10 + header_len] and (10 + header_len) % 64 == 0
+    values = struct.unpack("<16d", raw[10 + header_len:])
+    assert list(values[:4]) == [0.0, -1.0, 1.0, 2.0]
+
+
+def test_mst_engines_agree_and_euclidean_mst_needs_no_edges():
+    nodes = [str(i) for i in range(10)]
+    edges = [{"u": str(i), "v": str(j), "weight": (i * 7 + j * 3) % 11}
+             for i in range(10) for j in range(i + 1, 10) if (i + j) % 3]
+    model = {"nodes": nodes, "edges": edges, "directed": False}
+    totals = {}
+    for algorithm in ("kruskal", "prim", "boruvka", "auto"):
+        out = solve_network({"method": "mst", "model": model, "options": {"algorithm": algorithm}})
+        assert len(out["edges"]) == 9
+        totals[out["algorithm"]] = out["total_weight"]
+    assert len(set(totals.values())) == 1 and "prim" in totals
+
+    points = {"A": [0, 0], "B": [3, 0], "C": [3, 4], "D": [0, 4]}
+    out = solve_network({"method": "mst", "model": {"nodes": list(points), "edges": [], "coords": points}})
+    assert out["algorithm"] == "euclidean"
+    assert out["total_weight"] == 3 + 4 + 3
+
+
+def test_max_flow_reports_min_cut_and_gomory_hu_answers_all_pairs():
+    model = {
+        "nodes": ["s", "a", "t"],
+        "edges": [
+            {"u": "s", "v": "a", "capacity": 3},
+            {"u": "a", "v": "t", "capacity": 2},
+            {"u": "s", "v": "t", "capacity": 1},
+        ],
+        "source": "s",
+        "sink": "t",
+        "directed": True,
+    }
+    out = solve_network({"method": "max_flow", "model": model})
+    assert out["min_cut"]["source_side"] == ["s", "a"]
+    assert out["min_cut"]["capacity"] == out["max_flow"] == 3
+
+    from src.core.networks.max_flow import max_flow
+    from src.core.networks.parsers import model_from_dict
+
+    nodes = [str(i) for i in range(7)]
+    edges = [{"u": str(i), "v": str((i * 3 + 1) % 7), "capacity": 1 + i % 4} for i in range(7)]
+    edges += [{"u": str(i), "v": str((i + 1) % 7), "capacity": 2 + i % 3} for i in range(7)]
+    ug = {"nodes": nodes, "edges": edges, "directed": False}
+    pairs = [[u, v] for u in nodes for v in nodes if u < v]
+    out = solve_network({"method": "gomory_hu", "model": ug, "pairs": pairs})
+    assert len(out["tree"]) == 6 and out["max_flow_runs"] == 6
+    m = model_from_dict(ug)
+    for cut in out["cuts"]:
+        assert cut["min_cut"] == max_flow(m, cut["u"], cut["v"], "dinic")[0]
+        assert cut["u"] in cut["side"] and cut["v"] not in cut["side"]
+
+
+def test_max_flow_session_follows_capacity_changes():
+    from src.core.networks.max_flow import MaxFlowSession, max_flow
+    from src.core.networks.parsers import model_from_dict
+
+    caps = {("s", "a"): 4, ("s", "b"): 3, ("a", "b"): 2, ("a", "t"): 2, ("b", "t"): 5}
+    nodes = ["s", "a", "b", "t"]
+
+    def model():
+        edges = [{"u": u, "v": v, "capacity": c} for (u, v), c in caps.items()]
+        return model_from_dict({"nodes": nodes, "edges": edges, "source": "s", "sink": "t"})
+
+    session = MaxFlowSession(model(), "s", "t")
+    assert session.value == 7
+    for (u, v), c in [(("b", "t"), 3), (("a", "t"), 6), (("s", "b"), 0), (("a", "b"), 0), (("s", "a"), 9)]:
+        caps[(u, v)] = c
+        assert session.set_capacity(u, v, c) == max_flow(model(), "s", "t")[0]
+    assert session.min_cut()["capacity"] == session.value
+
+
+def test_dynamic_shortest_path_tree_repairs_only_affected_nodes():
+    from src.core.networks.distance_matrix import distance_matrix
+    from src.core.networks.dynamic_shortest_path import DynamicShortestPathTree
+    from src.core.networks.parsers import model_from_dict
+
+    weights = {(str(i), str(i + 1)): 1 + i % 3 for i in range(9)}
+    weights.update({("0", "5"): 9, ("2", "8"): 4, ("5", "9"): 3})
+    nodes = [str(i) for i in range(10)]
+
+    def model():
+        edges = [{"u": u, "v": v, "weight": w} for (u, v), w in weights.items()]
+        return model_from_dict({"nodes": nodes, "edges": edges, "directed": False})
+
+    tree = DynamicShortestPathTree(model(), "0")
+    for changes in ([("2", "3", 20)], [("0", "5", 1), ("8", "9", 0)], [("0", "5", 30), ("2", "3", 1)]):
+        for u, v, w in changes:
+            weights[(u, v)] = w
+        stats = tree.update(changes)
+        assert stats["scanned"] <= len(nodes)
+        expected = distance_matrix(model(), ["0"], nodes).row(0)
+        assert [tree.distance(v) for v in nodes] == expected
+        assert tree.path("9")[0] == "0" and tree.path("9")[-1] == "9"
+    assert tree.set_weight("4", "5", 2)["changed"] == 0
+
+
+def test_k_shortest_paths_are_loopless_and_sorted():
+    model = {
+        "nodes": ["C", "D", "E", "F", "G", "H"],
+        "edges": [
+            {"u": "C", "v": "D", "weight": 3},
+            {"u": "C", "v": "E", "weight": 2},
+            {"u": "D", "v": "F", "weight": 4},
+            {"u": "E", "v": "D", "weight": 1},
+            {"u": "E", "v": "F", "weight": 2},
+            {"u": "E", "v": "G", "weight": 3},
+            {"u": "F", "v": "G", "weight": 2},
+            {"u": "F", "v": "H", "weight": 1},
+            {"u": "G", "v": "H", "weight": 2},
+        ],
+        "source": "C",
+        "sink": "H",
+        "directed": True,
+    }
+    out = solve_network({"method": "k_shortest_paths", "model": model, "options": {"k": 3}})
+    assert [p["distance"] for p in out["paths"]] == [5, 7, 8]
+    assert out["paths"][0]["path_nodes"] == ["C", "E", "F", "H"]
+    assert out["paths"][1]["path_nodes"] == ["C", "E", "G", "H"]
+    assert all(len(set(p["path_nodes"])) == len(p["path_nodes"]) for p in out["paths"])
+    assert "E->F" in out["highlight"]["edges"]
+
+
+def test_multicommodity_flow_shares_capacities_and_prices_congestion():
+    # Both products prefer the cheap arc B->C (capacity 4); one must detour via B->D->C
+    model = {
+        "nodes": ["A", "B", "C", "D", "E"],
+        "edges": [
+            {"u": "A", "v": "B", "capacity": 10, "cost": 1},
+            {"u": "E", "v": "B", "capacity": 10, "cost": 1},
+            {"u": "B", "v": "C", "capacity": 4, "cost": 1},
+            {"u": "B", "v": "D", "capacity": 10, "cost": 2},
+            {"u": "D", "v": "C", "capacity": 10, "cost": 2},
+        ],
+        "directed": True,
+    }
+    commodities = [
+        {"name": "P1", "source": "A", "sink": "C", "demand": 3},
+        {"name": "P2", "source": "E", "sink": "C", "demand": 3},
+    ]
+    out = solve_network({"method": "multicommodity_flow", "model": model, "commodities": commodities})
+    assert out["status"] == "optimal"
+    # 4 units at cost 2 and 2 units at cost 5
+    assert abs(out["total_cost"] - 18) < 1e-9
+    total = {(f["u"], f["v"]): f["flow"] for f in out["arc_flows"]}
+    assert abs(total[("B", "C")] - 4) < 1e-9
+    assert all(abs(c["sent"] - 3) < 1e-9 for c in out["commodities"])
+    prices = {(p["u"], p["v"]): p["price"] for p in out["congestion_prices"]}
+    assert abs(prices[("B", "C")] - 3) < 1e-9
+
+    commodities[0]["demand"] = 30
+    out = solve_network({"method": "multicommodity_flow", "model": model, "commodities": commodities})
+    assert out["status"] == "infeasible"
+    assert abs(out["commodities"][0]["unmet"] - 20) < 1e-9
+
+
+def test_multicommodity_flow_stops_at_max_iter():
+    from src.core.networks.multicommodity import Commodity, multicommodity_flow
+    from src.core.networks.parsers import model_from_dict
+
+    m = model_from_dict({
+        "nodes": ["s", "a", "b", "t"],
+        "edges": [
+            {"u": "s", "v": "a", "capacity": 10, "cost": 1},
+            {"u": "s", "v": "b", "capacity": 10, "cost": 2},
+            {"u": "a", "v": "t", "capacity": 10, "cost": 1},
+            {"u": "b", "v": "t", "capacity": 10, "cost": 2},
+            {"u": "a", "v": "b", "capacity": 5, "cost": 1},
+        ],
+        "directed": True,
+    })
+    commodities = [Commodity("s", "t", 12), Commodity("a", "t", 2)]
+    # The last iteration prices new paths (and arcs) that its master never saw
+    out = multicommodity_flow(m, commodities, max_iter=1)
+    assert out.status == "iteration_limit"
+    assert out.iterations == 1 and len(out.history) == 1
+    full = multicommodity_flow(m, commodities)
+    assert full.status == "optimal" and abs(full.total_cost - 34) < 1e-9
+
+
+def test_dag_paths_and_cpm_schedule():
+    model = {
+        "nodes": ["s", "a", "b", "t"],
+        "edges": [
+            {"u": "s", "v": "a", "weight": 2},
+            {"u": "s", "v": "b", "weight": 5},
+            {"u": "a", "v": "b", "weight": -1},
+            {"u": "a", "v": "t", "weight": 6},
+            {"u": "b", "v": "t", "weight": 2},
+        ],
+        "source": "s",
+        "sink": "t",
+        "directed": True,
+    }
+    out = solve_network({"method": "shortest_path", "model": model})
+    assert out["algorithm"] == "dag"
+    assert out["distance"] == 3 and out["path_nodes"] == ["s", "a", "b", "t"]
+    out = solve_network({"method": "longest_path", "model": model})
+    assert out["distance"] == 8 and out["path_nodes"] == ["s", "a", "t"]
+
+    activities = [
+        {"name": "A", "duration": 3},
+        {"name": "B", "optimistic": 2, "most_likely": 4, "pessimistic": 6, "predecessors": ["A"]},
+        {"name": "C", "duration": 2, "predecessors": ["A"]},
+        {"name": "D", "duration": 5, "predecessors": ["B", "C"]},
+        {"name": "E", "duration": 1, "predecessors": ["C"]},
+    ]
+    out = solve_network({"method": "cpm", "activities": activities, "options": {"deadline": 12}})
+    assert out["project_duration"] == 12
+    assert out["critical_path"] == ["A", "B", "D"]
+    rows = {r["name"]: r for r in out["activities"]}
+    assert rows["C"]["slack"] == 2 and rows["E"]["slack"] == 6 and rows["E"]["ls"] == 11
+    assert abs(out["project_variance"] - 4 / 9) < 1e-12
+    assert abs(out["completion_probability"] - 0.5) < 1e-12
+
+    activities[0]["predecessors"] = ["D"]
+    try:
+        solve_network({"method": "cpm", "activities": activities})
+    except NetworkModelError:
+        pass
+    else:
+        raise AssertionError("Cyclic precedences must be rejected")
+
+
+def test_reduce_option_contracts_chains_and_expands_results():
+    # s-a-b-t is a chain, c is a dangling node and x/y cannot reach t
+    model = {
+        "nodes": ["s", "a", "b", "t", "c", "x", "y"],
+        "edges": [
+            {"u": "s", "v": "a", "capacity": 5, "weight": 1},
+            {"u": "a", "v": "b", "capacity": 3, "weight": 1},
+            {"u": "b", "v": "t", "capacity": 4, "weight": 1},
+            {"u": "s", "v": "t", "capacity": 2, "weight": 5},
+            {"u": "s", "v": "t", "capacity": 1, "weight": 4},
+            {"u": "a", "v": "c", "capacity": 9, "weight": 1},
+            {"u": "b", "v": "x", "capacity": 9, "weight": 1},
+            {"u": "x", "v": "y", "capacity": 9, "weight": 1},
+        ],
+        "source": "s",
+        "sink": "t",
+        "directed": True,
+    }
+    plain = solve_network({"method": "max_flow", "model": model})
+    out = solve_network({"method": "max_flow", "model": model, "options": {"reduce": True}})
+    assert out["max_flow"] == plain["max_flow"] == 6
+    assert out["reduction"]["reduced_nodes"] == 2 and out["reduction"]["reduced_edges"] == 1
+    flows = {(f["u"], f["v"]): f["flow"] for f in out["flows"]}
+    assert flows[("s", "a")] == flows[("a", "b")] == flows[("b", "t")] == 3
+    assert out["min_cut"]["capacity"] == 6
+
+    out = solve_network({"method": "shortest_path", "model": model, "options": {"reduce": True}})
+    assert out["distance"] == 3 and out["path_nodes"] == ["s", "a", "b", "t"]
+    assert "reduction" in out
+
+
+def test_edge_list_loads_into_compiled_graph_and_binary_round_trip(tmp_path):
+    from src.core.networks.graph import CompiledGraph
+    from src.core.networks.loaders import load_graph
+
+    csv_path = tmp_path / "red.csv"
+    csv_path.write_text(
+        "# red de prueba\n"
+        "source,target,capacity,weight\n"
+        "s,a,3,1\n"
+        "s,b,2,4\n"
+        "a,b,1,1\n"
+        "a,t,2,6\n"
+        "b,t,3,1\n",
+        encoding="utf-8",
+    )
+    graph = load_graph(csv_path)
+    assert graph.n == 4 and graph.num_edges == 5 and graph.directed
+
+    bin_path = tmp_path / "red.graph"
+    graph.save_binary(bin_path)
+    loaded = CompiledGraph.load_binary(bin_path)
+    assert loaded.names == graph.names
+    for column in ("edge_u", "edge_v", "edge_capacity", "edge_weight", "out_start", "head", "in_arc"):
+        assert list(getattr(loaded, column)) == list(getattr(graph, column))
+
+    for g in (graph, loaded):
+        out = solve_network({"method": "max_flow", "model": {"source": "s", "sink": "t"}}, graph=g)
+        assert out["max_flow"] == 5
+        out = solve_network({"method": "shortest_path", "model": {"source": "s", "sink": "t"}}, graph=g)
+        assert out["distance"] == 3 and out["path_nodes"] == ["s", "a", "b", "t"]
+
+    bad = tmp_path / "mala.txt"
+    bad.write_text("s a 1\na t x\n", encoding="utf-8")
+    try:
+        load_graph(bad)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("Non-numeric weights must be rejected")
+
+
+def test_graph_registry_reuses_graphs_caches_results_and_versions():
+    from src.core.networks.parsers import model_from_dict
+    from src.core.networks.registry import GraphRegistry
+
+    model = {
+        "nodes": ["s", "a", "b", "t"],
+        "edges": [
+            {"u": "s", "v": "a", "capacity": 3, "weight": 1},
+            {"u": "s", "v": "b", "capacity": 2, "weight": 4},
+            {"u": "a", "v": "t", "capacity": 2, "weight": 1},
+            {"u": "b", "v": "t", "capacity": 3, "weight": 1},
+        ],
+        "source": "s",
+        "sink": "t",
+        "directed": True,
+    }
+    registry = GraphRegistry()
+    entry = registry.register(model_from_dict(model).graph, model)
+    # Same content in another key order: same handle, same entry
+    shuffled = dict(reversed(list(model.items())))
+    assert registry.register(model_from_dict(shuffled).graph, shuffled) is entry
+    handle = entry.handle
+
+    out, cached = registry.solve(handle, {"method": "shortest_path"})
+    assert out["distance"] == 2 and not cached
+    out, cached = registry.solve(handle, {"method": "shortest_path"})
+    assert cached
+    out, cached = registry.solve(handle, {"method": "max_flow", "model": {"sink": "a"}})
+    assert out["max_flow"] == 3 and not cached
+
+    registry.update(handle, changes=[{"u": "a", "v": "t", "weight": 9}], remove=[{"u": "s", "v": "b"}])
+    assert entry.version == 2 and not entry.results
+    out, cached = registry.solve(handle, {"method": "shortest_path"}, version=2)
+    assert out["distance"] == 10 and not cached
+    try:
+        registry.solve(handle, {"method": "shortest_path"}, version=1)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("Stale versions must be rejected")
+
+    # Least recently used graphs go first
+    small = GraphRegistry(max_graphs=1)
+    small.register(model_from_dict(model).graph)
+    other = dict(model, directed=False)
+    small.register(model_from_dict(other).graph)
+    assert len(small) == 1 and handle not in small and small.evicted == 1
+
+
+def test_shortest_path_tree_cache_resumes_and_answers_repeats():
+    import gc
+
+    from src.core.networks.parsers import model_from_dict
+    from src.core.networks.shortest_path_cache import ShortestPathTreeCache
+
+    model = {
+        "nodes": ["D", "a", "b", "c", "e"],
+        "edges": [
+            {"u": "D", "v": "a", "weight": 1},
+            {"u": "a", "v": "b", "weight": 1},
+            {"u": "b", "v": "c", "weight": 1},
+            {"u": "D", "v": "c", "weight": 5},
+            {"u": "c", "v": "e", "weight": 1},
+        ],
+        "directed": False,
+    }
+    graph = model_from_dict(model).graph
+    cache = ShortestPathTreeCache()
+    stats = {}
+    assert cache.query(graph, "D", "a", stats) == (1.0, ["D", "a"])
+    first = stats["settled"]
+    # Resumes the saved heap instead of starting over from D
+    assert cache.query(graph, "D", "e", stats) == (4.0, ["D", "a", "b", "c", "e"])
+    assert stats["tree_settled"] == first + stats["settled"]
+    assert cache.query(graph, "D", "b", stats) == (2.0, ["D", "a", "b"]) and stats["settled"] == 0
+    assert len(cache) == 1 and cache.hits == 1
+
+    # Default on for a caller-supplied graph; an explicit queue is honoured
+    req = {"method": "shortest_path", "model": {"source": "D", "sink": "c"}}
+    out = solve_network(req, graph=graph)
+    assert out["distance"] == 3 and "cached_tree" in out
+    assert solve_network(req, graph=graph)["cached_tree"]["hit"]
+    out = solve_network(dict(req, options={"algorithm": "dial"}), graph=graph)
+    assert out["algorithm"] == "dial" and "cached_tree" not in out
+
+    del graph
+    gc.collect()
+    assert len(cache) == 0 and cache.nbytes == 0
+
+
+def test_tsp_and_vrp_heuristics_on_road_network():
+    # Ring road D-a-b-c-d-e-D (length 1 per link) with a long shortcut D-c
+    ring = ["D", "a", "b", "c", "d", "e"]
+    edges = [{"u": u, "v": v, "weight": 1} for u, v in zip(ring, ring[1:] + ring[:1])]
+    edges.append({"u": "D", "v": "c", "weight": 5})
+    model = {"nodes": ring, "edges": edges, "directed": False}
+
+    out = solve_network({
+        "method": "tsp",
+        "model": model,
+        "depot": "D",
+        "stops": ["b", "d", "a"],
+        "options": {"restarts": 3},
+    })
+    route = out["routes"][0]
+    assert out["total_distance"] == 6 and route["stops"][0] == route["stops"][-1] == "D"
+    assert sorted(route["stops"][1:-1]) == ["a", "b", "d"]
+    # Legs are expanded to road nodes: the whole ring
+    assert len(route["path_nodes"]) == 7
+    extra = out["extra"]
+    assert extra["restarts"] == 3 and extra["quality_vs_time"][-1]["best_distance"] == 6
+    assert extra["construction_distance"] >= out["total_distance"]
+
+    out = solve_network({
+        "method": "vrp",
+        "model": model,
+        "depot": "D",
+        "demands": {"a": 2, "b": 2, "c": 1, "d": 2, "e": 2},
+        "options": {"vehicle_capacity": 5, "vehicles": 2, "restarts": 4},
+    })
+    assert out["status"] == "ok" and len(out["routes"]) == 2
+    assert all(r["load"] <= 5 for r in out["routes"])
+    assert sorted(s for r in out["routes"] for s in r["stops"][1:-1]) == ["a", "b", "c", "d", "e"]
+
+    try:
+        solve_network({"method": "vrp", "model": model, "depot": "D"})
+    except NetworkModelError:
+        pass
+    else:
+        raise AssertionError("VRP without a vehicle capacity must be rejected")
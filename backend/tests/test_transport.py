@@ -37,3 +37,29 @@ def test_transport_supports_M():
     }
     out = solve_transport(problem)
     assert "allocation" in out
+
+
+def test_transport_costs_from_network_graph():
+    from src.core.transport.network_pipeline import solve_transport_on_network
+
+    graph = {
+        "nodes": ["P1", "P2", "X", "C1", "C2"],
+        "edges": [
+            {"u": "P1", "v": "X", "weight": 2},
+            {"u": "P2", "v": "X", "weight": 4},
+            {"u": "X", "v": "C1", "weight": 1},
+            {"u": "X", "v": "C2", "weight": 3},
+            {"u": "P2", "v": "C2", "weight": 2},
+        ],
+        "directed": True,
+    }
+    out = solve_transport_on_network({
+        "graph": graph,
+        "origins": ["P1", "P2"],
+        "destinations": ["C1", "C2"],
+        "supply": [10, 10],
+        "demand": [10, 10],
+    })
+    assert out["extra"]["distance_matrix"] == [[3.0, 5.0], [5.0, 2.0]]
+    assert out["status"] == "OPTIMAL"
+    assert out["total_cost"] == 10 * 3 + 10 * 2